@@ -1,9 +1,17 @@
 import sqlite3
 import os
+import sys
 import pyperclip
 import csv
 import io
-from datetime import datetime, timedelta
+import argparse
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+# 저장소 루트의 공용 모듈(sakura_db.py)을 불러오기 위해 상위 폴더를 경로에 추가합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sakura_db import connect_readonly, find_db_file, get_connection
+from sakura_index import find_active_events, pst_to_kst
 
 # --- 상수 정의 (설정) ---
 # 테이블 이름과 출력 헤더를 매핑합니다.
@@ -34,26 +42,21 @@ PRIZE_EXCHANGE_HEADERS = {
     'PrizeExchange::GachaCoinRed': '[페스코인 교환소 보상 정보]',
 }
 
+# 일괄 추출(--all) 결과를 저장할 폴더와 전체 보고서 파일 이름
+BATCH_OUTPUT_DIR = '추출결과'
+BATCH_REPORT_NAME = '전체_보고서.txt'
+
+# 일반 테이블 미리보기에서 한 번에 보여줄 행 수
+PREVIEW_PAGE_SIZE = 20
+# CSV 파일로 저장할 때 한 번에 읽어 쓰는 행 수
+EXPORT_BATCH_SIZE = 5000
+
 # --- 헬퍼 함수 ---
 
 def convert_pst_to_kst(pst_time_str):
-    """PST 시간 문자열을 KST로 변환합니다. (KST = PST + 17시간)"""
-    try:
-        dt_obj = datetime.strptime(f"1900/{pst_time_str}", "%Y/%m/%d %H:%M")
-        kst_obj = dt_obj + timedelta(hours=17)
-        return kst_obj.strftime("%m/%d %H:%M")
-    except (ValueError, TypeError):
-        return pst_time_str
-
-def find_db_file(directory='.'):
-    """현재 디렉토리에서 SQLite DB 파일(.db) 하나를 찾습니다."""
-    db_files = [f for f in os.listdir(directory) if f.endswith('.db')]
-    if not db_files:
-        print("❌ 오류: 폴더에서 .db 파일을 찾을 수 없습니다.")
-        return None
-    if len(db_files) > 1:
-        print(f"알림: 여러 개의 .db 파일이 발견되었습니다. 첫 번째 파일인 '{db_files[0]}'을(를) 사용합니다.")
-    return db_files[0]
+    """PST 시간 문자열을 KST로 변환합니다. (서머타임 반영, 변환할 수 없으면 원래 값을 그대로 반환)"""
+    kst_obj = pst_to_kst(pst_time_str)
+    return kst_obj.strftime("%m/%d %H:%M") if kst_obj else pst_time_str
 
 def get_all_tables(cursor):
     """DB의 모든 테이블 이름을 리스트로 반환합니다."""
@@ -65,86 +68,185 @@ def get_all_columns(cursor, table_name):
     cursor.execute(f'PRAGMA table_info("{table_name}")')
     return [row[1] for row in cursor.fetchall()]
 
-# --- 테이블별 데이터 처리 핸들러 함수 ---
-
-def handle_gasha(cursor, table_name):
-    """'MstGasha_' 테이블 데이터를 처리합니다."""
-    query = 'SELECT "subName_", "displayStartAt_", "displayEndAt_", "gashaType_" FROM "MstGasha_"'
-    cursor.execute(query)
-    results = [row for row in cursor.fetchall() if row[3] == 'Gacha::Payment']
-    if not results: return None, 0
-
-    processed_data = []
-    for sub_name, start, end, _ in results:
-        time_period = f"{convert_pst_to_kst(start)}~{convert_pst_to_kst(end)}"
-        processed_data.append([sub_name, time_period])
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['subName_', '기간(KST)'])
-    writer.writerows(processed_data)
-    
-    return f"{TABLE_HEADERS[table_name]}\n{output.getvalue()}", len(results)
-
-def handle_prize_exchange(cursor, table_name):
-    """'MstPrizeExchange_' 테이블 데이터를 처리합니다."""
-    query = 'SELECT "title_", "storeType_" FROM "MstPrizeExchange_"'
-    cursor.execute(query)
-    results = cursor.fetchall()
-    if not results: return None, 0
+def has_rowid(cursor, table_name):
+    """테이블에 rowid가 있는지 확인합니다. (WITHOUT ROWID 테이블이면 False)"""
+    try:
+        cursor.execute(f'SELECT rowid FROM "{table_name}" LIMIT 0')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def iter_pages(cursor, table_name, columns, page_size=PREVIEW_PAGE_SIZE):
+    """
+    테이블의 지정한 컬럼들을 page_size 행씩 나누어 반환합니다.
+    rowid를 기준으로 '마지막으로 본 rowid 다음부터' 읽으므로(keyset 페이지네이션) 뒤쪽 페이지도 처음 페이지만큼 빠릅니다.
+    WITHOUT ROWID 테이블은 하나의 쿼리를 열어 두고 fetchmany로 나누어 읽습니다.
+    """
+    columns_for_query = ', '.join([f'"{col}"' for col in columns])
+    if not has_rowid(cursor, table_name):
+        cursor.execute(f'SELECT {columns_for_query} FROM "{table_name}"')
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows: return
+            yield rows
+
+    # rowid는 음수일 수도 있으므로 첫 페이지는 조건 없이 가장 작은 rowid부터 읽습니다.
+    first_query = f'SELECT rowid, {columns_for_query} FROM "{table_name}" ORDER BY rowid LIMIT ?'
+    next_query = f'SELECT rowid, {columns_for_query} FROM "{table_name}" WHERE rowid > ? ORDER BY rowid LIMIT ?'
+    cursor.execute(first_query, (page_size,))
+    while True:
+        rows = cursor.fetchall()
+        if not rows: return
+        yield [row[1:] for row in rows]
+        if len(rows) < page_size: return
+        cursor.execute(next_query, (rows[-1][0], page_size))
+
+def browse_table(cursor, table_name, columns, page_size=PREVIEW_PAGE_SIZE):
+    """지정한 컬럼들을 한 페이지씩 화면에 보여줍니다. 반환값은 화면에 보여준 행 수입니다."""
+    shown = 0
+    writer = csv.writer(sys.stdout)
+    print(f"\n--- 📄 '{table_name}' 미리보기 ({page_size}행씩) ---")
+    writer.writerow(columns)
+    for page_number, rows in enumerate(iter_pages(cursor, table_name, columns, page_size), 1):
+        writer.writerows(rows)
+        sys.stdout.flush()
+        shown += len(rows)
+        if len(rows) < page_size:
+            break
+        answer = input(f"\n[{page_number}페이지, 지금까지 {shown}행] Enter: 다음 페이지 / q: 종료 > ")
+        if answer.strip().lower() == 'q':
+            break
+    print(f"\n미리보기 종료: 총 {shown}행을 표시했습니다.")
+    return shown
+
+def stream_columns_to_csv(cursor, table_name, columns, output_path, batch_size=EXPORT_BATCH_SIZE):
+    """
+    지정한 컬럼들을 CSV 파일로 저장하고 저장한 행 수를 반환합니다.
+    fetchmany로 batch_size 행씩 읽어 바로 파일에 쓰므로 테이블 크기와 상관없이 메모리 사용량이 일정합니다.
+    """
+    columns_for_query = ', '.join([f'"{col}"' for col in columns])
+    cursor.execute(f'SELECT {columns_for_query} FROM "{table_name}"')
+    row_count = 0
+    # 엑셀에서 한글이 깨지지 않도록 BOM이 붙은 UTF-8로 저장합니다.
+    with open(output_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows: break
+            writer.writerows(rows)
+            row_count += len(rows)
+    return row_count
+
+# --- 테이블별 처리 명세 ---
+# 특별 처리가 필요한 테이블을 선언적으로 정의합니다. 명세 하나는 SQL 쿼리 하나로 변환되어 실행됩니다.
+#   kind: 'csv'(행마다 CSV 한 줄), 'list'(첫 컬럼 값을 한 줄씩), 'group'(group_by 값마다 블록 하나)
+#   columns: 추출할 컬럼 ('group'은 각 블록에 나열할 컬럼 하나)
+#   where: SQL 조건식 (선택)
+#   group_by / label: 'group' 블록을 나누는 컬럼과 블록 제목 형식
+#   order_by: 'group' 블록 안의 값 순서를 정하는 키 컬럼 (테이블에 없으면 PRIMARY KEY 컬럼 순)
+#   header_row / row_format: 'csv'의 첫 줄과 행 변환 함수 (선택)
+#   header_column / header_map: 첫 행의 header_column 값으로 TABLE_HEADERS 대신 사용할 헤더를 고릅니다. (선택)
+
+def format_gasha_row(sub_name, start, end):
+    """스고페스 행을 [이름, KST 기간]으로 변환합니다."""
+    return [sub_name, f"{convert_pst_to_kst(start)}~{convert_pst_to_kst(end)}"]
+
+def rank_group_spec(group_by, label="{}위", order_by=('serverId_',)):
+    """group_by 값마다 description_을 모아 보여주는 랭킹/보상 테이블 명세를 만듭니다."""
+    return {'kind': 'group', 'group_by': group_by, 'columns': ['description_'], 'label': label, 'order_by': order_by}
+
+TABLE_SPECS = {
+    'MstGasha_': {
+        'kind': 'csv',
+        'columns': ['subName_', 'displayStartAt_', 'displayEndAt_'],
+        'where': "\"gashaType_\" = 'Gacha::Payment'",
+        'header_row': ['subName_', '기간(KST)'],
+        'row_format': format_gasha_row,
+    },
+    'MstPrizeExchange_': {
+        'kind': 'list',
+        'columns': ['title_'],
+        'header_column': 'storeType_',
+        'header_map': PRIZE_EXCHANGE_HEADERS,
+    },
+    'MstKizunaBattleEventRankReward_': rank_group_spec('rankTop_'),
+    'MstKizunaBattleEventAllianceRankReward_': rank_group_spec('rankTop_'),
+    'MstAssaultRumbleEventRankReward_': rank_group_spec('rankTop_'),
+    'MstKizunaBattleEventAllianceRankRateReward_': rank_group_spec('kizunaAllianceRankId_'),
+    'MstAssaultRumbleEventAllianceRankRateReward_': rank_group_spec('assaultRumbleAllianceRankId_'),
+    'MstPiratesArenaGpWinBonus_': rank_group_spec('winCount_', label="{}승"),
+}
 
+def get_order_columns(cursor, table_name, candidates):
+    """
+    행 순서를 정할 키 컬럼을 반환합니다. candidates 중 테이블에 있는 컬럼을 쓰고,
+    하나도 없으면 PRIMARY KEY 컬럼을, 그것도 없으면 rowid를 사용합니다. (WITHOUT ROWID 테이블은 항상 PRIMARY KEY가 있음)
+    """
+    cursor.execute(f'PRAGMA table_info("{table_name}")')
+    table_info = cursor.fetchall()
+    names = {row[1] for row in table_info}
+    columns = [f'"{name}"' for name in candidates if name in names]
+    if not columns:
+        columns = [f'"{row[1]}"' for row in sorted(table_info, key=lambda row: row[5]) if row[5]]
+    if not columns and has_rowid(cursor, table_name):
+        columns = ['rowid']
+    return columns
+
+def build_spec_query(table_name, spec, order_columns=()):
+    """처리 명세를 SQL 쿼리 하나로 변환합니다. 필터와 정렬은 SQLite 안에서 처리됩니다."""
+    where = f" WHERE {spec['where']}" if spec.get('where') else ""
+    if spec['kind'] == 'group':
+        group_column = f'"{spec["group_by"]}"'
+        value_column = f'"{spec["columns"][0]}"'
+        # 블록 제목 순서와 블록 안의 값 순서를 모두 ORDER BY로 정해 두고, 블록 묶기는 파이썬에서 차례로 합니다.
+        # NULL 값은 예전 str() 출력처럼 'None'으로 씁니다.
+        order_by = ', '.join([group_column, *order_columns])
+        return (
+            f'SELECT {group_column}, COALESCE(CAST({value_column} AS TEXT), \'None\') FROM "{table_name}"{where} '
+            f'ORDER BY {order_by}'
+        )
+
+    columns = list(spec['columns'])
+    if spec.get('header_column'):
+        columns.append(spec['header_column'])
+    columns_for_query = ', '.join([f'"{col}"' for col in columns])
+    return f'SELECT {columns_for_query} FROM "{table_name}"{where}'
+
+def handle_table_spec(cursor, table_name):
+    """TABLE_SPECS에 정의된 테이블을 명세에 따라 처리합니다. 결과는 커서에서 한 행씩 읽어 바로 씁니다."""
+    spec = TABLE_SPECS[table_name]
+    order_columns = get_order_columns(cursor, table_name, spec['order_by']) if spec['kind'] == 'group' else ()
+    cursor.execute(build_spec_query(table_name, spec, order_columns))
     header_text = TABLE_HEADERS.get(table_name)
-    if results:
-        # 첫 번째 행의 storeType을 기준으로 헤더를 결정합니다.
-        first_store_type = results[0][1]
-        header_text = PRIZE_EXCHANGE_HEADERS.get(first_store_type, header_text)
-
-    titles = [row[0] for row in results]
-    output_content = "title_\n" + "\n".join(map(str, titles))
-    return f"{header_text}\n{output_content}", len(results)
-
-def handle_rank_reward(cursor, table_name):
-    """랭킹 보상 관련 테이블들을 공통으로 처리합니다."""
-    query = f'SELECT "rankTop_", "description_" FROM "{table_name}"'
-    cursor.execute(query)
-    results = cursor.fetchall()
-    if not results: return None, 0
-    
-    grouped_data = {}
-    for rank, desc in results:
-        grouped_data.setdefault(rank, []).append(str(desc))
-        
-    output_blocks = [f"{rank}위\n" + "\n".join(descs) for rank, descs in sorted(grouped_data.items())]
-    return f"{TABLE_HEADERS[table_name]}\n" + "\n\n".join(output_blocks), len(results)
-
-def handle_alliance_rank_rate_reward(cursor, table_name):
-    """동맹 랭킹 비율 보상 관련 테이블들을 공통으로 처리합니다."""
-    id_column = "kizunaAllianceRankId_" if "Kizuna" in table_name else "assaultRumbleAllianceRankId_"
-    query = f'SELECT "{id_column}", "description_" FROM "{table_name}"'
-    cursor.execute(query)
-    results = cursor.fetchall()
-    if not results: return None, 0
-
-    grouped_data = {}
-    for rank_id, desc in results:
-        grouped_data.setdefault(rank_id, []).append(str(desc))
-
-    output_blocks = [f"{rank_id}위\n" + "\n".join(descs) for rank_id, descs in sorted(grouped_data.items())]
-    return f"{TABLE_HEADERS[table_name]}\n" + "\n\n".join(output_blocks), len(results)
-
-def handle_pirates_arena(cursor, table_name):
-    """'MstPiratesArenaGpWinBonus_' 테이블 데이터를 처리합니다."""
-    query = 'SELECT "winCount_", "description_" FROM "{table_name}"'
-    cursor.execute(query)
-    results = cursor.fetchall()
-    if not results: return None, 0
-
-    grouped_data = {}
-    for win_count, desc in results:
-        grouped_data.setdefault(win_count, []).append(str(desc))
-
-    output_blocks = [f"{win_count}승\n" + "\n".join(descs) for win_count, descs in sorted(grouped_data.items())]
-    return f"{TABLE_HEADERS[table_name]}\n" + "\n\n".join(output_blocks), len(results)
+    output = io.StringIO()
+    row_count = 0
+
+    if spec['kind'] == 'group':
+        label = spec['label']
+        for group_value, rows in itertools.groupby(cursor, key=lambda row: row[0]):
+            values = [row[1] for row in rows]
+            if row_count: output.write("\n\n")
+            output.write(f"{label.format(group_value)}\n" + "\n".join(values))
+            row_count += len(values)
+    elif spec['kind'] == 'list':
+        output.write(spec['columns'][0])
+        for row in cursor:
+            if not row_count and spec.get('header_column'):
+                # 첫 번째 행의 값을 기준으로 헤더를 결정합니다.
+                header_text = spec['header_map'].get(row[-1], header_text)
+            output.write(f"\n{row[0]}")
+            row_count += 1
+    else:
+        writer = csv.writer(output)
+        writer.writerow(spec.get('header_row', spec['columns']))
+        row_format = spec.get('row_format')
+        for row in cursor:
+            writer.writerow(row_format(*row) if row_format else row)
+            row_count += 1
+
+    if not row_count: return None, 0
+    return f"{header_text}\n{output.getvalue()}", row_count
 
 def handle_generic_table(cursor, table_name):
     """특별 핸들러가 없는 모든 일반 테이블을 처리합니다."""
@@ -171,6 +273,29 @@ def handle_generic_table(cursor, table_name):
         print("❌ 오류: 숫자, 쉼표(,), 별표(*)만 사용하여 올바르게 입력해주세요.")
         return None, 0
 
+    mode_input = input("\n[3단계] 처리 방식을 선택하세요 (1: 클립보드 복사, 2: 페이지 미리보기, 3: CSV 파일로 저장) [기본값 1]: ").strip()
+    if mode_input == '2':
+        # 미리보기는 화면에 바로 출력하므로 클립보드로 넘길 결과가 없습니다.
+        return None, browse_table(cursor, table_name, columns_to_extract)
+    if mode_input == '3':
+        output_path = f"{table_name}.csv"
+        row_count = stream_columns_to_csv(cursor, table_name, columns_to_extract, output_path)
+        print(f"💾 {row_count}행을 '{os.path.abspath(output_path)}' 파일로 저장했습니다.")
+        return None, row_count
+    if mode_input not in ('', '1'):
+        print("❌ 오류: 1, 2, 3 중 하나를 입력해주세요.")
+        return None, 0
+
+    return export_columns(cursor, table_name, columns_to_extract)
+
+def handle_generic_table_all_columns(cursor, table_name):
+    """일괄 추출용 일반 핸들러입니다. 입력을 받지 않고 모든 컬럼을 추출합니다."""
+    columns = get_all_columns(cursor, table_name)
+    if not columns: return None, 0
+    return export_columns(cursor, table_name, columns)
+
+def export_columns(cursor, table_name, columns_to_extract):
+    """테이블에서 지정한 컬럼들을 CSV 형태로 추출합니다."""
     columns_for_query = ', '.join([f'"{col}"' for col in columns_to_extract])
     query = f'SELECT {columns_for_query} FROM "{table_name}"'
     print(f"\n실행할 쿼리: {query}")
@@ -190,17 +315,98 @@ def handle_generic_table(cursor, table_name):
     return final_output, len(results)
 
 # --- 핸들러 맵 ---
-# 테이블 이름과 처리할 핸들러 함수를 연결합니다.
-TABLE_HANDLERS = {
-    'MstGasha_': handle_gasha,
-    'MstPrizeExchange_': handle_prize_exchange,
-    'MstKizunaBattleEventRankReward_': handle_rank_reward,
-    'MstKizunaBattleEventAllianceRankReward_': handle_rank_reward,
-    'MstAssaultRumbleEventRankReward_': handle_rank_reward,
-    'MstKizunaBattleEventAllianceRankRateReward_': handle_alliance_rank_rate_reward,
-    'MstAssaultRumbleEventAllianceRankRateReward_': handle_alliance_rank_rate_reward,
-    'MstPiratesArenaGpWinBonus_': handle_pirates_arena,
-}
+# 테이블 이름과 처리할 핸들러 함수를 연결합니다. 명세가 있는 테이블은 모두 handle_table_spec으로 처리합니다.
+TABLE_HANDLERS = {table_name: handle_table_spec for table_name in TABLE_SPECS}
+
+# --- 일괄 추출 ---
+
+def get_batch_tables():
+    """일괄 추출할 테이블 목록을 반환합니다. (TABLE_HEADERS 순서, 그 뒤에 헤더 없는 TABLE_HANDLERS 테이블)"""
+    return list(TABLE_HEADERS) + [name for name in TABLE_HANDLERS if name not in TABLE_HEADERS]
+
+def export_table(cursor, table_name):
+    """
+    테이블 하나를 입력 없이 처리하여 (테이블 이름, 결과, 원본 행 수, 오류 메시지)를 반환합니다.
+    한 테이블의 실패가 나머지 테이블 추출을 멈추지 않도록 모든 예외를 오류 메시지로 바꿔 돌려줍니다.
+    """
+    handler = TABLE_HANDLERS.get(table_name, handle_generic_table_all_columns)
+    try:
+        final_output, row_count = handler(cursor, table_name)
+        return table_name, final_output, row_count, None
+    except Exception as e:
+        return table_name, None, 0, f"{type(e).__name__}: {e}"
+
+def export_table_group(db_file, table_names):
+    """작업 스레드 하나가 자신만의 읽기 연결을 열어 테이블들을 차례로 처리합니다."""
+    conn = connect_readonly(db_file)
+    try:
+        cursor = conn.cursor()
+        return [export_table(cursor, table_name) for table_name in table_names]
+    finally:
+        conn.close()
+
+def export_all_tables(db_file, output_dir=BATCH_OUTPUT_DIR, workers=1):
+    """
+    TABLE_HANDLERS와 TABLE_HEADERS의 모든 테이블을 입력 없이 한 번에 추출합니다.
+    테이블마다 '<테이블 이름>.txt'를 만들고, 모든 결과를 모은 전체 보고서도 함께 저장합니다.
+    workers가 2 이상이면 테이블들을 스레드 여러 개에 나누어 처리하며, 스레드마다 읽기 연결을 따로 엽니다.
+    반환값은 처리에 실패한 테이블 이름 리스트입니다.
+    """
+    existing_tables = set(get_all_tables(get_connection(db_file).cursor()))
+    table_names = [name for name in get_batch_tables() if name in existing_tables]
+    for name in get_batch_tables():
+        if name not in existing_tables:
+            print(f"⚠️ '{name}' 테이블이 DB에 없어 건너뜁니다.")
+
+    if workers > 1 and len(table_names) > 1:
+        groups = [table_names[i::workers] for i in range(workers) if table_names[i::workers]]
+        with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+            results = [result for group in pool.map(lambda group: export_table_group(db_file, group), groups)
+                       for result in group]
+        # 스레드별로 나뉜 결과를 원래 테이블 순서로 되돌립니다.
+        order = {name: i for i, name in enumerate(table_names)}
+        results.sort(key=lambda result: order[result[0]])
+    else:
+        cursor = get_connection(db_file).cursor()
+        results = [export_table(cursor, table_name) for table_name in table_names]
+
+    os.makedirs(output_dir, exist_ok=True)
+    report_blocks = []
+    failed_tables = []
+    for table_name, final_output, row_count, error in results:
+        if final_output is not None:
+            try:
+                with open(os.path.join(output_dir, f"{table_name}.txt"), 'w', encoding='utf-8') as f:
+                    f.write(final_output)
+            except OSError as e:
+                error = f"{type(e).__name__}: {e}"
+        if error:
+            print(f"❌ '{table_name}' 처리 중 오류가 발생했습니다: {error}")
+            report_blocks.append(f"[{table_name}] 오류: {error}")
+            failed_tables.append(table_name)
+            continue
+        if final_output is None:
+            print(f"- '{table_name}': 결과 없음")
+            continue
+        print(f"✅ '{table_name}': {row_count}개의 원본 행 처리 완료")
+        report_blocks.append(final_output.rstrip('\n'))
+
+    report_path = os.path.join(output_dir, BATCH_REPORT_NAME)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write("\n\n".join(report_blocks) + "\n")
+    print(f"\n🎉 결과를 '{output_dir}' 폴더에 저장했습니다. (전체 보고서: '{report_path}')")
+    if failed_tables:
+        print(f"⚠️ {len(failed_tables)}개 테이블을 추출하지 못했습니다: {', '.join(failed_tables)}")
+    return failed_tables
+
+# --- 이벤트 타임라인 ---
+
+def print_timeline(db_file, start_kst, end_kst):
+    """KST 구간에 진행 중인 가챠/이벤트/보상 항목을 모든 테이블에서 모아 시작 시각 순으로 출력합니다."""
+    events = find_active_events(db_file, start_kst, end_kst)
+    print(f"\n--- 🗓️ {start_kst} ~ {end_kst} (KST) 진행 항목: {len(events)}개 ---")
+    for table_name, _, title, event_start, event_end in events:
+        print(f"{event_start} ~ {event_end or '(종료 없음)'} | {table_name} | {title}")
 
 # --- 메인 실행 로직 ---
 
@@ -211,7 +417,7 @@ def main():
         return
 
     try:
-        with sqlite3.connect(db_file) as conn:
+        with get_connection(db_file) as conn:
             print(f"\n✅ 데이터베이스 '{db_file}'에 정상적으로 연결되었습니다.")
             cursor = conn.cursor()
             
@@ -244,6 +450,9 @@ def main():
 
             # 결과 처리 및 출력 (공통 로직)
             if final_output is None:
+                # 미리보기/파일 저장처럼 핸들러가 결과를 직접 처리한 경우에는 처리한 행 수만 돌려받습니다.
+                if original_row_count:
+                    return
                 print("\n결과 없음: 해당 조건에 맞는 데이터가 없거나 처리 중 오류가 발생했습니다.")
                 return
 
@@ -261,4 +470,35 @@ def main():
         print(f"❌ 알 수 없는 오류가 발생했습니다: {e}")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="sakura.db의 테이블 데이터를 양식에 맞게 추출합니다.")
+    parser.add_argument('--all', action='store_true',
+                        help=f"입력 없이 모든 정보 테이블을 추출하여 '{BATCH_OUTPUT_DIR}' 폴더에 저장합니다.")
+    parser.add_argument('--workers', type=int, default=1, help="--all에서 사용할 스레드 수 (기본값: 1)")
+    parser.add_argument('--output', default=BATCH_OUTPUT_DIR, help="--all 결과를 저장할 폴더")
+    parser.add_argument('--timeline', nargs=2, metavar=('START', 'END'),
+                        help="KST 구간('YYYY-MM-DD HH:MM' 두 개)에 진행 중인 항목을 모든 테이블에서 찾아 출력합니다.")
+    args = parser.parse_args()
+    if args.timeline:
+        db_file = find_db_file()
+        if db_file:
+            try:
+                print_timeline(db_file, *args.timeline)
+            except ValueError:
+                print("❌ 오류: 시각은 'YYYY-MM-DD HH:MM' 형식으로 입력해주세요.")
+            except sqlite3.Error as e:
+                print(f"❌ 데이터베이스 오류가 발생했습니다: {e}")
+    elif args.all:
+        db_file = find_db_file()
+        if db_file:
+            try:
+                failed_tables = export_all_tables(db_file, args.output, args.workers)
+            except sqlite3.Error as e:
+                print(f"❌ 데이터베이스 오류가 발생했습니다: {e}")
+                sys.exit(1)
+            # 일부 테이블이라도 실패하면 스크립트/배치 파일에서 알 수 있도록 0이 아닌 종료 코드를 돌려줍니다.
+            if failed_tables:
+                sys.exit(1)
+        else:
+            sys.exit(1)
+    else:
+        main()
\ No newline at end of file
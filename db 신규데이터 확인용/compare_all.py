@@ -1,11 +1,288 @@
 import sqlite3
 import os
+import sys
 import logging
-from typing import List, Optional, Set, Tuple
+import argparse
+import hashlib
+import itertools
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+# 저장소 루트의 공용 모듈(sakura_db.py)을 불러오기 위해 상위 폴더를 경로에 추가합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sakura_db import SQLITE_DB_EXTENSIONS, connect_readonly, file_uri, list_db_files
+from sakura_index import load_table_manifest
 
 # 로깅 설정: 스크립트 진행 상황을 더 체계적으로 출력
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 
+# 정렬 병합 비교에서 커서를 끝까지 읽었음을 나타내는 값
+_END = object()
+
+# 행 단위 비교 결과를 저장하는 테이블 이름 접미사 (추가된 행은 원래 테이블 이름 그대로 저장)
+MODIFIED_TABLE_SUFFIX = '__modified'
+REMOVED_TABLE_SUFFIX = '__removed'
+# 변경된 행에 바뀐 컬럼 이름 목록(쉼표 구분)을 기록하는 컬럼
+CHANGED_COLUMNS_COLUMN = 'changedColumns_'
+# 결과 DB 파일 이름, 연속 비교(--chain) 시 결과 DB들을 저장하는 폴더 이름
+OUTPUT_DB_NAME = '추가목록.db'
+CHAIN_OUTPUT_DIR = '추가목록'
+# 미러 DB에 적용할 패치 파일 확장자 (.db가 아니므로 비교 대상 DB 검색에 포함되지 않음)
+PATCH_SUFFIX = '.patch'
+# 패치 파일에서 적용할 테이블 목록을 저장하는 테이블, 각 테이블의 작업 종류를 저장하는 컬럼
+PATCH_TABLE = 'patch_table'
+PATCH_OP_COLUMN = 'op_'
+# 여러 컬럼으로 된 기준 키를 패치의 key_column 한 칸에 저장할 때 컬럼 이름 사이에 넣는 구분자
+KEY_COLUMN_SEPARATOR = ','
+# 결과 DB에 행을 모아서 한 번에 저장하는 단위 (소스 DB에서 fetchmany로 읽는 단위도 같음)
+WRITE_BATCH_SIZE = 5000
+# 결과 DB를 대량으로 쓸 때 사용하는 PRAGMA (결과 DB는 매번 새로 만드는 파일이므로 저널과 디스크 동기화를 생략)
+BULK_WRITE_PRAGMAS = (
+    'PRAGMA main.journal_mode = OFF',
+    'PRAGMA main.synchronous = OFF',
+)
+
+
+def _sqlite_sort_key(value):
+    """SQLite의 기본 정렬 순서(NULL < 숫자 < 문자열 < BLOB)와 같은 순서로 값을 비교하기 위한 정렬 키."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, bytes(value))
+
+
+def _iter_fetchmany(cursor: sqlite3.Cursor, size: int = WRITE_BATCH_SIZE):
+    """실행된 커서의 행을 fetchmany(size) 단위로 읽어 한 행씩 반환합니다."""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
+def _read_table_schema(conn: sqlite3.Connection, table_name: str) -> Tuple[str, List[str]]:
+    """연결의 main DB에서 테이블의 CREATE TABLE 문과 그 테이블에 걸린 CREATE INDEX 문 목록을 가져옵니다."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT sql FROM main.sqlite_master WHERE type='table' AND name=?", (table_name,))
+    create_table_sql = cursor.fetchone()[0]
+    # 자동 인덱스(PRIMARY KEY, UNIQUE)는 sql이 NULL이며 CREATE TABLE 문으로 함께 만들어집니다.
+    cursor.execute("SELECT sql FROM main.sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+                   (table_name,))
+    return create_table_sql, [row[0] for row in cursor.fetchall()]
+
+
+def _row_hash(row: tuple) -> int:
+    """행 내용으로 만든 64비트 해시를 SQLite INTEGER에 들어가는 부호 있는 정수로 반환합니다. (rowid와 무관)"""
+    digest = hashlib.blake2b(repr(row).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def _iter_rows_at(rows, ordinals):
+    """rows를 처음부터 읽으며, 오름차순으로 정렬된 ordinals(0부터 시작하는 행 순번)에 해당하는 행만 반환합니다."""
+    ordinals = iter(ordinals)
+    wanted = next(ordinals, None)
+    if wanted is None:
+        return
+    for ordinal, row in enumerate(rows):
+        if ordinal == wanted:
+            yield row
+            wanted = next(ordinals, None)
+            if wanted is None:
+                return
+
+
+def _key_sort_key(values) -> tuple:
+    """기준 컬럼 값들(여러 컬럼 키 포함)을 ORDER BY k1, k2, ...와 같은 순서로 비교하기 위한 정렬 키."""
+    return tuple(_sqlite_sort_key(value) for value in values)
+
+
+def _iter_key_groups(cursor: sqlite3.Cursor, key_indexes: List[int]):
+    """키 순서로 정렬된 커서의 행을 같은 키끼리 묶어 (정렬 키, 행 목록)으로 하나씩 반환합니다."""
+    for key, rows in itertools.groupby(cursor, key=lambda row: tuple(row[i] for i in key_indexes)):
+        yield _key_sort_key(key), list(rows)
+
+
+def _quote_columns(columns: List[str]) -> str:
+    """컬럼 이름 목록을 SQL의 "c1", "c2", ... 형태로 만듭니다."""
+    return ', '.join(f'"{c}"' for c in columns)
+
+
+class _ResultWriter:
+    """
+    결과 DB에 대한 모든 쓰기를 담당합니다.
+    - 결과 DB 전체를 하나의 트랜잭션으로 쓰고, 마지막에 한 번만 커밋합니다. (BULK_WRITE_PRAGMAS 적용)
+    - 테이블은 실행 중 처음 만들 때만 새로 만들고, 이후 같은 테이블에 대한 저장은 뒤에 이어 붙입니다.
+    - 소스 테이블의 인덱스는 행을 모두 저장한 뒤 finish()에서 만듭니다.
+    conn은 isolation_level=None(자동 커밋)으로 연 연결이어야 하며, ATTACH는 begin() 전에 끝내야 합니다.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.column_counts = {}
+        self.pending_indexes = []
+        for pragma in BULK_WRITE_PRAGMAS:
+            conn.execute(pragma)
+
+    def begin(self):
+        self.conn.execute('BEGIN')
+
+    def create_table(self, table_name: str, create_table_sql: str, index_sqls: List[str] = ()):
+        """테이블을 만듭니다. 이번 실행에서 이미 만든 테이블이면 그대로 두어 이어서 저장할 수 있게 합니다."""
+        if table_name in self.column_counts:
+            return
+        cursor = self.conn.cursor()
+        cursor.execute(f'DROP TABLE IF EXISTS main."{table_name}"')
+        cursor.execute(create_table_sql)
+        cursor.execute(f'PRAGMA main.table_info("{table_name}")')
+        self.column_counts[table_name] = len(cursor.fetchall())
+        self.pending_indexes.extend((table_name, index_sql) for index_sql in index_sqls)
+
+    def append(self, table_name: str, rows) -> int:
+        """행들(리스트 또는 이터레이터)을 테이블 뒤에 이어 저장하고, 저장된 행의 수를 반환합니다."""
+        placeholders = ', '.join(['?'] * self.column_counts[table_name])
+        cursor = self.conn.cursor()
+        cursor.executemany(f'INSERT INTO main."{table_name}" VALUES ({placeholders})', rows)
+        return max(cursor.rowcount, 0)
+
+    def drop_table(self, table_name: str):
+        """이번 실행에서 만든 테이블을 지웁니다. (저장된 행이 없는 결과 테이블 정리용)"""
+        self.conn.execute(f'DROP TABLE IF EXISTS main."{table_name}"')
+        self.column_counts.pop(table_name, None)
+
+    def finish(self):
+        """남아 있는 테이블의 인덱스를 만들고 트랜잭션을 커밋합니다."""
+        for table_name, index_sql in self.pending_indexes:
+            if table_name in self.column_counts:
+                self.conn.execute(index_sql)
+        self.pending_indexes = []
+        if self.conn.in_transaction:
+            self.conn.execute('COMMIT')
+
+    def abort(self):
+        """커밋하지 않고 트랜잭션을 끝냅니다. (저널이 꺼져 있으므로 파일은 호출한 쪽에서 지워야 함)"""
+        self.pending_indexes = []
+        if self.conn.in_transaction:
+            self.conn.execute('ROLLBACK')
+
+
+class _ResultTableBuffer:
+    """결과 DB의 테이블 하나에 저장할 행을 모아 두었다가 WRITE_BATCH_SIZE개마다 저장합니다. 첫 저장 때 테이블을 만듭니다."""
+
+    def __init__(self, writer: _ResultWriter, table_name: str, create_table):
+        self.writer = writer
+        self.table_name = table_name
+        self.create_table = create_table
+        self.rows = []
+        self.count = 0
+        self.created = False
+
+    def add(self, row):
+        self.rows.append(row)
+        self.count += 1
+        if len(self.rows) >= WRITE_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        if not self.created:
+            self.create_table()
+            self.created = True
+        self.writer.append(self.table_name, self.rows)
+        self.rows = []
+
+
+class _PatchWriter:
+    """
+    비교 결과를 미러 DB에 다시 적용할 수 있는 패치 파일(SQLite)로 저장합니다.
+    - patch_table: 적용할 테이블 목록 (적용 순서, 기준 컬럼, 신규 테이블이면 CREATE TABLE 문, 신규 DB에서 삭제된 테이블이면 dropped=1)
+    - '<테이블>': op_ 컬럼('INSERT', 'UPDATE', 'DELETE') + 신규 DB 기준 컬럼들로 된 작업 목록
+    UPDATE와 DELETE는 기준 컬럼 값으로 적용하고, 기준 컬럼이 없는 테이블의 DELETE만 행 내용이 같은 행 하나를 찾아 적용합니다.
+    여러 컬럼으로 된 기준 키는 key_column에 KEY_COLUMN_SEPARATOR로 이어 저장합니다.
+    기준 컬럼 값 하나에 행이 여러 개인 테이블은 바뀐 키의 행을 모두 DELETE한 뒤 신규 DB의 행을 모두 INSERT합니다. (apply_patch 참고)
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.writer = _ResultWriter(conn)
+        self.writer.begin()
+        self.writer.create_table(PATCH_TABLE, f'CREATE TABLE {PATCH_TABLE} (seq INTEGER PRIMARY KEY, '
+                                              f'table_name TEXT NOT NULL, key_column TEXT, create_sql TEXT, '
+                                              f'dropped INTEGER NOT NULL DEFAULT 0)')
+
+    def table(self, table_name: str, key_columns: Optional[List[str]], column_types: List[Tuple[str, str]],
+              create_sql: Optional[str] = None) -> _ResultTableBuffer:
+        """
+        테이블 하나의 작업을 모을 버퍼를 반환합니다. 행은 ('INSERT', 값1, 값2, ...) 형태로 추가합니다.
+        작업이 하나도 없으면 패치에 기록되지 않습니다.
+        """
+        key_column = KEY_COLUMN_SEPARATOR.join(key_columns) if key_columns else None
+        column_defs = ', '.join(f'"{name}" {column_type}'.rstrip() for name, column_type in column_types)
+        payload_sql = f'CREATE TABLE "{table_name}" ({PATCH_OP_COLUMN} TEXT NOT NULL, {column_defs})'
+        return _ResultTableBuffer(self.writer, table_name,
+                                  lambda: self._register_table(table_name, key_column, create_sql, payload_sql))
+
+    def _register_table(self, table_name: str, key_column: Optional[str], create_sql: Optional[str], payload_sql: str):
+        self.writer.create_table(table_name, payload_sql)
+        self.writer.append(PATCH_TABLE, [(None, table_name, key_column, create_sql, 0)])
+
+    def drop_table(self, table_name: str):
+        """신규 DB에서 삭제된 테이블을 기록합니다. (적용 시 미러 DB에서도 테이블을 지움)"""
+        self.writer.append(PATCH_TABLE, [(None, table_name, None, None, 1)])
+
+    def merge_shard(self, conn_shard: sqlite3.Connection):
+        """작업 프로세스가 만든 패치 파일의 테이블들을 적용 순서대로 이 패치에 이어 붙입니다."""
+        tables = conn_shard.execute(f"SELECT table_name, key_column, create_sql, dropped FROM {PATCH_TABLE} ORDER BY seq").fetchall()
+        for table_name, key_column, create_sql, dropped in tables:
+            if dropped:
+                self.drop_table(table_name)
+                continue
+            self._register_table(table_name, key_column, create_sql, _read_table_schema(conn_shard, table_name)[0])
+            cursor = conn_shard.execute(f'SELECT * FROM "{table_name}" ORDER BY rowid')
+            self.writer.append(table_name, _iter_fetchmany(cursor))
+
+    def finish(self):
+        self.writer.finish()
+
+    def abort(self):
+        self.writer.abort()
+
+
+class DatabaseSnapshot:
+    """
+    비교 대상 DB 하나의 읽기 전용 연결과 테이블별 키 집합을 보관합니다.
+    여러 비교에서 같은 스냅샷을 넘기면 DB를 한 번만 열고, 키 집합도 테이블마다 한 번만 읽습니다.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = connect_readonly(db_path)
+        self._key_sets: Dict[Tuple[str, str], Set] = {}
+
+    def key_set(self, table_name: str, key_column: str) -> Set:
+        """테이블의 기준 컬럼 값 집합을 반환합니다. (처음 요청할 때만 DB에서 읽음)"""
+        key = (table_name, key_column)
+        keys = self._key_sets.get(key)
+        if keys is None:
+            cursor = self.conn.cursor()
+            cursor.execute(f'SELECT "{key_column}" FROM "{table_name}"')
+            keys = {row[0] for row in cursor.fetchall()}
+            self._key_sets[key] = keys
+        return keys
+
+    def discard_key_set(self, table_name: str, key_column: str):
+        """더 이상 필요 없는 테이블의 키 집합을 메모리에서 내립니다."""
+        self._key_sets.pop((table_name, key_column), None)
+
+    def close(self):
+        self.conn.close()
+        self._key_sets.clear()
+
+
 class DatabaseComparer:
     """
     두 개의 SQLite 데이터베이스를 비교하여 차이점을 세 번째 데이터베이스에 추출하는 클래스.
@@ -18,29 +295,103 @@ class DatabaseComparer:
     # 비교를 위한 기준 키 컬럼 (우선순위 순서대로)
     KEY_COLUMNS = ['serverId_', 'updateTimestamp_']
 
-    def __init__(self, old_db_path: str, new_db_path: str, result_db_path: str):
+    # 공통 테이블 비교 방식
+    # - 'set': 두 DB의 키를 모두 메모리(set)에 올려 차집합을 구합니다.
+    # - 'merge': 두 테이블을 키 순서로 함께 읽으며 한 번에 비교합니다. (메모리 사용량 일정)
+    # - 'engine': 기존/신규 DB를 결과 DB 연결에 ATTACH하여 비교와 복사를 모두 SQLite 안에서 처리합니다.
+    COMPARE_MODES = ('set', 'merge', 'engine')
+
+    def __init__(self, old_db_path: str, new_db_path: str, result_db_path: str, compare_mode: str = 'set',
+                 detect_changes: bool = False, workers: int = 1, use_manifest: bool = False,
+                 old_snapshot: Optional[DatabaseSnapshot] = None, new_snapshot: Optional[DatabaseSnapshot] = None,
+                 patch_path: Optional[str] = None):
+        """
+        detect_changes=True이면 공통 테이블을 compare_mode 대신 행 단위로 비교하여 변경/삭제된 행도 찾습니다.
+        workers가 2 이상이면 공통 테이블을 여러 프로세스에서 나누어 비교합니다.
+        use_manifest=True이면 두 DB의 테이블별 매니페스트(행 수, 최대 updateTimestamp_, 최대 rowid, 내용 체크섬)를 먼저 비교하여
+        값이 같은 테이블은 비교하지 않습니다. 매니페스트는 각 DB 옆의 보조 DB('<DB>.index')에 저장되어 재사용됩니다.
+        old_snapshot/new_snapshot을 넘기면 그 연결과 키 집합을 사용하며, 'with' 구문이 끝나도 닫지 않습니다.
+        patch_path를 넘기면 미러 DB에 적용할 수 있는 패치(INSERT/UPDATE/DELETE)도 저장합니다. (detect_changes=True로 비교)
+        """
+        if compare_mode not in self.COMPARE_MODES:
+            raise ValueError(f"지원하지 않는 비교 방식입니다: {compare_mode}")
         self.old_db_path = old_db_path
         self.new_db_path = new_db_path
         self.result_db_path = result_db_path
+        self.compare_mode = compare_mode
+        self.patch_path = patch_path
+        self.detect_changes = detect_changes or bool(patch_path)
+        self.workers = workers
+        self.use_manifest = use_manifest
         self.total_added_count = 0
+        self.total_modified_count = 0
+        self.total_removed_count = 0
         
         # 데이터베이스 연결 객체 초기화
+        self.old_snapshot = old_snapshot
+        self.new_snapshot = new_snapshot
+        self._owned_snapshots = []
         self.conn_old = None
         self.conn_new = None
         self.conn_result = None
+        self.writer = None
+        self.conn_patch = None
+        self.patch = None
 
     def __enter__(self):
-        """'with' 구문 사용 시 DB 연결을 자동으로 엽니다."""
-        self.conn_old = sqlite3.connect(self.old_db_path)
-        self.conn_new = sqlite3.connect(self.new_db_path)
-        self.conn_result = sqlite3.connect(self.result_db_path)
+        """
+        'with' 구문 사용 시 DB 연결을 자동으로 엽니다. 비교 대상 DB는 읽기 전용으로 엽니다.
+        결과 DB는 _ResultWriter를 통해 하나의 트랜잭션으로 쓰며, 'with' 구문이 오류 없이 끝날 때만 커밋됩니다.
+        """
+        if self.old_snapshot is None:
+            self.old_snapshot = DatabaseSnapshot(self.old_db_path)
+            self._owned_snapshots.append(self.old_snapshot)
+        if self.new_snapshot is None:
+            self.new_snapshot = DatabaseSnapshot(self.new_db_path)
+            self._owned_snapshots.append(self.new_snapshot)
+        self.conn_old = self.old_snapshot.conn
+        self.conn_new = self.new_snapshot.conn
+        self.conn_result = sqlite3.connect(file_uri(self.result_db_path), uri=True, isolation_level=None)
+        self.writer = _ResultWriter(self.conn_result)
+        if self.compare_mode == 'merge' or self.detect_changes:
+            # 키 순서 정렬은 SQLite가 처리하므로, 큰 테이블도 메모리 대신 임시 파일에서 정렬하도록 합니다.
+            for conn in (self.conn_old, self.conn_new):
+                conn.execute('PRAGMA temp_store = FILE')
+        if self.compare_mode == 'engine':
+            # 결과 DB 연결(main)에 기존 DB(old_db)와 신규 DB(new_db)를 붙여 한 연결에서 함께 다룹니다.
+            # (트랜잭션 안에서는 ATTACH할 수 없으므로 트랜잭션 시작 전에 붙입니다.)
+            self.conn_result.execute("ATTACH DATABASE ? AS old_db", (file_uri(self.old_db_path, mode='ro', immutable=1),))
+            self.conn_result.execute("ATTACH DATABASE ? AS new_db", (file_uri(self.new_db_path, mode='ro', immutable=1),))
+        self.writer.begin()
+        if self.patch_path:
+            self.conn_patch = sqlite3.connect(file_uri(self.patch_path), uri=True, isolation_level=None)
+            self.patch = _PatchWriter(self.conn_patch)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """'with' 구문 종료 시 DB 연결을 자동으로 닫습니다."""
-        if self.conn_old: self.conn_old.close()
-        if self.conn_new: self.conn_new.close()
-        if self.conn_result: self.conn_result.close()
+        """
+        'with' 구문 종료 시 결과 DB와 패치를 커밋하고 DB 연결을 자동으로 닫습니다.
+        중간에 오류가 났으면 커밋하지 않고, 일부만 쓰인 결과 DB와 패치 파일을 지웁니다.
+        (멀쩡해 보이는 일부 패치가 나중에 --apply로 미러 DB에 적용되지 않도록)
+        """
+        failed = exc_type is not None
+        try:
+            if failed:
+                if self.writer: self.writer.abort()
+                if self.patch: self.patch.abort()
+            else:
+                if self.writer: self.writer.finish()
+                if self.patch: self.patch.finish()
+        finally:
+            if self.conn_patch: self.conn_patch.close()
+            for snapshot in self._owned_snapshots:
+                snapshot.close()
+            if self.conn_result: self.conn_result.close()
+        if failed:
+            for path in (self.result_db_path, self.patch_path):
+                if path and os.path.exists(path):
+                    os.remove(path)
+                    logging.warning(f"⚠️ 작업이 중단되어 일부만 저장된 '{path}' 파일을 삭제했습니다.")
 
     def run_comparison(self):
         """데이터베이스 비교 및 추출 작업을 실행합니다."""
@@ -52,6 +403,13 @@ class DatabaseComparer:
 
         common_tables = sorted(list(old_tables.intersection(new_tables)))
         new_only_tables = sorted(list(new_tables - old_tables))
+        old_only_tables = sorted(list(old_tables - new_tables))
+
+        if old_only_tables:
+            logging.info(f"🗑️ 신규 DB에서 삭제된 테이블: {old_only_tables}")
+            if self.patch:
+                for table_name in old_only_tables:
+                    self.patch.drop_table(table_name)
 
         if not common_tables and not new_only_tables:
             logging.warning("\n!!! 경고: 비교할 테이블이 하나도 없습니다. 작업을 종료합니다.")
@@ -74,57 +432,507 @@ class DatabaseComparer:
         cursor.execute(f'PRAGMA table_info("{table_name}")')
         return [row[1] for row in cursor.fetchall()]
 
-    def _find_key_column(self, table_name: str) -> Optional[str]:
-        """테이블에서 사용할 기준 키 컬럼을 찾습니다."""
+    def _get_column_types(self, conn: sqlite3.Connection, table_name: str) -> List[Tuple[str, str]]:
+        """특정 테이블의 (컬럼 이름, 선언된 타입) 목록을 반환합니다."""
+        cursor = conn.cursor()
+        cursor.execute(f'PRAGMA table_info("{table_name}")')
+        return [(row[1], row[2]) for row in cursor.fetchall()]
+
+    def _find_key_columns(self, table_name: str) -> List[str]:
+        """
+        테이블에서 사용할 기준 키 컬럼 목록을 찾습니다. (없으면 빈 목록)
+        KEY_COLUMNS가 없으면 PRIMARY KEY 또는 UNIQUE 인덱스로 선언된 컬럼(여러 컬럼으로 된 키 포함)을 사용합니다.
+        """
         columns = self._get_column_names(self.conn_old, table_name)
         for key in self.KEY_COLUMNS:
             if key in columns:
-                return key
-        return None
+                return [key]
+        return self._find_declared_key_columns(table_name)
+
+    def _find_declared_key_columns(self, table_name: str) -> List[str]:
+        """
+        기존 DB 테이블에 PRIMARY KEY 또는 UNIQUE 인덱스로 선언된 컬럼 목록을 선언 순서대로 찾습니다.
+        PRIMARY KEY를 먼저 사용하고, UNIQUE 인덱스는 컬럼 수가 적은 것부터 사용합니다.
+        (표현식 인덱스와 KEY_COLUMN_SEPARATOR가 들어간 컬럼 이름은 패치에 저장할 수 없으므로 제외)
+        """
+        cursor = self.conn_old.cursor()
+        cursor.execute(f'PRAGMA table_info("{table_name}")')
+        # pk는 PRIMARY KEY 안에서의 순번(1부터)이며, PRIMARY KEY가 아닌 컬럼은 0입니다.
+        pk_rows = sorted((row for row in cursor.fetchall() if row[5]), key=lambda row: row[5])
+        candidates = [[row[1] for row in pk_rows]] if pk_rows else []
+
+        cursor.execute(f'PRAGMA index_list("{table_name}")')
+        # (seq, name, unique, origin, partial) 중 조건 없는 UNIQUE 인덱스만 사용
+        unique_indexes = [row[1] for row in cursor.fetchall() if row[2] and not row[4]]
+        index_candidates = []
+        for index_name in unique_indexes:
+            cursor.execute(f'PRAGMA index_info("{index_name}")')
+            index_candidates.append([row[2] for row in sorted(cursor.fetchall())])
+        candidates.extend(sorted(index_candidates, key=len))
+
+        for key_columns in candidates:
+            if key_columns and all(c is not None and KEY_COLUMN_SEPARATOR not in c for c in key_columns):
+                return key_columns
+        return []
 
     def _process_common_tables(self, tables: List[str]):
         """두 데이터베이스에 공통으로 존재하는 테이블들을 비교하고 처리합니다."""
         logging.info(f"\n--- 3. 공통 테이블 비교 시작 ---")
         logging.info(f"공통 테이블: {tables}")
+        if self.use_manifest:
+            tables = self._skip_unchanged_tables(tables)
+        if self.workers > 1 and len(tables) > 1:
+            self._process_common_tables_parallel(tables)
+            return
         for table_name in tables:
-            logging.info(f"\n▶ '{table_name}' 테이블 비교 중...")
-            key_column = self._find_key_column(table_name)
+            self._compare_common_table(table_name)
+
+    def _skip_unchanged_tables(self, tables: List[str]) -> List[str]:
+        """두 DB의 매니페스트가 같은 테이블을 제외하고, 비교가 필요한 테이블만 반환합니다."""
+        old_manifest = load_table_manifest(self.old_db_path)
+        new_manifest = load_table_manifest(self.new_db_path)
+        changed_tables = [table_name for table_name in tables if old_manifest.get(table_name) != new_manifest.get(table_name)]
+        skipped_count = len(tables) - len(changed_tables)
+        if skipped_count:
+            logging.info(f"   -> 매니페스트가 같은 테이블 {skipped_count}개는 변경이 없어 건너뜁니다.")
+        logging.info(f"   -> 비교할 테이블: {changed_tables}")
+        return changed_tables
+
+    def _process_common_tables_parallel(self, tables: List[str]):
+        """
+        공통 테이블을 작업 프로세스들에 나누어 비교합니다. 각 작업은 자신만의 읽기 연결로 비교한 결과를
+        임시 결과 DB(패치를 만들 때는 임시 패치 파일도)에 저장하고,
+        결과 DB에는 이 프로세스만 테이블 순서대로 합쳐 씁니다. (단일 writer)
+        """
+        with tempfile.TemporaryDirectory(prefix='compare_all_') as shard_dir, \
+                ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker_logging) as pool:
+            futures = [
+                pool.submit(_compare_table_in_worker, self.old_db_path, self.new_db_path,
+                            os.path.join(shard_dir, f'{index}.db'), table_name, self.compare_mode, self.detect_changes,
+                            os.path.join(shard_dir, f'{index}{PATCH_SUFFIX}') if self.patch else None)
+                for index, table_name in enumerate(tables)
+            ]
+            for future in futures:
+                shard_path, patch_shard_path, log_records, (added, modified, removed) = future.result()
+                # 작업 프로세스의 로그를 테이블 순서대로 출력
+                for level, message in log_records:
+                    logging.log(level, message)
+                self.total_added_count += added
+                self.total_modified_count += modified
+                self.total_removed_count += removed
+                self._merge_result_shard(shard_path)
+                if patch_shard_path:
+                    conn_shard = connect_readonly(patch_shard_path)
+                    try:
+                        self.patch.merge_shard(conn_shard)
+                    finally:
+                        conn_shard.close()
+
+    def _merge_result_shard(self, shard_path: str):
+        """작업 프로세스가 만든 임시 결과 DB의 테이블들을 결과 DB로 옮깁니다. (결과 DB의 트랜잭션 안에서 읽어 옮김)"""
+        conn_shard = connect_readonly(shard_path)
+        try:
+            table_names = [row[0] for row in conn_shard.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+            for table_name in table_names:
+                self.writer.create_table(table_name, *_read_table_schema(conn_shard, table_name))
+                cursor = conn_shard.execute(f'SELECT * FROM "{table_name}"')
+                self.writer.append(table_name, _iter_fetchmany(cursor))
+        finally:
+            conn_shard.close()
+
+    def _compare_common_table(self, table_name: str):
+        """공통 테이블 하나를 비교하여 결과를 결과 DB에 저장합니다."""
+        logging.info(f"\n▶ '{table_name}' 테이블 비교 중...")
+        key_columns = self._find_key_columns(table_name)
+
+        if not key_columns:
+            logging.info("   -> 기준 컬럼이 없어 행 내용의 해시로 비교합니다.")
+            self._diff_table_by_row_hash(table_name)
+            return
 
-            if not key_column:
-                logging.warning(f"   !!! 경고: '{table_name}' 테이블에 기준 컬럼이 없어 건너뜁니다.")
+        logging.info(f"   -> 기준 컬럼 {', '.join(repr(c) for c in key_columns)}(으)로 비교를 시작합니다.")
+        if self.detect_changes:
+            self._diff_common_table_rows(table_name, key_columns)
+            return
+        if self.compare_mode == 'merge' or len(key_columns) > 1:
+            # 여러 컬럼으로 된 키는 키 집합/IN 조건 대신 정렬 병합으로 비교합니다.
+            self._merge_common_table(table_name, key_columns)
+            return
+        key_column = key_columns[0]
+        if self.compare_mode == 'engine':
+            self._diff_common_table_in_engine(table_name, key_column)
+            return
+
+        try:
+            # 기존 DB와 신규 DB에서 키 값들을 가져옴 (스냅샷에 이미 읽어 둔 키 집합이 있으면 재사용)
+            ids_old = self.old_snapshot.key_set(table_name, key_column)
+            ids_new = self.new_snapshot.key_set(table_name, key_column)
+
+            # 신규 DB에만 있는 ID를 찾음
+            added_ids = sorted(list(ids_new - ids_old))
+            # 체인 비교에서 각 DB는 '신규' 다음에 '기존'으로 쓰이므로, 기존 쪽 키 집합은 여기서 마지막으로 사용됩니다.
+            self.old_snapshot.discard_key_set(table_name, key_column)
+            del ids_old
+
+            if not added_ids:
+                logging.info("   -> 추가된 데이터 없음")
+                return
+
+            logging.info(f"   -> {len(added_ids)}개의 추가된 데이터 발견.")
+            self.total_added_count += len(added_ids)
+            
+            # 추가된 데이터를 결과 DB에 저장
+            self._transfer_data(
+                source_conn=self.conn_new,
+                table_name=table_name,
+                filter_column=key_column,
+                filter_values=added_ids
+            )
+            logging.info(f"   -> '{table_name}' 테이블에 추가된 데이터 저장 완료")
+        except sqlite3.Error as e:
+            logging.error(f"   !!! '{table_name}' 테이블 처리 중 데이터베이스 오류 발생: {e}")
+
+    def _merge_common_table(self, table_name: str, key_columns: List[str]):
+        """
+        두 테이블을 키 순서로 정렬해 커서 두 개로 함께 읽으면서(정렬 병합) 신규 DB에만 있는 키의 행을 바로 결과 DB에 저장합니다.
+        키나 행을 메모리에 모아 두지 않으므로 테이블 크기와 관계없이 메모리 사용량이 일정합니다.
+        여러 컬럼으로 된 키는 컬럼 값들의 조합을 하나의 키로 비교합니다.
+        """
+        try:
+            key_list = _quote_columns(key_columns)
+            cursor_old = self.conn_old.cursor()
+            cursor_old.execute(f'SELECT DISTINCT {key_list} FROM "{table_name}" ORDER BY {key_list}')
+
+            cursor_new = self.conn_new.cursor()
+            cursor_new.execute(f'SELECT * FROM "{table_name}" ORDER BY {key_list}')
+            new_columns = [column[0] for column in cursor_new.description]
+            key_indexes = [new_columns.index(c) for c in key_columns]
+
+            stats = {'added_keys': 0}
+            added_rows = self._iter_added_rows(cursor_old, cursor_new, key_indexes, stats)
+            self._write_rows(self.conn_new, table_name, added_rows)
+
+            if not stats['added_keys']:
+                logging.info("   -> 추가된 데이터 없음")
+                return
+
+            logging.info(f"   -> {stats['added_keys']}개의 추가된 데이터 발견.")
+            self.total_added_count += stats['added_keys']
+            logging.info(f"   -> '{table_name}' 테이블에 추가된 데이터 저장 완료")
+        except sqlite3.Error as e:
+            logging.error(f"   !!! '{table_name}' 테이블 처리 중 데이터베이스 오류 발생: {e}")
+
+    @staticmethod
+    def _iter_added_rows(cursor_old: sqlite3.Cursor, cursor_new: sqlite3.Cursor, key_indexes: List[int], stats: dict):
+        """
+        키 순서로 정렬된 기존 DB의 키와 신규 DB의 행을 함께 읽으며, 기존 DB에 없는 키의 행을 순서대로 반환합니다.
+        추가된 키의 개수는 stats['added_keys']에 기록합니다.
+        """
+        old_keys = iter(cursor_old)
+        old_key = next(old_keys, _END)
+        old_sort_key = None if old_key is _END else _key_sort_key(old_key)
+        last_added = None
+
+        for row in cursor_new:
+            key = tuple(row[i] for i in key_indexes)
+            sort_key = _key_sort_key(key)
+            # 기존 DB 쪽 커서를 현재 키 위치까지 이동
+            while old_key is not _END and old_sort_key < sort_key:
+                old_key = next(old_keys, _END)
+                old_sort_key = None if old_key is _END else _key_sort_key(old_key)
+            if old_key is not _END and old_sort_key == sort_key:
                 continue
 
-            logging.info(f"   -> 기준 컬럼 '{key_column}'(으)로 비교를 시작합니다.")
-            try:
-                # 기존 DB와 신규 DB에서 키 값들을 가져옴
-                cursor_old = self.conn_old.cursor()
-                cursor_old.execute(f'SELECT "{key_column}" FROM "{table_name}"')
-                ids_old = {row[0] for row in cursor_old.fetchall()}
+            if sort_key != last_added:
+                stats['added_keys'] += 1
+                last_added = sort_key
+            # set 방식과 같이 NULL이 들어간 키는 개수에만 포함되고 행은 저장되지 않습니다. (IN 조건에 NULL은 일치하지 않음)
+            if None not in key:
+                yield row
 
-                cursor_new = self.conn_new.cursor()
-                cursor_new.execute(f'SELECT "{key_column}" FROM "{table_name}"')
-                ids_new = {row[0] for row in cursor_new.fetchall()}
+    def _diff_common_table_rows(self, table_name: str, key_columns: List[str]):
+        """
+        두 테이블의 모든 행을 키 순서로 함께 읽으며(정렬 병합) 행 단위로 비교합니다.
+        - 신규 DB에만 있는 키의 행: 추가 (원래 테이블 이름으로 저장, 다른 비교 방식과 같은 결과)
+        - 양쪽에 있는 키의 행 중 내용이 바뀐 행: 변경 ('<테이블>__modified', 바뀐 컬럼은 changedColumns_)
+        - 기존 DB에만 있는 행: 삭제 ('<테이블>__removed')
+        컬럼 구성은 신규 DB 기준이며, 메모리에는 같은 키를 가진 행들만 올라갑니다. (여러 컬럼으로 된 키는 값의 조합이 같은 행들)
+        패치를 만들 때는 같은 내용을 INSERT/UPDATE/DELETE 작업으로도 기록합니다. (NULL 키의 행 포함)
+        """
+        try:
+            columns = self._get_column_names(self.conn_new, table_name)
+            if not set(key_columns).issubset(columns):
+                logging.warning(f"   !!! 경고: 신규 DB의 '{table_name}' 테이블에 기준 컬럼이 없어 건너뜁니다.")
+                return
+            key_indexes = [columns.index(c) for c in key_columns]
+            key_list = _quote_columns(key_columns)
 
-                # 신규 DB에만 있는 ID를 찾음
-                added_ids = sorted(list(ids_new - ids_old))
+            # 기존 DB의 행을 신규 DB의 컬럼 순서에 맞춰 읽음 (신규 DB에서 새로 생긴 컬럼은 NULL)
+            old_columns = set(self._get_column_names(self.conn_old, table_name))
+            old_select = ', '.join(f'"{c}"' if c in old_columns else f'NULL AS "{c}"' for c in columns)
+            cursor_old = self.conn_old.cursor()
+            cursor_old.execute(f'SELECT {old_select} FROM "{table_name}" ORDER BY {key_list}')
+            cursor_new = self.conn_new.cursor()
+            cursor_new.execute(f'SELECT * FROM "{table_name}" ORDER BY {key_list}')
 
-                if not added_ids:
-                    logging.info("   -> 추가된 데이터 없음")
-                    continue
+            column_types = self._get_column_types(self.conn_new, table_name)
+            modified_name = table_name + MODIFIED_TABLE_SUFFIX
+            removed_name = table_name + REMOVED_TABLE_SUFFIX
+            added = _ResultTableBuffer(self.writer, table_name,
+                                       lambda: self._create_result_table(self.conn_new, table_name))
+            modified = _ResultTableBuffer(self.writer, modified_name, lambda: self._create_result_table_from_columns(
+                modified_name, column_types + [(CHANGED_COLUMNS_COLUMN, 'TEXT')]))
+            removed = _ResultTableBuffer(self.writer, removed_name,
+                                         lambda: self._create_result_table_from_columns(removed_name, column_types))
+            patch_ops = self.patch.table(table_name, key_columns, column_types) if self.patch else None
 
-                logging.info(f"   -> {len(added_ids)}개의 추가된 데이터 발견.")
-                self.total_added_count += len(added_ids)
-                
-                # 추가된 데이터를 결과 DB에 저장
-                self._transfer_data(
-                    source_conn=self.conn_new,
-                    table_name=table_name,
-                    filter_column=key_column,
-                    filter_values=added_ids
-                )
-                logging.info(f"   -> '{table_name}' 테이블에 추가된 데이터 저장 완료")
-            except sqlite3.Error as e:
-                logging.error(f"   !!! '{table_name}' 테이블 처리 중 데이터베이스 오류 발생: {e}")
+            added_keys = 0
+            for old_rows, new_rows in self._iter_paired_groups(cursor_old, cursor_new, key_indexes):
+                if not old_rows:
+                    added_keys += 1
+                    # set 방식과 같이 NULL이 들어간 키는 개수에만 포함되고 행은 저장되지 않습니다.
+                    if all(new_rows[0][i] is not None for i in key_indexes):
+                        for row in new_rows:
+                            added.add(row)
+                    if patch_ops:
+                        for row in new_rows:
+                            patch_ops.add(('INSERT',) + row)
+                elif not new_rows:
+                    for row in old_rows:
+                        removed.add(row)
+                    # DELETE는 기준 컬럼 값으로 적용되므로 키마다 한 번만 기록합니다.
+                    if patch_ops:
+                        patch_ops.add(('DELETE',) + old_rows[0])
+                else:
+                    self._diff_key_group(columns, old_rows, new_rows, modified, removed, patch_ops)
+
+            for buffer in (added, modified, removed, patch_ops):
+                if buffer:
+                    buffer.flush()
+
+            if added_keys:
+                logging.info(f"   -> {added_keys}개의 추가된 데이터 발견.")
+                self.total_added_count += added_keys
+            else:
+                logging.info("   -> 추가된 데이터 없음")
+            if modified.count or removed.count:
+                logging.info(f"   -> 변경된 데이터 {modified.count}개, 삭제된 데이터 {removed.count}개 발견.")
+                self.total_modified_count += modified.count
+                self.total_removed_count += removed.count
+            if added.count or modified.count or removed.count:
+                logging.info(f"   -> '{table_name}' 테이블의 비교 결과 저장 완료")
+        except sqlite3.Error as e:
+            logging.error(f"   !!! '{table_name}' 테이블 처리 중 데이터베이스 오류 발생: {e}")
+
+    @staticmethod
+    def _iter_paired_groups(cursor_old: sqlite3.Cursor, cursor_new: sqlite3.Cursor, key_indexes: List[int]):
+        """
+        키 순서로 정렬된 두 커서를 함께 읽으며 키마다 (기존 행 목록, 신규 행 목록)을 반환합니다.
+        한쪽에만 있는 키는 다른 쪽 목록이 비어 있습니다.
+        """
+        old_groups = _iter_key_groups(cursor_old, key_indexes)
+        new_groups = _iter_key_groups(cursor_new, key_indexes)
+        old = next(old_groups, None)
+        new = next(new_groups, None)
+        while old is not None or new is not None:
+            if new is None or (old is not None and old[0] < new[0]):
+                yield old[1], []
+                old = next(old_groups, None)
+            elif old is None or new[0] < old[0]:
+                yield [], new[1]
+                new = next(new_groups, None)
+            else:
+                yield old[1], new[1]
+                old = next(old_groups, None)
+                new = next(new_groups, None)
+
+    @staticmethod
+    def _diff_key_group(columns: List[str], old_rows: list, new_rows: list,
+                        modified: _ResultTableBuffer, removed: _ResultTableBuffer,
+                        patch_ops: Optional[_ResultTableBuffer] = None):
+        """
+        같은 키를 가진 기존/신규 행들을 비교합니다. 내용이 같은 행끼리 먼저 짝지어 제외하고,
+        남은 행은 순서대로 짝지어 변경으로 기록합니다. 짝이 없는 신규 행은 changedColumns_를 '*'로,
+        짝이 없는 기존 행은 삭제로 기록합니다.
+        행 내용은 행 튜플의 해시(C로 구현된 파이썬 내장 해시)로 찾으므로 행마다 드는 비용이 작습니다.
+        값 비교는 SQLite와 같이 1과 1.0을 같은 값으로 봅니다.
+        patch_ops가 있으면 키가 한 행씩만 있는 경우는 UPDATE로, 그 외에 바뀐 행이 있으면
+        키의 행을 모두 지우는 DELETE 하나와 신규 행 전체의 INSERT로 기록합니다.
+        """
+        if len(old_rows) == 1 and len(new_rows) == 1:
+            if old_rows[0] == new_rows[0]:
+                return
+            remaining_old, changed_new = old_rows, new_rows
+        else:
+            old_by_row = {}
+            for index, row in enumerate(old_rows):
+                old_by_row.setdefault(row, []).append(index)
+            matched_old = set()
+            changed_new = []
+            for row in new_rows:
+                same = old_by_row.get(row)
+                if same:
+                    matched_old.add(same.pop())
+                else:
+                    changed_new.append(row)
+            remaining_old = [row for index, row in enumerate(old_rows) if index not in matched_old]
+
+        for old_row, new_row in zip(remaining_old, changed_new):
+            changed = [name for name, old_value, new_value in zip(columns, old_row, new_row) if old_value != new_value]
+            modified.add(new_row + (','.join(changed),))
+        for new_row in changed_new[len(remaining_old):]:
+            modified.add(new_row + ('*',))
+        for old_row in remaining_old[len(changed_new):]:
+            removed.add(old_row)
+
+        if not patch_ops or not (remaining_old or changed_new):
+            return
+        if len(old_rows) == 1 and len(new_rows) == 1:
+            patch_ops.add(('UPDATE',) + new_rows[0])
+        else:
+            patch_ops.add(('DELETE',) + old_rows[0])
+            for new_row in new_rows:
+                patch_ops.add(('INSERT',) + new_row)
+
+    def _diff_table_by_row_hash(self, table_name: str):
+        """
+        기준 컬럼이 없는 테이블을 행 내용의 해시로 비교합니다. (rowid를 사용하지 않음)
+        두 테이블의 행 해시를 결과 DB 연결의 임시 테이블에 저장한 뒤, 해시별 개수를 빼는 다중집합 차이로
+        신규 DB에만 있는 행(추가)을 찾습니다. detect_changes=True이면 기존 DB에만 있는 행(삭제)도 찾습니다.
+        메모리에는 해시를 모아 두지 않으며, 임시 테이블은 커지면 SQLite가 임시 파일로 내보냅니다.
+        해시를 저장할 때와 행을 다시 읽을 때 같은 순번(ord)이 같은 행을 가리키도록 두 쿼리 모두 순서를 명시합니다.
+        키가 없으므로 변경된 행은 삭제 + 추가로 기록되며(패치도 DELETE + INSERT), 추가된 데이터 개수는 행 수로 셉니다.
+        """
+        try:
+            columns = self._get_column_names(self.conn_new, table_name)
+            old_columns = set(self._get_column_names(self.conn_old, table_name))
+            old_select = ', '.join(f'"{c}"' if c in old_columns else f'NULL AS "{c}"' for c in columns)
+            old_query = f'SELECT {old_select} FROM "{table_name}" {self._row_order_clause(self.conn_old, table_name)}'
+            new_query = f'SELECT * FROM "{table_name}" {self._row_order_clause(self.conn_new, table_name)}'
+
+            cursor = self.conn_result.cursor()
+            for hash_table, source_conn, query in (('old_row_hash', self.conn_old, old_query),
+                                                   ('new_row_hash', self.conn_new, new_query)):
+                cursor.execute(f"DROP TABLE IF EXISTS temp.{hash_table}")
+                cursor.execute(f"CREATE TEMP TABLE {hash_table} (ord INTEGER PRIMARY KEY, hash INTEGER NOT NULL)")
+                rows = _iter_fetchmany(source_conn.execute(query))
+                cursor.executemany(f"INSERT INTO temp.{hash_table} VALUES (?, ?)",
+                                   ((ordinal, _row_hash(row)) for ordinal, row in enumerate(rows)))
+
+            column_types = self._get_column_types(self.conn_new, table_name)
+            patch_ops = self.patch.table(table_name, None, column_types) if self.patch else None
+            added = _ResultTableBuffer(self.writer, table_name,
+                                       lambda: self._create_result_table(self.conn_new, table_name))
+            for row in _iter_rows_at(_iter_fetchmany(self.conn_new.execute(new_query)),
+                                     self._iter_unmatched_ordinals('new_row_hash', 'old_row_hash')):
+                added.add(row)
+                if patch_ops:
+                    patch_ops.add(('INSERT',) + row)
+            added.flush()
+
+            removed_count = 0
+            if self.detect_changes:
+                removed_name = table_name + REMOVED_TABLE_SUFFIX
+                removed = _ResultTableBuffer(self.writer, removed_name,
+                                             lambda: self._create_result_table_from_columns(removed_name, column_types))
+                for row in _iter_rows_at(_iter_fetchmany(self.conn_old.execute(old_query)),
+                                         self._iter_unmatched_ordinals('old_row_hash', 'new_row_hash')):
+                    removed.add(row)
+                    if patch_ops:
+                        patch_ops.add(('DELETE',) + row)
+                removed.flush()
+                removed_count = removed.count
+            if patch_ops:
+                patch_ops.flush()
+
+            if added.count:
+                logging.info(f"   -> {added.count}개의 추가된 데이터 발견.")
+                self.total_added_count += added.count
+            else:
+                logging.info("   -> 추가된 데이터 없음")
+            if removed_count:
+                logging.info(f"   -> 삭제된 데이터 {removed_count}개 발견.")
+                self.total_removed_count += removed_count
+            if added.count or removed_count:
+                logging.info(f"   -> '{table_name}' 테이블의 비교 결과 저장 완료")
+        except sqlite3.Error as e:
+            logging.error(f"   !!! '{table_name}' 테이블 처리 중 데이터베이스 오류 발생: {e}")
+        finally:
+            self.conn_result.execute("DROP TABLE IF EXISTS temp.old_row_hash")
+            self.conn_result.execute("DROP TABLE IF EXISTS temp.new_row_hash")
+
+    @staticmethod
+    def _row_order_clause(conn: sqlite3.Connection, table_name: str) -> str:
+        """
+        테이블의 행을 항상 같은 순서로 읽기 위한 ORDER BY 절을 반환합니다.
+        rowid가 있으면 rowid 순, WITHOUT ROWID 테이블이면 SELECT한 모든 컬럼 순으로 정렬합니다.
+        """
+        try:
+            conn.execute(f'SELECT rowid FROM "{table_name}" LIMIT 0')
+            return 'ORDER BY rowid'
+        except sqlite3.OperationalError:
+            column_count = len(conn.execute(f'PRAGMA table_info("{table_name}")').fetchall())
+            return 'ORDER BY ' + ', '.join(str(i) for i in range(1, column_count + 1))
+
+    def _iter_unmatched_ordinals(self, hash_table: str, other_hash_table: str):
+        """
+        hash_table의 행 중 other_hash_table에 짝이 없는 행의 순번을 오름차순으로 반환합니다.
+        같은 해시가 여러 번 나오면 앞에서부터 other_hash_table의 같은 해시 개수만큼 짝이 있는 것으로 봅니다.
+        """
+        cursor = self.conn_result.cursor()
+        cursor.execute(
+            f"SELECT side.ord FROM ("
+            f"  SELECT ord, hash, ROW_NUMBER() OVER (PARTITION BY hash ORDER BY ord) AS rn FROM temp.{hash_table}"
+            f") AS side LEFT JOIN ("
+            f"  SELECT hash, COUNT(*) AS n FROM temp.{other_hash_table} GROUP BY hash"
+            f") AS other ON side.hash = other.hash "
+            f"WHERE side.rn > COALESCE(other.n, 0) ORDER BY side.ord"
+        )
+        return (row[0] for row in _iter_fetchmany(cursor))
+
+    def _diff_common_table_in_engine(self, table_name: str, key_column: str):
+        """
+        추가된 키 계산(EXCEPT)과 결과 DB로의 복사(INSERT ... SELECT)를 SQLite 안에서 처리합니다.
+        키와 행이 파이썬으로 넘어오지 않으며, IN (?, ?, ...) 목록을 쓰지 않으므로 변수 개수 제한도 받지 않습니다.
+        """
+        try:
+            cursor = self.conn_result.cursor()
+            # 신규 DB에만 있는 키 (EXCEPT는 set 방식과 같이 중복을 제거하고 NULL도 하나의 값으로 취급)
+            cursor.execute("DROP TABLE IF EXISTS temp.added_key")
+            cursor.execute(
+                f'CREATE TEMP TABLE added_key AS '
+                f'SELECT "{key_column}" AS key FROM new_db."{table_name}" '
+                f'EXCEPT SELECT "{key_column}" FROM old_db."{table_name}"'
+            )
+            added_count = cursor.execute("SELECT COUNT(*) FROM temp.added_key").fetchone()[0]
+
+            if not added_count:
+                logging.info("   -> 추가된 데이터 없음")
+                return
+
+            logging.info(f"   -> {added_count}개의 추가된 데이터 발견.")
+            self.total_added_count += added_count
+
+            self._copy_rows_in_engine(
+                table_name, f'WHERE "{key_column}" IN (SELECT key FROM temp.added_key)'
+            )
+            logging.info(f"   -> '{table_name}' 테이블에 추가된 데이터 저장 완료")
+        except sqlite3.Error as e:
+            logging.error(f"   !!! '{table_name}' 테이블 처리 중 데이터베이스 오류 발생: {e}")
+        finally:
+            self.conn_result.execute("DROP TABLE IF EXISTS temp.added_key")
+
+    def _copy_rows_in_engine(self, table_name: str, where_clause: str = '') -> int:
+        """신규 DB 테이블의 행을 INSERT ... SELECT로 결과 DB에 바로 복사하고, 복사된 행의 수를 반환합니다."""
+        self._create_result_table(self.conn_new, table_name)
+        cursor = self.conn_result.cursor()
+        cursor.execute(f'INSERT INTO main."{table_name}" SELECT * FROM new_db."{table_name}" {where_clause}')
+        copied_count = cursor.rowcount
+
+        # 다른 방식과 같이 저장된 행이 없으면 결과 DB에 테이블을 남기지 않습니다.
+        if copied_count == 0:
+            self.writer.drop_table(table_name)
+        return copied_count
 
     def _process_new_tables(self, tables: List[str]):
         """신규 데이터베이스에만 존재하는 테이블 전체를 복사합니다."""
@@ -138,7 +946,12 @@ class DatabaseComparer:
             logging.info(f"\n▶ '{table_name}' 테이블 전체 데이터 추출 중...")
             try:
                 # 테이블의 모든 데이터를 결과 DB에 저장
-                count = self._transfer_data(self.conn_new, table_name)
+                if self.compare_mode == 'engine':
+                    count = self._copy_rows_in_engine(table_name)
+                else:
+                    count = self._transfer_data(self.conn_new, table_name)
+                if self.patch:
+                    self._add_new_table_to_patch(table_name)
                 if count > 0:
                     self.total_added_count += count
                     logging.info(f"   -> '{table_name}' 테이블에 {count}개의 데이터를 저장 완료했습니다.")
@@ -148,88 +961,356 @@ class DatabaseComparer:
             except sqlite3.Error as e:
                 logging.error(f"   !!! '{table_name}' 테이블 처리 중 오류 발생: {e}")
 
+    def _add_new_table_to_patch(self, table_name: str):
+        """신규 DB에만 있는 테이블을 패치에 기록합니다. (적용 시 테이블을 새로 만들고 모든 행을 INSERT)"""
+        create_table_sql = _read_table_schema(self.conn_new, table_name)[0]
+        patch_ops = self.patch.table(table_name, None, self._get_column_types(self.conn_new, table_name), create_table_sql)
+        for row in _iter_fetchmany(self.conn_new.execute(f'SELECT * FROM "{table_name}"')):
+            patch_ops.add(('INSERT',) + row)
+        patch_ops.flush()
+
     def _transfer_data(self, source_conn: sqlite3.Connection, table_name: str, 
                          filter_column: Optional[str] = None, filter_values: Optional[List] = None) -> int:
-        """소스 DB에서 데이터를 읽어 결과 DB에 저장하고, 저장된 행의 수를 반환합니다."""
+        """
+        소스 DB에서 데이터를 fetchmany 단위로 읽어 결과 DB에 저장하고, 저장된 행의 수를 반환합니다.
+        filter_values는 IN (?, ?, ...) 목록 대신 소스 연결의 임시 테이블에 넣고 IN (SELECT ...)로 거르므로
+        키가 아무리 많아도 SQLite의 변수 개수 제한(SQLITE_MAX_VARIABLE_NUMBER)을 받지 않습니다.
+        """
         source_cursor = source_conn.cursor()
-        
-        query = f'SELECT * FROM "{table_name}"'
-        params = []
-        if filter_column and filter_values:
-            # SQL Injection 방지를 위해 '?' placeholder 사용
-            placeholders = ",".join("?" for _ in filter_values)
-            query += f' WHERE "{filter_column}" IN ({placeholders})'
-            params = filter_values
-
-        source_cursor.execute(query, params)
-        data_to_transfer = source_cursor.fetchall()
-
-        if not data_to_transfer:
+        if not (filter_column and filter_values):
+            source_cursor.execute(f'SELECT * FROM "{table_name}"')
+            return self._write_rows(source_conn, table_name, _iter_fetchmany(source_cursor))
+
+        # 읽기 전용 연결에서도 임시(temp) DB에는 쓸 수 있습니다.
+        source_cursor.execute("DROP TABLE IF EXISTS temp.filter_key")
+        source_cursor.execute("CREATE TEMP TABLE filter_key (key PRIMARY KEY) WITHOUT ROWID")
+        try:
+            source_cursor.executemany("INSERT OR IGNORE INTO temp.filter_key VALUES (?)",
+                                      ((value,) for value in filter_values))
+            source_cursor.execute(f'SELECT * FROM "{table_name}" WHERE "{filter_column}" IN (SELECT key FROM temp.filter_key)')
+            return self._write_rows(source_conn, table_name, _iter_fetchmany(source_cursor))
+        finally:
+            source_conn.execute("DROP TABLE temp.filter_key")
+            source_conn.commit()
+
+    def _write_rows(self, source_conn: sqlite3.Connection, table_name: str, rows) -> int:
+        """
+        행들을 소스 DB와 같은 스키마의 결과 DB 테이블에 저장하고, 저장된 행의 수를 반환합니다.
+        rows는 리스트뿐 아니라 한 행씩 반환하는 이터레이터도 받을 수 있으며, 저장할 행이 없으면 테이블을 만들지 않습니다.
+        """
+        rows = iter(rows)
+        first_row = next(rows, None)
+        if first_row is None:
             return 0
-            
-        # 테이블 스키마(CREATE 문)를 가져와 결과 DB에 테이블 생성
-        source_cursor.execute(f"SELECT sql FROM sqlite_master WHERE type='table' AND name='{table_name}'")
-        create_table_sql = source_cursor.fetchone()[0]
-        
-        result_cursor = self.conn_result.cursor()
-        result_cursor.execute(f"DROP TABLE IF EXISTS \"{table_name}\"")
-        result_cursor.execute(create_table_sql)
-
-        # 데이터 삽입
-        placeholders = ', '.join(['?'] * len(data_to_transfer[0]))
-        result_cursor.executemany(f'INSERT INTO "{table_name}" VALUES ({placeholders})', data_to_transfer)
-        self.conn_result.commit()
-        
-        return len(data_to_transfer)
+
+        self._create_result_table(source_conn, table_name)
+        return self.writer.append(table_name, itertools.chain([first_row], rows))
+
+    def _create_result_table(self, source_conn: sqlite3.Connection, table_name: str):
+        """
+        소스 DB 테이블의 스키마(CREATE 문)를 가져와 결과 DB에 같은 테이블을 만듭니다.
+        소스 테이블의 인덱스는 행을 모두 저장한 뒤 결과 DB를 커밋할 때 만듭니다.
+        """
+        self.writer.create_table(table_name, *_read_table_schema(source_conn, table_name))
+
+    def _create_result_table_from_columns(self, table_name: str, columns: List[Tuple[str, str]]):
+        """(컬럼 이름, 타입) 목록으로 결과 DB에 테이블을 만듭니다. (제약 조건 없이 컬럼만 생성)"""
+        column_defs = ', '.join(f'"{name}" {column_type}'.rstrip() for name, column_type in columns)
+        self.writer.create_table(table_name, f'CREATE TABLE "{table_name}" ({column_defs})')
+
+
+class _WorkerLogHandler(logging.Handler):
+    """작업 프로세스의 로그를 바로 출력하지 않고 모아 두었다가 메인 프로세스에 돌려주기 위한 핸들러."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+_worker_log_handler = _WorkerLogHandler()
+
+
+def _init_worker_logging():
+    """작업 프로세스의 로그가 섞여 출력되지 않도록 모든 로그를 _worker_log_handler에 모읍니다."""
+    root_logger = logging.getLogger()
+    root_logger.handlers[:] = [_worker_log_handler]
+    root_logger.setLevel(logging.INFO)
+
+
+def _compare_table_in_worker(old_db_path: str, new_db_path: str, shard_path: str, table_name: str,
+                             compare_mode: str, detect_changes: bool, patch_shard_path: Optional[str] = None):
+    """
+    작업 프로세스에서 공통 테이블 하나를 비교하여 결과를 shard_path(패치는 patch_shard_path)에 저장하고,
+    (결과 경로, 패치 경로, 로그, 개수)를 반환합니다.
+    """
+    _worker_log_handler.records = []
+    with DatabaseComparer(old_db_path, new_db_path, shard_path, compare_mode, detect_changes,
+                          patch_path=patch_shard_path) as comparer:
+        comparer._compare_common_table(table_name)
+    counts = (comparer.total_added_count, comparer.total_modified_count, comparer.total_removed_count)
+    return shard_path, patch_shard_path, _worker_log_handler.records, counts
 
 
 def find_db_files(directory: str = '.') -> Optional[Tuple[str, str]]:
     """현재 디렉토리에서 비교할 SQLite DB 파일 두 개를 찾습니다."""
+    db_files = find_db_chain(directory)
+    if db_files:
+        old_db, new_db = db_files[0], db_files[1]
+        logging.info("성공: DB 파일 2개를 찾았습니다.")
+        logging.info(f"'{old_db}' (기존 DB)와 '{new_db}' (신규 DB)를 비교합니다.")
+        return old_db, new_db
+    return None
+
+
+def find_db_chain(directory: str = '.') -> Optional[List[str]]:
+    """현재 디렉토리의 SQLite DB 파일들을 수정 시간 순서(이전 → 최신)로 정렬하여 모두 반환합니다."""
     logging.info(f"--- 1. 현재 폴더({os.path.abspath(directory)})에서 파일 찾는 중 ---")
     try:
-        all_files = os.listdir(directory)
-        db_files = [f for f in all_files if f.endswith(('.db', '.sqlite')) and f != '추가목록.db']
+        db_files = list_db_files(directory, SQLITE_DB_EXTENSIONS, exclude=(OUTPUT_DB_NAME,))
 
         if len(db_files) < 2:
-            logging.error("\n!!! 오류: 비교할 DB 파일이 2개 미만입니다. 폴더에 .db 또는 .sqlite 파일 2개가 있는지 확인해 주세요.")
+            logging.error(f"\n!!! 오류: 비교할 DB 파일이 2개 미만입니다. "
+                          f"폴더에 {', '.join(SQLITE_DB_EXTENSIONS)} 파일 2개가 있는지 확인해 주세요.")
             return None
         
         # 파일 수정 시간을 기준으로 정렬하여 이전/최신 DB를 구분
         db_files.sort(key=lambda f: os.path.getmtime(os.path.join(directory, f)))
-        
-        old_db, new_db = db_files[0], db_files[1]
-        logging.info("성공: DB 파일 2개를 찾았습니다.")
-        logging.info(f"'{old_db}' (기존 DB)와 '{new_db}' (신규 DB)를 비교합니다.")
-        return old_db, new_db
+        return db_files
 
     except FileNotFoundError:
         logging.error(f"!!! 오류: '{directory}' 폴더를 찾을 수 없습니다.")
         return None
 
 
+def _log_summary(comparer: DatabaseComparer, total_added: int, output_db: str, detect_changes: bool):
+    """비교 하나의 최종 결과를 출력합니다."""
+    if total_added > 0:
+        logging.info(f"🎉 총 {total_added}개의 새로운 데이터가 발견되어 '{output_db}'에 저장되었습니다.")
+    else:
+        logging.info("ℹ️ 비교 결과, 추가된 데이터가 없습니다.")
+    if detect_changes:
+        logging.info(f"✏️ 변경된 데이터 {comparer.total_modified_count}개, "
+                     f"삭제된 데이터 {comparer.total_removed_count}개가 '{output_db}'에 저장되었습니다.")
+
+
+def run_chain(db_files: List[str], write_patch: bool = False, **comparer_options):
+    """
+    수정 시간 순서로 정렬된 DB 파일들을 이웃한 것끼리(v1→v2, v2→v3, ...) 차례로 비교하여
+    CHAIN_OUTPUT_DIR 폴더에 '<순번>_<기존>__<신규>.db'로 저장합니다. (write_patch=True이면 패치도 같은 이름으로)
+    각 DB는 한 번만 열며, 이웃한 두 비교가 같은 스냅샷(연결과 키 집합)을 함께 사용합니다.
+    키 집합 재사용은 'set' 방식에서만 효과가 있습니다. 'merge'/'engine' 방식과 --changes, 여러 프로세스(workers) 비교는
+    단계마다 두 DB의 테이블을 다시 읽으므로, 체인으로 실행해도 DB를 한 번씩 따로 비교하는 것과 읽는 양이 같습니다.
+    메모리에는 다음 단계에서 쓸 신규 DB의 키 집합만 남고, 기존 DB의 키 집합은 테이블 비교가 끝나는 대로 내립니다.
+    """
+    if os.path.isdir(CHAIN_OUTPUT_DIR):
+        shutil.rmtree(CHAIN_OUTPUT_DIR)
+        logging.info(f"\n🧹 기존 '{CHAIN_OUTPUT_DIR}' 폴더를 삭제했습니다. 새로운 결과로 교체됩니다.")
+    os.makedirs(CHAIN_OUTPUT_DIR)
+
+    detect_changes = comparer_options.get('detect_changes', False)
+    summaries = []
+    old_snapshot = DatabaseSnapshot(db_files[0])
+    new_snapshot = None
+    try:
+        for index, new_db in enumerate(db_files[1:], start=1):
+            new_snapshot = DatabaseSnapshot(new_db)
+            old_name = os.path.splitext(os.path.basename(old_snapshot.db_path))[0]
+            new_name = os.path.splitext(os.path.basename(new_db))[0]
+            output_db = os.path.join(CHAIN_OUTPUT_DIR, f"{index:02d}_{old_name}__{new_name}.db")
+            logging.info(f"\n=== [{index}/{len(db_files) - 1}] '{old_snapshot.db_path}' → '{new_db}' ===")
+
+            patch_path = os.path.splitext(output_db)[0] + PATCH_SUFFIX if write_patch else None
+            with DatabaseComparer(old_snapshot.db_path, new_db, output_db, old_snapshot=old_snapshot,
+                                  new_snapshot=new_snapshot, patch_path=patch_path, **comparer_options) as comparer:
+                total_added = comparer.run_comparison()
+            summaries.append((comparer, total_added, output_db))
+
+            # 기존 DB는 두 번의 비교에 모두 사용되었으므로 닫고, 신규 DB를 다음 비교의 기존 DB로 넘깁니다.
+            old_snapshot.close()
+            old_snapshot, new_snapshot = new_snapshot, None
+    finally:
+        old_snapshot.close()
+        if new_snapshot:
+            new_snapshot.close()
+
+    logging.info("\n--- 5. 모든 작업 완료 ---\n")
+    logging.info("---  최종 결과 요약 ---")
+    for comparer, total_added, output_db in summaries:
+        _log_summary(comparer, total_added, output_db, detect_changes)
+
+
+def apply_patch(patch_path: str, mirror_path: str) -> int:
+    """
+    compare_all.py가 만든 패치 파일을 미러 DB에 하나의 트랜잭션으로 적용하고, 적용한 작업 수를 반환합니다.
+    중간에 오류가 나면 미러 DB는 적용 전 상태로 돌아갑니다.
+    """
+    conn = sqlite3.connect(file_uri(mirror_path, mode='rw'), uri=True, isolation_level=None)
+    try:
+        # 트랜잭션 안에서는 ATTACH할 수 없으므로 트랜잭션 시작 전에 붙입니다.
+        conn.execute("ATTACH DATABASE ? AS patch", (file_uri(patch_path, mode='ro'),))
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            tables = conn.execute(f"SELECT table_name, key_column, create_sql, dropped "
+                                  f"FROM patch.{PATCH_TABLE} ORDER BY seq").fetchall()
+            total_ops = 0
+            for table_name, key_column, create_sql, dropped in tables:
+                if dropped:
+                    logging.info(f"\n▶ '{table_name}' 테이블 삭제 (신규 DB에서 삭제된 테이블)")
+                    conn.execute(f'DROP TABLE IF EXISTS main."{table_name}"')
+                    total_ops += 1
+                    continue
+                total_ops += _apply_table_patch(conn, table_name, key_column, create_sql)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return total_ops
+    finally:
+        conn.close()
+
+
+def _apply_table_patch(conn: sqlite3.Connection, table_name: str, key_column: Optional[str],
+                       create_sql: Optional[str]) -> int:
+    """
+    테이블 하나의 패치를 DELETE → UPDATE → INSERT 순서로 적용하고, 적용한 작업 수를 반환합니다.
+    - 적용 전: 신규 DB에서 새로 생긴 컬럼을 미러 DB 테이블에 ALTER TABLE ... ADD COLUMN으로 추가합니다.
+    - DELETE: 기준 컬럼이 있으면 그 값(여러 컬럼으로 된 키는 값의 조합)이 같은 행을 모두 지웁니다. 기준 컬럼이 없는 테이블만
+      모든 컬럼의 값이 같은 행을 하나씩 지웁니다. (같은 행이 여러 개여도 하나씩)
+    - UPDATE: 기준 컬럼 값이 같은 행의 나머지 컬럼을 바꿉니다.
+    - INSERT: 패치의 행을 INSERT ... SELECT로 한 번에 추가합니다.
+    미러 DB에 테이블이나 기준 컬럼이 없으면 다른 DB의 패치로 보고 오류를 냅니다. (apply_patch가 전체를 되돌림)
+    """
+    logging.info(f"\n▶ '{table_name}' 테이블 패치 적용 중...")
+    if create_sql:
+        conn.execute(f'DROP TABLE IF EXISTS main."{table_name}"')
+        conn.execute(create_sql)
+
+    column_types = [(row[1], row[2]) for row in conn.execute(f'PRAGMA patch.table_info("{table_name}")')
+                    if row[1] != PATCH_OP_COLUMN]
+    columns = [name for name, _ in column_types]
+    mirror_columns = {row[1] for row in conn.execute(f'PRAGMA main.table_info("{table_name}")')}
+    if not mirror_columns:
+        raise sqlite3.OperationalError(f"미러 DB에 '{table_name}' 테이블이 없습니다. 패치를 만든 기존 DB와 같은 DB인지 확인하세요.")
+    key_columns = key_column.split(KEY_COLUMN_SEPARATOR) if key_column else []
+    missing_keys = [c for c in key_columns if c not in mirror_columns]
+    if missing_keys:
+        raise sqlite3.OperationalError(f"미러 DB의 '{table_name}' 테이블에 기준 컬럼 {', '.join(repr(c) for c in missing_keys)}이(가) 없습니다. "
+                                       f"패치를 만든 기존 DB와 같은 DB인지 확인하세요.")
+    for name, column_type in column_types:
+        if name not in mirror_columns:
+            logging.info(f"   -> 새 컬럼 '{name}' 추가")
+            conn.execute(f'ALTER TABLE main."{table_name}" ADD COLUMN "{name}" {column_type}'.rstrip())
+    quoted_columns = ', '.join(f'"{c}"' for c in columns)
+    cursor = conn.cursor()
+
+    key_condition = ' AND '.join(f'"{c}" IS ?' for c in key_columns)
+    if key_columns:
+        delete_sql = f'DELETE FROM main."{table_name}" WHERE {key_condition}'
+        deleted_rows = conn.execute(f'SELECT DISTINCT {_quote_columns(key_columns)} FROM patch."{table_name}" '
+                                    f'WHERE {PATCH_OP_COLUMN} = \'DELETE\'')
+    else:
+        condition = ' AND '.join(f'"{c}" IS ?' for c in columns)
+        try:
+            conn.execute(f'SELECT rowid FROM main."{table_name}" LIMIT 0')
+            delete_sql = (f'DELETE FROM main."{table_name}" WHERE rowid IN '
+                          f'(SELECT rowid FROM main."{table_name}" WHERE {condition} LIMIT 1)')
+        except sqlite3.OperationalError:
+            # WITHOUT ROWID 테이블은 PRIMARY KEY가 있으므로 같은 내용의 행은 하나뿐입니다.
+            delete_sql = f'DELETE FROM main."{table_name}" WHERE {condition}'
+        deleted_rows = conn.execute(f'SELECT {quoted_columns} FROM patch."{table_name}" '
+                                    f'WHERE {PATCH_OP_COLUMN} = \'DELETE\' ORDER BY rowid')
+    cursor.executemany(delete_sql, _iter_fetchmany(deleted_rows))
+    deleted_count = max(cursor.rowcount, 0)
+
+    updated_count = 0
+    set_columns = [c for c in columns if c not in key_columns]
+    # 모든 컬럼이 기준 키인 테이블은 키가 같으면 행도 같으므로 UPDATE 작업이 없습니다.
+    if key_columns and set_columns:
+        assignments = ', '.join(f'"{c}" = ?' for c in set_columns)
+        selected_columns = _quote_columns(set_columns + key_columns)
+        update_sql = f'UPDATE main."{table_name}" SET {assignments} WHERE {key_condition}'
+        updated_rows = conn.execute(f'SELECT {selected_columns} FROM patch."{table_name}" '
+                                    f'WHERE {PATCH_OP_COLUMN} = \'UPDATE\' ORDER BY rowid')
+        cursor.executemany(update_sql, _iter_fetchmany(updated_rows))
+        updated_count = max(cursor.rowcount, 0)
+
+    cursor.execute(f'INSERT INTO main."{table_name}" ({quoted_columns}) SELECT {quoted_columns} '
+                   f'FROM patch."{table_name}" WHERE {PATCH_OP_COLUMN} = \'INSERT\' ORDER BY rowid')
+    inserted_count = max(cursor.rowcount, 0)
+
+    logging.info(f"   -> 추가 {inserted_count}개, 변경 {updated_count}개, 삭제 {deleted_count}개 적용 완료")
+    return inserted_count + updated_count + deleted_count
+
+
 def main():
     """스크립트의 메인 실행 함수입니다."""
+    parser = argparse.ArgumentParser(description="두 SQLite DB를 비교하여 추가된 데이터를 '추가목록.db'에 저장합니다.")
+    parser.add_argument('--mode', choices=DatabaseComparer.COMPARE_MODES, default='set',
+                        help="공통 테이블 비교 방식 (set: 키를 메모리에 올려 비교, merge: 키 순서로 함께 읽으며 비교, "
+                             "engine: SQLite 안에서 비교 및 복사)")
+    parser.add_argument('--changes', action='store_true',
+                        help="공통 테이블을 행 단위로 비교하여 변경/삭제된 행도 '<테이블>__modified', '<테이블>__removed'에 저장합니다.")
+    parser.add_argument('--manifest', action='store_true',
+                        help="DB마다 테이블별 매니페스트(행 수, 최대 updateTimestamp_, 최대 rowid, 내용 체크섬)를 만들어 두고, "
+                             "매니페스트가 같은 공통 테이블은 비교하지 않습니다. 매니페스트는 DB가 바뀔 때만 다시 계산합니다.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="공통 테이블을 비교할 프로세스 수 (기본값: 1, 0이면 CPU 코어 수)")
+    parser.add_argument('--patch', action='store_true',
+                        help="미러 DB에 적용할 수 있는 패치(INSERT/UPDATE/DELETE)를 결과 DB와 같은 이름의 "
+                             f"'{PATCH_SUFFIX}' 파일로 함께 저장합니다. (--changes 포함)")
+    parser.add_argument('--apply', metavar='MIRROR_DB',
+                        help="비교하지 않고, --patch-file의 패치를 MIRROR_DB에 하나의 트랜잭션으로 적용합니다.")
+    parser.add_argument('--patch-file', default=os.path.splitext(OUTPUT_DB_NAME)[0] + PATCH_SUFFIX,
+                        help="--apply로 적용할 패치 파일 (기본값: %(default)s)")
+    parser.add_argument('--chain', action='store_true',
+                        help=f"폴더의 모든 DB를 수정 시간 순서로 이웃한 것끼리 비교하여 '{CHAIN_OUTPUT_DIR}' 폴더에 저장합니다. "
+                             "(이웃한 비교끼리 키 집합을 재사용하는 것은 --mode set에서만 적용됩니다)")
+    args = parser.parse_args()
+    comparer_options = dict(compare_mode=args.mode, detect_changes=args.changes or args.patch,
+                            workers=args.workers or os.cpu_count() or 1, use_manifest=args.manifest)
+
+    if args.apply:
+        try:
+            total_ops = apply_patch(args.patch_file, args.apply)
+            logging.info(f"\n🎉 '{args.patch_file}'의 작업 {total_ops}개를 '{args.apply}'에 적용했습니다.")
+        except Exception as e:
+            logging.error(f"패치 적용 중 오류가 발생하여 '{args.apply}'는 변경되지 않았습니다: {e}")
+        return
+
+    if args.chain:
+        db_files = find_db_chain()
+        if db_files:
+            logging.info(f"성공: DB 파일 {len(db_files)}개를 찾았습니다. 순서: {db_files}")
+            try:
+                run_chain(db_files, write_patch=args.patch, **comparer_options)
+            except Exception as e:
+                logging.error(f"스크립트 실행 중 예기치 않은 오류 발생: {e}")
+        return
+
     db_paths = find_db_files()
     
     if db_paths:
         old_db, new_db = db_paths
-        output_db = '추가목록.db'
+        output_db = OUTPUT_DB_NAME
+        
+        patch_path = os.path.splitext(output_db)[0] + PATCH_SUFFIX if args.patch else None
         
-        if os.path.exists(output_db):
-            os.remove(output_db)
-            logging.info(f"\n🧹 기존 '{output_db}' 파일을 삭제했습니다. 새로운 결과로 교체됩니다.")
+        for path in (output_db, patch_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+                logging.info(f"\n🧹 기존 '{path}' 파일을 삭제했습니다. 새로운 결과로 교체됩니다.")
 
         try:
             # with 구문을 사용하여 DatabaseComparer 객체 생성 및 실행
-            with DatabaseComparer(old_db, new_db, output_db) as comparer:
+            with DatabaseComparer(old_db, new_db, output_db, patch_path=patch_path, **comparer_options) as comparer:
                 total_added = comparer.run_comparison()
 
             logging.info("\n--- 5. 모든 작업 완료 ---\n")
             logging.info("---  최종 결과 요약 ---")
-            if total_added > 0:
-                logging.info(f"🎉 총 {total_added}개의 새로운 데이터가 발견되어 '{output_db}'에 저장되었습니다.")
-            else:
-                logging.info("ℹ️ 비교 결과, 추가된 데이터가 없습니다.")
+            _log_summary(comparer, total_added, output_db, args.changes or args.patch)
 
         except Exception as e:
             logging.error(f"스크립트 실행 중 예기치 않은 오류 발생: {e}")
@@ -1,21 +1,48 @@
 import sqlite3
 import os
+import sys
+import argparse
 
-def find_db_file(output_filename, directory='.'):
-    """
-    현재 디렉토리에서 SQLite DB 파일을 찾아 파일 이름을 반환합니다.
-    결과 파일 이름은 검색에서 제외합니다.
-    """
-    db_files = [f for f in os.listdir(directory) if f.endswith(('.db', '.sqlite')) and f != output_filename]
-    
-    if not db_files:
-        print(f"❌ 오류: 폴더에서 원본 DB 파일을 찾을 수 없습니다. (결과 파일 '{output_filename}'은 제외하고 검색합니다)")
-        return None
-    
-    if len(db_files) > 1:
-        print(f"알림: 여러 개의 DB 파일이 발견되었습니다. 첫 번째 파일인 '{db_files[0]}'을(를) 사용합니다.")
-    
-    return db_files[0]
+# 저장소 루트의 공용 모듈(sakura_db.py)을 불러오기 위해 상위 폴더를 경로에 추가합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sakura_db import SQLITE_DB_EXTENSIONS, file_uri, find_db_file, get_connection
+from sakura_index import TIMELINE_TIME_COLUMNS, TIMELINE_TITLE_COLUMNS
+
+# 결과 DB는 매번 새로 만드는 파일이므로 저널과 디스크 동기화를 생략하고 씁니다.
+DEST_PRAGMAS = (
+    'PRAGMA main.journal_mode = OFF',
+    'PRAGMA main.synchronous = OFF',
+)
+# 테이블 선택 시 DB 전체를 복사하는 입력값
+WHOLE_DB_INPUTS = ('*', 'all')
+
+# 슬림 DB 파일 이름 (각 폴더에서 sakura.db 대신 사용할 수 있는 축소판)
+SLIM_DB_NAME = 'sakura_slim.db'
+# 다른 폴더의 스크립트들이 읽는 캐릭터 관련 테이블과 컬럼 (원본 DB에 하나라도 없으면 슬림 DB를 만들지 않음)
+SLIM_DB_COLUMNS = {
+    'MstCharacter_': (
+        'serverId_', 'logbookId_', 'name_', 'subName_', 'attributeId_', 'characterType_', 'subCharacterType_',
+        'rarity_', 'isRarityPlus_', 'cost_', 'comboNum_', 'maxOptionSkill_', 'maxLevel_', 'limitExp_',
+        'minHealth_', 'minAttackDamage_', 'minRestoration_', 'maxHealth_', 'maxAttackDamage_', 'maxRestoration_',
+        'piratesStyle_', 'piratesDefense_', 'piratesSpeed_',
+    ),
+    'MstAbility_': ('serverId_', 'turn_', 'maxLevel_'),
+    'MstEventCharacterBoost_': ('serverId_', 'updateTimestamp_', 'charactersJson_', 'eventableType_'),
+}
+# 원본 DB에 있을 때만 함께 담는 컬럼 (sakura_index.py의 이벤트 타임라인이 찾는 시각/이름 컬럼 후보)
+SLIM_DB_OPTIONAL_COLUMNS = {
+    'MstEventCharacterBoost_': tuple(name for pair in TIMELINE_TIME_COLUMNS for name in pair) + TIMELINE_TITLE_COLUMNS,
+}
+# is.py의 TABLE_HEADERS에 있는 테이블 (is.py는 임의의 컬럼을 골라 추출할 수 있으므로 모든 컬럼을 유지)
+SLIM_DB_FULL_TABLES = (
+    'MstGasha_', 'MstVoyageQuestMissionLevel_', 'MstVoyageQuestMissionReward_', 'MstVoyagePointReward_',
+    'MstPrizeExchange_', 'MstKizunaBattleEventRankReward_', 'MstKizunaBattleEventAllianceRankReward_',
+    'MstKizunaBattleEventAllianceRankRateReward_', 'MstKizunaBattleEventAllianceMissionReward_',
+    'MstQuestGimmickInformation_', 'MstBonusEvent_', 'MstAssaultRumbleEventRankReward_',
+    'MstAssaultRumbleEventAllianceRankRateReward_', 'MstPiratesArenaGpWinBonus_',
+)
+# 슬림 DB에서 인덱스를 만들 컬럼 (테이블에 있는 컬럼만)
+SLIM_DB_INDEX_COLUMNS = ('logbookId_', 'serverId_', 'subName_', 'updateTimestamp_')
 
 def get_all_tables(conn):
     """DB의 모든 테이블 이름을 리스트로 반환합니다."""
@@ -23,21 +50,211 @@ def get_all_tables(conn):
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
     return [table[0] for table in cursor.fetchall()]
 
+def get_table_objects(conn, table_name, schema='main'):
+    """테이블에 딸린 인덱스와 트리거의 CREATE 문 목록을 반환합니다. (자동 인덱스는 CREATE TABLE 문에 포함되어 제외)"""
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT sql FROM {schema}.sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL "
+        f"ORDER BY type = 'trigger', name",
+        (table_name,)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+def copy_tables(source_db_name, dest_db_name, table_names):
+    """
+    원본 DB의 테이블들을 결과 DB로 복사하고, 테이블별 복사된 행 수를 반환합니다.
+    결과 DB 연결에 원본 DB를 읽기 전용으로 ATTACH하여 INSERT ... SELECT로 복사하므로
+    행이 파이썬을 거치지 않습니다. 모든 테이블을 하나의 트랜잭션으로 복사하며,
+    인덱스와 트리거는 행을 모두 넣은 뒤에 만듭니다.
+    """
+    dest_conn = sqlite3.connect(dest_db_name, isolation_level=None)
+    try:
+        for pragma in DEST_PRAGMAS:
+            dest_conn.execute(pragma)
+        # 트랜잭션 안에서는 ATTACH할 수 없으므로 트랜잭션 시작 전에 붙입니다.
+        dest_conn.execute("ATTACH DATABASE ? AS src", (file_uri(source_db_name, mode='ro', immutable=1),))
+        dest_conn.execute('BEGIN')
+        copied = {}
+        for table_name in table_names:
+            print(f"   - '{table_name}' 테이블 처리 중...")
+            create_sql = dest_conn.execute(
+                "SELECT sql FROM src.sqlite_master WHERE type='table' AND name = ?", (table_name,)
+            ).fetchone()[0]
+            dest_conn.execute(create_sql)
+            cursor = dest_conn.execute(f'INSERT INTO main."{table_name}" SELECT * FROM src."{table_name}"')
+            copied[table_name] = cursor.rowcount
+            for object_sql in get_table_objects(dest_conn, table_name, schema='src'):
+                dest_conn.execute(object_sql)
+        dest_conn.execute('COMMIT')
+        return copied
+    finally:
+        dest_conn.close()
+
+def copy_database(source_db_name, dest_db_name):
+    """원본 DB 전체(테이블, 인덱스, 트리거, 뷰)를 SQLite 백업 API로 결과 DB에 페이지 단위로 복사합니다."""
+    dest_conn = sqlite3.connect(dest_db_name)
+    try:
+        get_connection(source_db_name).backup(dest_conn)
+    finally:
+        dest_conn.close()
+
+def has_rowid(conn, table_name, schema='main'):
+    """테이블에 rowid가 있는지 확인합니다. (WITHOUT ROWID 테이블이면 False)"""
+    try:
+        conn.execute(f'SELECT rowid FROM {schema}."{table_name}" LIMIT 0')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def build_projected_table_sql(conn, table_name, wanted_columns, schema='src'):
+    """
+    원본 테이블에서 wanted_columns만 남긴 CREATE TABLE 문과 남긴 컬럼 이름 목록을 반환합니다.
+    컬럼의 타입, NOT NULL, DEFAULT와 함께 남긴 컬럼만으로 이루어진 PRIMARY KEY/UNIQUE 제약도 그대로 옮깁니다.
+    wanted_columns가 None이면 원본의 CREATE TABLE 문을 그대로 사용합니다.
+    """
+    table_info = conn.execute(f'PRAGMA {schema}.table_info("{table_name}")').fetchall()
+    if wanted_columns is None:
+        create_sql = conn.execute(f"SELECT sql FROM {schema}.sqlite_master WHERE type='table' AND name = ?",
+                                  (table_name,)).fetchone()[0]
+        return create_sql, [row[1] for row in table_info]
+
+    # table_info 행: (cid, 이름, 타입, notnull, 기본값, pk 순번)
+    kept = [row for row in table_info if row[1] in wanted_columns]
+    kept_names = {row[1] for row in kept}
+    definitions = []
+    for _, name, column_type, notnull, default, _ in kept:
+        definition = f'"{name}" {column_type}'.rstrip()
+        if notnull:
+            definition += ' NOT NULL'
+        if default is not None:
+            definition += f' DEFAULT {default}'
+        definitions.append(definition)
+
+    primary_key = [row[1] for row in sorted(table_info, key=lambda row: row[5]) if row[5]]
+    keep_primary_key = bool(primary_key) and kept_names.issuperset(primary_key)
+    if keep_primary_key:
+        definitions.append('PRIMARY KEY (' + ', '.join(f'"{name}"' for name in primary_key) + ')')
+
+    # index_list 행: (seq, 이름, unique, origin, partial) - origin 'u'가 UNIQUE 제약으로 생긴 자동 인덱스입니다.
+    for index_row in conn.execute(f'PRAGMA {schema}.index_list("{table_name}")').fetchall():
+        if index_row[3] != 'u':
+            continue
+        unique_columns = [row[2] for row in conn.execute(f'PRAGMA {schema}.index_info("{index_row[1]}")')]
+        if unique_columns and None not in unique_columns and kept_names.issuperset(unique_columns):
+            definitions.append('UNIQUE (' + ', '.join(f'"{name}"' for name in unique_columns) + ')')
+
+    # WITHOUT ROWID 테이블은 PRIMARY KEY가 필요하므로, 키 컬럼을 모두 남긴 경우에만 그대로 유지합니다.
+    suffix = ' WITHOUT ROWID' if keep_primary_key and not has_rowid(conn, table_name, schema=schema) else ''
+    create_sql = f'CREATE TABLE main."{table_name}" ({", ".join(definitions)}){suffix}'
+    return create_sql, [row[1] for row in kept]
+
+def find_missing_slim_columns(conn, source_tables, schema='src'):
+    """SLIM_DB_COLUMNS 중 원본 DB에 없는 테이블과 컬럼을 '테이블.컬럼' 형태의 목록으로 반환합니다."""
+    missing = []
+    for table_name, wanted_columns in SLIM_DB_COLUMNS.items():
+        if table_name not in source_tables:
+            missing.append(table_name)
+            continue
+        columns = {row[1] for row in conn.execute(f'PRAGMA {schema}.table_info("{table_name}")')}
+        missing.extend(f"{table_name}.{name}" for name in wanted_columns if name not in columns)
+    return missing
+
+def build_slim_db(source_db_name, dest_db_name):
+    """
+    다른 폴더의 스크립트들이 사용하는 테이블과 컬럼만 담은 슬림 DB를 만들고, 테이블별 행 수를 반환합니다.
+    행은 원본의 rowid를 그대로 유지하여 복사하므로 rowid 순서에 의존하는 스크립트도 같은 결과를 얻습니다.
+    복사 후 SLIM_DB_INDEX_COLUMNS에 인덱스를 만들고 ANALYZE, VACUUM을 실행합니다.
+    SLIM_DB_COLUMNS의 테이블이나 컬럼이 원본 DB에 없으면 아무것도 복사하지 않고 ValueError를 냅니다.
+    (빠진 컬럼을 조용히 제외하면 슬림 DB를 읽는 스크립트가 잘못된 결과를 내기 때문)
+    """
+    table_columns = {table_name: wanted_columns + SLIM_DB_OPTIONAL_COLUMNS.get(table_name, ())
+                     for table_name, wanted_columns in SLIM_DB_COLUMNS.items()}
+    table_columns.update((table_name, None) for table_name in SLIM_DB_FULL_TABLES)
+
+    dest_conn = sqlite3.connect(dest_db_name, isolation_level=None)
+    try:
+        for pragma in DEST_PRAGMAS:
+            dest_conn.execute(pragma)
+        dest_conn.execute("ATTACH DATABASE ? AS src", (file_uri(source_db_name, mode='ro', immutable=1),))
+        source_tables = {row[0] for row in dest_conn.execute("SELECT name FROM src.sqlite_master WHERE type='table'")}
+
+        missing = find_missing_slim_columns(dest_conn, source_tables)
+        if missing:
+            raise ValueError(f"원본 DB에 다른 폴더의 스크립트가 사용하는 테이블/컬럼이 없습니다: {missing}")
+
+        dest_conn.execute('BEGIN')
+        copied = {}
+        for table_name, wanted_columns in table_columns.items():
+            if table_name not in source_tables:
+                print(f"   - ⚠️ '{table_name}' 테이블이 원본 DB에 없어 건너뜁니다.")
+                continue
+            print(f"   - '{table_name}' 테이블 처리 중...")
+
+            # 원본 테이블의 컬럼 순서와 제약 조건(PRIMARY KEY, NOT NULL, UNIQUE)을 유지한 채 필요한 컬럼만 남깁니다.
+            create_sql, column_names = build_projected_table_sql(dest_conn, table_name, wanted_columns)
+            column_list = ', '.join(f'"{name}"' for name in column_names)
+            dest_conn.execute(create_sql)
+            if has_rowid(dest_conn, table_name, schema='src'):
+                cursor = dest_conn.execute(f'INSERT INTO main."{table_name}" (rowid, {column_list}) '
+                                           f'SELECT rowid, {column_list} FROM src."{table_name}" ORDER BY rowid')
+            else:
+                cursor = dest_conn.execute(f'INSERT INTO main."{table_name}" ({column_list}) '
+                                           f'SELECT {column_list} FROM src."{table_name}"')
+            copied[table_name] = cursor.rowcount
+
+            for name in column_names:
+                if name in SLIM_DB_INDEX_COLUMNS:
+                    dest_conn.execute(f'CREATE INDEX "idx_{table_name}{name}" ON "{table_name}" ("{name}")')
+        dest_conn.execute('COMMIT')
+        dest_conn.execute('DETACH DATABASE src')
+
+        # 쿼리 플래너 통계를 만들고, 파일을 압축합니다.
+        dest_conn.execute('ANALYZE')
+        dest_conn.execute('VACUUM')
+        return copied
+    finally:
+        dest_conn.close()
+
+def build_slim_db_main(output_db_name=SLIM_DB_NAME):
+    """현재 폴더의 DB로 슬림 DB를 만듭니다. (입력 없이 실행)"""
+    source_db_name = find_db_file(extensions=SQLITE_DB_EXTENSIONS, exclude=(output_db_name, 'extracted_tables.db'))
+    if not source_db_name:
+        return
+
+    try:
+        if os.path.exists(output_db_name):
+            os.remove(output_db_name)
+            print(f"\n🧹 기존 '{output_db_name}' 파일을 삭제했습니다.")
+
+        print(f"\n🚀 '{source_db_name}'에서 슬림 DB를 만듭니다. -> '{output_db_name}'")
+        copied = build_slim_db(source_db_name, output_db_name)
+
+        source_size = os.path.getsize(source_db_name) / (1024 * 1024)
+        slim_size = os.path.getsize(output_db_name) / (1024 * 1024)
+        print(f"\n🎉 테이블 {len(copied)}개, 총 {sum(copied.values())}개의 행을 저장했습니다. "
+              f"({source_size:.1f}MB -> {slim_size:.1f}MB)")
+        print(f"각 폴더에서 사용하려면 '{output_db_name}'을(를) 'sakura.db'라는 이름으로 복사하세요.")
+
+    except ValueError as e:
+        print(f"\n❌ 슬림 DB를 만들지 않았습니다. {e}")
+        os.remove(output_db_name)
+    except sqlite3.Error as e:
+        print(f"\n❌ 데이터베이스 오류가 발생했습니다: {e}")
+    except Exception as e:
+        print(f"\n❌ 알 수 없는 오류가 발생했습니다: {e}")
+
 def extract_tables():
     """사용자로부터 테이블을 선택받아 새로운 DB 파일로 추출합니다."""
     output_db_name = 'extracted_tables.db'
     
-    # 1. 원본 DB 파일 찾기
-    source_db_name = find_db_file(output_db_name)
+    # 1. 원본 DB 파일 찾기 (결과 파일은 검색에서 제외)
+    source_db_name = find_db_file(extensions=SQLITE_DB_EXTENSIONS, exclude=(output_db_name, SLIM_DB_NAME))
     if not source_db_name:
         return
 
-    source_conn = None
-    dest_conn = None
     try:
-        # 2. 원본 DB에 연결하고 테이블 목록 보여주기
-        source_conn = sqlite3.connect(source_db_name)
-        source_cursor = source_conn.cursor()
+        # 2. 원본 DB에 읽기 전용으로 연결하고 테이블 목록 보여주기
+        source_conn = get_connection(source_db_name)
         
         tables = get_all_tables(source_conn)
         if not tables:
@@ -50,8 +267,9 @@ def extract_tables():
             print(f"{i}. {table}")
 
         # 3. 사용자로부터 추출할 테이블 이름 입력받기
-        tables_input = input("\n추출할 테이블 이름을 입력하세요 (여러 개는 쉼표(,)로 구분): ")
-        selected_tables = [t.strip() for t in tables_input.split(',')]
+        tables_input = input("\n추출할 테이블 이름을 입력하세요 (여러 개는 쉼표(,)로 구분, DB 전체는 *): ")
+        copy_whole_db = tables_input.strip().lower() in WHOLE_DB_INPUTS
+        selected_tables = tables if copy_whole_db else [t.strip() for t in tables_input.split(',')]
 
         # 입력된 테이블 이름 유효성 검사
         for t in selected_tables:
@@ -64,44 +282,27 @@ def extract_tables():
             os.remove(output_db_name)
             print(f"\n🧹 기존 '{output_db_name}' 파일을 삭제했습니다.")
 
-        # 5. 새로운 DB에 연결하고 테이블 추출 시작
-        dest_conn = sqlite3.connect(output_db_name)
-        dest_cursor = dest_conn.cursor()
+        # 5. 새로운 DB로 테이블 추출 시작
         print(f"\n🚀 테이블 추출을 시작합니다. -> '{output_db_name}'")
+        if copy_whole_db:
+            print("   - DB 전체를 복사하는 중...")
+            copy_database(source_db_name, output_db_name)
+        else:
+            copy_tables(source_db_name, output_db_name, selected_tables)
 
-        for table_name in selected_tables:
-            print(f"   - '{table_name}' 테이블 처리 중...")
-            
-            # (1) 원본 테이블의 구조(CREATE TABLE 문) 가져오기
-            source_cursor.execute(f"SELECT sql FROM sqlite_master WHERE type='table' AND name='{table_name}'")
-            create_sql = source_cursor.fetchone()[0]
-            
-            # (2) 새로운 DB에 테이블 생성
-            dest_cursor.execute(create_sql)
-            
-            # (3) 원본 테이블의 모든 데이터 가져오기
-            source_cursor.execute(f'SELECT * FROM "{table_name}"')
-            all_data = source_cursor.fetchall()
-            
-            # (4) 새로운 테이블에 모든 데이터 삽입
-            if all_data:
-                # 데이터의 컬럼 수에 맞춰서 '?' 플레이스홀더 생성
-                placeholders = ', '.join(['?'] * len(all_data[0]))
-                dest_cursor.executemany(f'INSERT INTO "{table_name}" VALUES ({placeholders})', all_data)
-        
-        # 6. 변경사항 저장
-        dest_conn.commit()
         print("\n🎉 모든 작업이 완료되었습니다!")
 
     except sqlite3.Error as e:
         print(f"\n❌ 데이터베이스 오류가 발생했습니다: {e}")
     except Exception as e:
         print(f"\n❌ 알 수 없는 오류가 발생했습니다: {e}")
-    finally:
-        if source_conn:
-            source_conn.close()
-        if dest_conn:
-            dest_conn.close()
 
 if __name__ == "__main__":
-    extract_tables()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="sakura.db에서 테이블을 골라 새 DB 파일로 추출합니다.")
+    parser.add_argument('--slim', action='store_true',
+                        help=f"입력 없이 다른 폴더의 스크립트들이 사용하는 테이블과 컬럼만 담은 '{SLIM_DB_NAME}'을(를) 만듭니다.")
+    args = parser.parse_args()
+    if args.slim:
+        build_slim_db_main()
+    else:
+        extract_tables()
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+모든 폴더의 스크립트가 함께 사용하는 sakura.db 공용 접근 모듈.
+
+- 폴더 안의 DB 파일을 항상 같은 규칙으로 고릅니다. (sakura.db 우선, 그 외에는 이름순)
+- 원본 DB는 읽기 전용(mode=ro, immutable=1) URI로 열고, 읽기에 맞춘 PRAGMA를 적용합니다.
+- 한 번 연 연결은 프로세스가 끝날 때까지 재사용하므로, 연결에 딸린 준비된 구문(statement) 캐시도 함께 재사용됩니다.
+
+각 폴더의 스크립트는 상위 폴더(저장소 루트)를 sys.path에 추가한 뒤 이 모듈을 불러옵니다.
+"""
+import atexit
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.request import pathname2url
+
+# DB 파일로 인식할 확장자
+DB_EXTENSIONS = ('.db',)
+# .sqlite/.sqlite3 파일도 함께 다루는 스크립트(compare_all.py, va.py, nickname.py)에서 사용할 확장자
+SQLITE_DB_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+# 폴더에 여러 DB가 있을 때 가장 먼저 선택할 파일 이름
+PREFERRED_DB_NAME = 'sakura.db'
+
+# 읽기 전용 작업에 맞춘 PRAGMA 설정
+READ_PRAGMAS = (
+    'PRAGMA mmap_size = 268435456',   # 256MB까지 메모리 매핑으로 읽기
+    'PRAGMA cache_size = -65536',     # 페이지 캐시 64MB
+    'PRAGMA temp_store = MEMORY',     # 정렬/임시 테이블은 메모리에서 처리
+)
+# 연결마다 보관할 준비된 구문의 최대 개수 (sqlite3 기본값은 128)
+STATEMENT_CACHE_SIZE = 512
+
+# (절대 경로, immutable 여부) -> 열려 있는 연결
+_connections: Dict[Tuple[str, bool], sqlite3.Connection] = {}
+
+
+def list_db_files(directory: str = '.', extensions: Tuple[str, ...] = DB_EXTENSIONS,
+                  exclude: Iterable[str] = ()) -> List[str]:
+    """폴더 안의 DB 파일 이름을 이름순으로 정렬하여 반환합니다. exclude에 있는 이름은 제외합니다."""
+    excluded = set(exclude)
+    with os.scandir(directory) as entries:
+        return sorted(
+            entry.name for entry in entries
+            if entry.is_file() and entry.name.endswith(extensions) and entry.name not in excluded
+        )
+
+
+def find_db_file(directory: str = '.', extensions: Tuple[str, ...] = DB_EXTENSIONS,
+                 exclude: Iterable[str] = ()) -> Optional[str]:
+    """
+    폴더에서 사용할 DB 파일 하나를 찾아 경로를 반환합니다.
+    sakura.db가 있으면 항상 그것을, 없으면 이름순으로 첫 번째 파일을 사용합니다.
+    """
+    try:
+        db_files = list_db_files(directory, extensions, exclude)
+    except FileNotFoundError:
+        print(f"❌ 오류: 디렉토리를 찾을 수 없습니다: '{directory}'")
+        return None
+
+    if not db_files:
+        print(f"❌ 오류: 폴더에서 데이터베이스 파일({', '.join(extensions)})을 찾을 수 없습니다.")
+        return None
+
+    chosen = PREFERRED_DB_NAME if PREFERRED_DB_NAME in db_files else db_files[0]
+    if len(db_files) > 1:
+        print(f"알림: 여러 개의 DB 파일({db_files})이 발견되었습니다. '{chosen}'을(를) 사용합니다.")
+
+    return chosen if directory == '.' else os.path.join(directory, chosen)
+
+
+def file_uri(db_path: str, **params) -> str:
+    """
+    DB 파일 경로를 SQLite URI로 변환합니다. params는 mode='ro', immutable=1 같은 URI 파라미터입니다.
+    URI로 연 연결에서는 ATTACH DATABASE에도 이 URI를 그대로 사용할 수 있습니다.
+    """
+    uri = f"file:{pathname2url(os.path.abspath(db_path))}"
+    if params:
+        uri += "?" + "&".join(f"{name}={value}" for name, value in params.items())
+    return uri
+
+
+def connect_readonly(db_path: str, immutable: bool = True) -> sqlite3.Connection:
+    """
+    DB 파일을 읽기 전용 URI로 새로 열고 읽기용 PRAGMA를 적용합니다.
+    immutable=True이면 SQLite가 파일 잠금과 변경 감지를 생략합니다. (실행 중 파일이 바뀌지 않는 스냅샷 DB 전용)
+    """
+    if not os.path.isfile(db_path):
+        raise sqlite3.OperationalError(f"DB 파일을 찾을 수 없습니다: '{db_path}'")
+
+    uri = file_uri(db_path, mode='ro', immutable=1) if immutable else file_uri(db_path, mode='ro')
+    conn = sqlite3.connect(uri, uri=True, cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma in READ_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def get_connection(db_path: Optional[str] = None, immutable: bool = True) -> Optional[sqlite3.Connection]:
+    """
+    읽기 전용 연결을 반환합니다. 같은 파일에 대한 연결은 한 번만 열고 계속 재사용합니다.
+    db_path를 생략하면 find_db_file()로 현재 폴더의 DB를 찾으며, 찾지 못하면 None을 반환합니다.
+    반환된 연결은 직접 닫지 말고 close_all()(프로세스 종료 시 자동 호출)에 맡깁니다.
+    """
+    if db_path is None:
+        db_path = find_db_file()
+        if not db_path:
+            return None
+
+    key = (os.path.abspath(db_path), immutable)
+    conn = _connections.get(key)
+    if conn is None:
+        conn = connect_readonly(db_path, immutable)
+        _connections[key] = conn
+    return conn
+
+
+def close_all():
+    """열려 있는 모든 공용 연결을 닫습니다."""
+    while _connections:
+        _, conn = _connections.popitem()
+        conn.close()
+
+
+atexit.register(close_all)
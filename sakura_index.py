@@ -0,0 +1,678 @@
+"""
+sakura.db에서 파생된 인덱스를 보관하는 보조(sidecar) DB 모듈.
+
+원본 DB 옆에 '<DB 파일 이름>.index' 파일을 만들어 파생 테이블을 저장합니다.
+각 파생 테이블은 만들 당시 원본 DB의 지문(파일 크기 + 수정 시각)을 함께 기록해 두고,
+원본 DB가 바뀌면 다음 사용 시 자동으로 다시 만듭니다.
+확장자가 .db가 아니므로 find_db_file()의 검색 대상에 포함되지 않습니다.
+"""
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sakura_db import get_connection
+
+# 보조 DB 파일 확장자
+INDEX_SUFFIX = '.index'
+
+# 원본 DB 절대 경로 -> 보조 DB 연결
+_index_connections: Dict[str, sqlite3.Connection] = {}
+# 원본 DB 절대 경로 -> 메모리에 올린 캐릭터 ID 인덱스
+_id_indexes: Dict[str, 'CharacterIdIndex'] = {}
+# 원본 DB 절대 경로 -> (만들 당시 지문, 메모리에 올린 이벤트 로스터 인덱스)
+_roster_indexes: Dict[str, Tuple[str, 'EventRosterIndex']] = {}
+
+
+def index_path(db_path: str) -> str:
+    """원본 DB에 대응하는 보조 DB 파일 경로를 반환합니다."""
+    return db_path + INDEX_SUFFIX
+
+
+def db_fingerprint(db_path: str) -> str:
+    """원본 DB의 지문(파일 크기와 수정 시각)을 반환합니다. 파일이 바뀌면 값도 바뀝니다."""
+    stat = os.stat(db_path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def get_index_connection(db_path: str) -> sqlite3.Connection:
+    """
+    원본 DB에 대응하는 보조 DB 연결을 반환합니다. (쓰기 가능, 프로세스 안에서 재사용)
+    보조 DB 파일을 만들 수 없는 폴더라면 메모리 DB를 대신 사용합니다.
+    """
+    key = os.path.abspath(db_path)
+    conn = _index_connections.get(key)
+    if conn is not None:
+        return conn
+
+    try:
+        conn = _open_index_db(index_path(db_path))
+    except sqlite3.OperationalError:
+        conn = _open_index_db(':memory:')
+    _index_connections[key] = conn
+    return conn
+
+
+def _open_index_db(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        conn.execute("CREATE TABLE IF NOT EXISTS index_meta (name TEXT PRIMARY KEY, fingerprint TEXT NOT NULL)")
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
+def close_index_connections():
+    """열려 있는 모든 보조 DB 연결을 닫습니다."""
+    while _index_connections:
+        _, conn = _index_connections.popitem()
+        conn.close()
+
+
+atexit.register(close_index_connections)
+
+
+def ensure_index(db_path: str, name: str, build: Callable[[sqlite3.Connection, sqlite3.Connection], None]) -> sqlite3.Connection:
+    """
+    보조 DB의 name 인덱스가 현재 원본 DB 기준으로 최신인지 확인하고, 아니면 build로 다시 만듭니다.
+    build(source_conn, index_conn)는 원본 DB(읽기 전용)를 읽어 보조 DB에 테이블을 채웁니다.
+    다시 만드는 작업은 하나의 트랜잭션으로 처리되므로 중간에 실패해도 이전 상태가 유지됩니다.
+    """
+    conn = get_index_connection(db_path)
+    fingerprint = db_fingerprint(db_path)
+    if _built_fingerprint(conn, name) == fingerprint:
+        return conn
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # 다른 프로세스가 먼저 만들었을 수 있으므로 잠금을 잡은 뒤 한 번 더 확인합니다.
+        if _built_fingerprint(conn, name) != fingerprint:
+            build(get_connection(db_path), conn)
+            conn.execute("INSERT OR REPLACE INTO index_meta (name, fingerprint) VALUES (?, ?)", (name, fingerprint))
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    return conn
+
+
+def _built_fingerprint(conn: sqlite3.Connection, name: str) -> Optional[str]:
+    row = conn.execute("SELECT fingerprint FROM index_meta WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+# --- serverId_ <-> logbookId_ 인덱스 ---
+
+def _build_character_ids(source: sqlite3.Connection, index: sqlite3.Connection):
+    """MstCharacter_의 serverId_/logbookId_ 쌍을 원본 행 순서 그대로 보조 DB에 저장합니다."""
+    index.execute("DROP TABLE IF EXISTS character_id")
+    index.execute("CREATE TABLE character_id (ord INTEGER PRIMARY KEY, server_id INTEGER NOT NULL, logbook_id INTEGER NOT NULL)")
+    rows = source.execute(
+        "SELECT serverId_, logbookId_ FROM MstCharacter_ "
+        "WHERE serverId_ IS NOT NULL AND logbookId_ IS NOT NULL ORDER BY rowid"
+    )
+    index.executemany("INSERT INTO character_id (server_id, logbook_id) VALUES (?, ?)", rows)
+
+
+class CharacterIdIndex:
+    """serverId_와 logbookId_를 양방향으로 O(1)에 변환하는 메모리 인덱스."""
+
+    def __init__(self, pairs: Iterable):
+        self.server_to_logbook: Dict[int, int] = {}
+        self.logbook_to_server: Dict[int, int] = {}
+        for server_id, logbook_id in pairs:
+            self.server_to_logbook[server_id] = logbook_id
+            # 같은 logbookId_가 여러 번 나오면 원본 DB에서 먼저 나온 행을 사용합니다.
+            self.logbook_to_server.setdefault(logbook_id, server_id)
+
+    def to_logbook(self, server_id) -> Optional[int]:
+        return self.server_to_logbook.get(server_id)
+
+    def to_server(self, logbook_id) -> Optional[int]:
+        return self.logbook_to_server.get(logbook_id)
+
+    def to_logbook_ids(self, server_ids: Iterable) -> List[int]:
+        """서버 ID 목록을 순서대로 로그북 ID 목록으로 변환합니다. 찾을 수 없는 ID는 제외합니다."""
+        mapping = self.server_to_logbook
+        return [mapping[sid] for sid in server_ids if sid in mapping]
+
+
+def load_character_id_index(db_path: str) -> CharacterIdIndex:
+    """
+    serverId_ <-> logbookId_ 인덱스를 반환합니다.
+    보조 DB에 저장된 인덱스를 읽으며, 원본 DB가 바뀐 경우에만 MstCharacter_를 다시 읽어 새로 만듭니다.
+    """
+    key = os.path.abspath(db_path)
+    id_index = _id_indexes.get(key)
+    if id_index is None:
+        conn = ensure_index(db_path, 'character_id', _build_character_ids)
+        id_index = CharacterIdIndex(conn.execute("SELECT server_id, logbook_id FROM character_id ORDER BY ord"))
+        _id_indexes[key] = id_index
+    return id_index
+
+
+# --- 테이블별 스냅샷 매니페스트 ---
+
+# 매니페스트의 최대 수정 시각을 구할 때 사용하는 컬럼
+MANIFEST_TIMESTAMP_COLUMN = 'updateTimestamp_'
+# 체크섬을 계산할 때 한 번에 읽는 행 수
+MANIFEST_CHECKSUM_BATCH_SIZE = 5000
+# index_meta에 기록하는 매니페스트 인덱스 이름 (체크섬이 기본으로 들어간 뒤의 구성)
+TABLE_MANIFEST_INDEX = 'table_manifest:2'
+
+
+def _table_checksum(source: sqlite3.Connection, table_name: str, columns: List[str]) -> str:
+    """
+    컬럼 이름과 모든 행의 내용으로 테이블의 체크섬을 계산합니다.
+    각 행은 SQLite 안에서 quote()로 한 줄의 문자열로 만들어 읽으므로, 파이썬은 행마다 해시를 갱신하기만 합니다.
+    행은 rowid(WITHOUT ROWID 테이블은 PRIMARY KEY) 순서로 읽습니다.
+    """
+    digest = hashlib.sha1(repr(columns).encode('utf-8'))
+    if not columns:
+        return digest.hexdigest()
+    row_text = " || ',' || ".join(f'quote("{name}")' for name in columns)
+    order_by = ' ORDER BY rowid' if _max_rowid(source, table_name) is not None else ''
+    cursor = source.execute(f'SELECT {row_text} FROM "{table_name}"{order_by}')
+    while True:
+        rows = cursor.fetchmany(MANIFEST_CHECKSUM_BATCH_SIZE)
+        if not rows:
+            break
+        digest.update('\n'.join(row[0] for row in rows).encode('utf-8', 'surrogatepass'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def _max_rowid(source: sqlite3.Connection, table_name: str):
+    """테이블의 가장 큰 rowid를 반환합니다. (rowid 트리의 끝만 읽음, WITHOUT ROWID 테이블이면 None)"""
+    try:
+        return source.execute(f'SELECT MAX(rowid) FROM "{table_name}"').fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+
+
+def _build_table_manifest(source: sqlite3.Connection, index: sqlite3.Connection):
+    """
+    원본 DB의 테이블마다 행 수, 최대 updateTimestamp_, 최대 rowid, 내용 체크섬을 보조 DB에 저장합니다.
+    체크섬이 있으므로 행 수와 최대값이 그대로인 제자리 UPDATE도 찾습니다.
+    보조 DB에 저장해 두므로 DB 하나당 원본 DB가 바뀔 때 한 번만 계산합니다.
+    """
+    index.execute("DROP TABLE IF EXISTS table_manifest")
+    index.execute(
+        "CREATE TABLE table_manifest (table_name TEXT PRIMARY KEY, row_count INTEGER NOT NULL, "
+        "max_update_timestamp, max_rowid INTEGER, checksum TEXT NOT NULL)"
+    )
+    table_names = [row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+    for table_name in table_names:
+        columns = [row[1] for row in source.execute(f'PRAGMA table_info("{table_name}")')]
+        max_timestamp = f'MAX("{MANIFEST_TIMESTAMP_COLUMN}")' if MANIFEST_TIMESTAMP_COLUMN in columns else 'NULL'
+        row_count, max_update_timestamp = source.execute(
+            f'SELECT COUNT(*), {max_timestamp} FROM "{table_name}"'
+        ).fetchone()
+        index.execute(
+            "INSERT INTO table_manifest (table_name, row_count, max_update_timestamp, max_rowid, checksum) VALUES (?, ?, ?, ?, ?)",
+            (table_name, row_count, max_update_timestamp, _max_rowid(source, table_name),
+             _table_checksum(source, table_name, columns)),
+        )
+
+
+def load_table_manifest(db_path: str) -> Dict[str, Tuple]:
+    """
+    테이블 이름 -> (행 수, 최대 updateTimestamp_, 최대 rowid, 내용 체크섬) 매니페스트를 반환합니다.
+    보조 DB에 저장된 매니페스트를 읽으며, 원본 DB가 바뀐 경우에만 다시 만듭니다.
+    """
+    conn = ensure_index(db_path, TABLE_MANIFEST_INDEX, _build_table_manifest)
+    rows = conn.execute("SELECT table_name, row_count, max_update_timestamp, max_rowid, checksum FROM table_manifest")
+    return {table_name: tuple(fingerprint) for table_name, *fingerprint in rows}
+
+
+# --- 이벤트 타임라인 인덱스 ---
+
+# 타임라인에 모을 테이블 (가챠, 포뻥캐, 대난투, 보상 테이블)
+TIMELINE_TABLES = (
+    'MstGasha_',
+    'MstEventCharacterBoost_',
+    'MstBonusEvent_',
+    'MstVoyageQuestMissionReward_',
+    'MstVoyagePointReward_',
+    'MstPrizeExchange_',
+    'MstKizunaBattleEventRankReward_',
+    'MstKizunaBattleEventAllianceRankReward_',
+    'MstKizunaBattleEventAllianceRankRateReward_',
+    'MstKizunaBattleEventAllianceMissionReward_',
+    'MstAssaultRumbleEventRankReward_',
+    'MstAssaultRumbleEventAllianceRankRateReward_',
+    'MstPiratesArenaGpWinBonus_',
+)
+# 시작/종료 시각 컬럼 후보 (테이블마다 앞에서부터 처음으로 둘 다 있는 쌍을 사용)
+TIMELINE_TIME_COLUMNS = (
+    ('displayStartAt_', 'displayEndAt_'),
+    ('startAt_', 'endAt_'),
+    ('openAt_', 'closeAt_'),
+    ('startTime_', 'endTime_'),
+    ('startDate_', 'endDate_'),
+)
+# 타임라인에 함께 보여줄 이름 컬럼 후보
+TIMELINE_TITLE_COLUMNS = ('subName_', 'title_', 'name_', 'description_')
+# DB의 시각이 기록된 시간대와 변환할 시간대
+SOURCE_TIMEZONE = 'America/Los_Angeles'
+TARGET_TIMEZONE = 'Asia/Seoul'
+# 시간대 정보(tzdata)를 쓸 수 없을 때 사용하는 고정 차이 (KST = PST + 17시간)
+FALLBACK_PST_TO_KST = timedelta(hours=17)
+# 연도가 없는 'MM/DD HH:MM' 형식 외에 인식하는 날짜 형식
+TIMELINE_DATETIME_FORMATS = ('%Y/%m/%d %H:%M', '%Y/%m/%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S')
+# 타임라인에 저장하는 KST 시각 문자열 형식 (문자열 비교 순서 = 시간 순서)
+TIMELINE_KST_FORMAT = '%Y-%m-%d %H:%M'
+
+
+def _load_timezones():
+    """(원본 시간대, 한국 시간대)를 반환합니다. 시간대 정보가 없는 환경이면 (None, None)을 반환합니다."""
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo(SOURCE_TIMEZONE), ZoneInfo(TARGET_TIMEZONE)
+    except Exception:  # Python 3.8 이하이거나 Windows에 tzdata 패키지가 없는 경우
+        return None, None
+
+
+_SOURCE_TZ, _TARGET_TZ = _load_timezones()
+_KST_FIXED = timezone(timedelta(hours=9))
+
+
+def _closest_year(month_day_time: datetime, reference: datetime) -> datetime:
+    """연도가 없는 시각에 기준 시각과 가장 가까운 연도(기준 연도 -1, 0, +1)를 붙입니다."""
+    candidates = []
+    for year in (reference.year - 1, reference.year, reference.year + 1):
+        try:
+            candidates.append(month_day_time.replace(year=year))
+        except ValueError:  # 윤년이 아닌 해의 2월 29일
+            continue
+    return min(candidates, key=lambda candidate: abs(candidate - reference))
+
+
+def pst_to_kst(value, reference: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    DB에 태평양 시간(PST/PDT)으로 기록된 시각을 한국 시간(KST) datetime으로 변환합니다.
+    - 'MM/DD HH:MM' 처럼 연도가 없는 값은 reference(기본값: 지금)와 가장 가까운 연도로 봅니다.
+    - 정수/실수 값은 UTC 기준 유닉스 시각(초, 밀리초)으로 봅니다.
+    - 서머타임을 반영하며, 시간대 정보가 없는 환경에서는 고정 17시간 차이를 사용합니다.
+    해석할 수 없는 값이면 None을 반환합니다.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        seconds = value / 1000 if abs(value) >= 10 ** 11 else value
+        return datetime.fromtimestamp(seconds, _TARGET_TZ or _KST_FIXED).replace(tzinfo=None)
+
+    text = str(value).strip()
+    local = None
+    for fmt in TIMELINE_DATETIME_FORMATS:
+        try:
+            local = datetime.strptime(text, fmt)
+            break
+        except ValueError:
+            continue
+    if local is None:
+        try:
+            # 2월 29일도 읽을 수 있도록 윤년(2000년)으로 먼저 해석합니다.
+            local = _closest_year(datetime.strptime(f"2000/{text}", '%Y/%m/%d %H:%M'), reference or datetime.now())
+        except ValueError:
+            return None
+
+    if _SOURCE_TZ is None:
+        return local + FALLBACK_PST_TO_KST
+    return local.replace(tzinfo=_SOURCE_TZ).astimezone(_TARGET_TZ).replace(tzinfo=None)
+
+
+def _find_column(columns: List[str], candidates: Iterable[str]) -> Optional[str]:
+    return next((column for column in candidates if column in columns), None)
+
+
+def _build_event_timeline(source: sqlite3.Connection, index: sqlite3.Connection, reference: datetime):
+    """
+    TIMELINE_TABLES의 시작/종료 시각을 KST로 바꿔 하나의 event_timeline 테이블에 저장합니다.
+    같은 시각 문자열은 한 번만 변환하며, 테이블마다 SELECT 한 번과 일괄 INSERT 한 번으로 처리합니다.
+    """
+    index.execute("DROP TABLE IF EXISTS event_timeline")
+    index.execute(
+        "CREATE TABLE event_timeline (table_name TEXT NOT NULL, source_rowid INTEGER NOT NULL, title, "
+        "start_kst TEXT, end_kst TEXT, start_ts INTEGER, end_ts INTEGER)"
+    )
+    converted = {}
+
+    def convert(value):
+        if value not in converted:
+            kst = pst_to_kst(value, reference)
+            converted[value] = (kst.strftime(TIMELINE_KST_FORMAT), _kst_timestamp(kst)) if kst else (None, None)
+        return converted[value]
+
+    existing = {row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    for table_name in TIMELINE_TABLES:
+        if table_name not in existing:
+            continue
+        columns = [row[1] for row in source.execute(f'PRAGMA table_info("{table_name}")')]
+        time_columns = next((pair for pair in TIMELINE_TIME_COLUMNS if pair[0] in columns and pair[1] in columns), None)
+        if time_columns is None:
+            continue
+        title_column = _find_column(columns, TIMELINE_TITLE_COLUMNS)
+        title = f'"{title_column}"' if title_column else 'NULL'
+        rows = source.execute(f'SELECT rowid, {title}, "{time_columns[0]}", "{time_columns[1]}" FROM "{table_name}"')
+        timeline_rows = []
+        for rowid, title_value, start, end in rows:
+            start_kst, start_ts = convert(start)
+            end_kst, end_ts = convert(end)
+            if start_ts is not None and end_ts is not None and end_ts < start_ts:
+                # 연도가 없는 종료 시각이 시작 시각보다 앞서면(연말~연초 이벤트) 시작 시각 기준으로 연도를 다시 정합니다.
+                end_dt = pst_to_kst(end, datetime.strptime(start_kst, TIMELINE_KST_FORMAT))
+                end_kst, end_ts = end_dt.strftime(TIMELINE_KST_FORMAT), _kst_timestamp(end_dt)
+            timeline_rows.append((table_name, rowid, title_value, start_kst, end_kst, start_ts, end_ts))
+        index.executemany("INSERT INTO event_timeline VALUES (?, ?, ?, ?, ?, ?, ?)", timeline_rows)
+    index.execute("CREATE INDEX event_timeline_start ON event_timeline (start_ts)")
+    index.execute("CREATE INDEX event_timeline_end ON event_timeline (end_ts)")
+
+
+def _kst_timestamp(value) -> int:
+    """KST datetime 또는 'YYYY-MM-DD HH:MM' 문자열을 유닉스 시각(초)으로 변환합니다."""
+    if not isinstance(value, datetime):
+        value = datetime.strptime(str(value).strip(), TIMELINE_KST_FORMAT)
+    return int(value.replace(tzinfo=_KST_FIXED).timestamp())
+
+
+def load_event_timeline(db_path: str) -> sqlite3.Connection:
+    """
+    이벤트 타임라인 인덱스를 준비하고 보조 DB 연결을 반환합니다.
+    연도가 없는 시각은 원본 DB 파일의 수정 시각과 가장 가까운 연도로 해석합니다.
+    """
+    reference = datetime.fromtimestamp(os.stat(db_path).st_mtime)
+    return ensure_index(db_path, 'event_timeline',
+                        lambda source, index: _build_event_timeline(source, index, reference))
+
+
+def find_active_events(db_path: str, start_kst, end_kst) -> List[Tuple]:
+    """
+    KST start_kst ~ end_kst 구간에 한 번이라도 진행 중인 항목을 시작 시각 순으로 반환합니다.
+    각 항목은 (테이블 이름, 원본 rowid, 이름, 시작 KST, 종료 KST)입니다. 종료 시각이 없는 항목은 계속 진행 중으로 봅니다.
+    """
+    conn = load_event_timeline(db_path)
+    return conn.execute(
+        "SELECT table_name, source_rowid, title, start_kst, end_kst FROM event_timeline "
+        "WHERE start_ts <= ? AND (end_ts >= ? OR end_ts IS NULL) ORDER BY start_ts, table_name, source_rowid",
+        (_kst_timestamp(end_kst), _kst_timestamp(start_kst)),
+    ).fetchall()
+
+
+# --- 이벤트 캐릭터(포뻥캐) 인덱스 ---
+
+# 이벤트 한 번에 IN (...)으로 묶어 다시 읽을 serverId_ 개수 (SQLite 파라미터 개수 제한 대비)
+EVENT_REFRESH_CHUNK_SIZE = 500
+# index_meta에 기록하는 이벤트 캐릭터 인덱스 이름 (테이블 구성이 바뀌면 이름을 바꿔 다시 만들게 함)
+EVENT_CHARACTER_INDEX = 'event_character:2'
+
+
+class EventDataError(ValueError):
+    """요청한 이벤트의 charactersJson_을 읽을 수 없을 때 발생합니다. (다른 이벤트의 조회에는 영향 없음)"""
+
+
+def _parse_character_ids(characters_json) -> List[int]:
+    """charactersJson_에서 캐릭터 serverId_ 목록을 꺼냅니다. 형식이 잘못되면 ValueError/AttributeError/TypeError를 냅니다."""
+    if not characters_json:
+        return []
+    server_ids = json.loads(characters_json).get('character_ids', [])
+    if not isinstance(server_ids, list) or not all(isinstance(server_id, int) for server_id in server_ids):
+        raise TypeError("character_ids가 정수 목록이 아닙니다.")
+    return server_ids
+
+
+def _event_columns(source: sqlite3.Connection) -> str:
+    """MstEventCharacterBoost_에서 읽을 (serverId_, updateTimestamp_, eventableType_) 컬럼 식을 반환합니다."""
+    columns = [row[1] for row in source.execute('PRAGMA table_info("MstEventCharacterBoost_")')]
+    eventable_type = '"eventableType_"' if 'eventableType_' in columns else 'NULL'
+    return f'"serverId_", "updateTimestamp_", {eventable_type}'
+
+
+def _build_event_characters(source: sqlite3.Connection, index: sqlite3.Connection):
+    """
+    MstEventCharacterBoost_의 charactersJson_을 풀어 이벤트-캐릭터 한 쌍을 한 행으로 저장합니다.
+    이미 만들어 둔 인덱스가 있으면 updateTimestamp_나 eventableType_이 바뀐 이벤트의 JSON만 다시 읽고,
+    logbook_id는 현재 MstCharacter_ 기준으로 모든 행을 한 번에 다시 맞춥니다.
+    charactersJson_을 읽을 수 없는 이벤트는 캐릭터 없이 bad_event에 오류와 함께 기록하고 나머지를 계속 처리합니다.
+    (해당 이벤트를 조회할 때만 EventDataError로 알림)
+    """
+    index.execute(
+        "CREATE TABLE IF NOT EXISTS event_source (event_server_id INTEGER PRIMARY KEY, update_ts INTEGER, eventable_type TEXT)"
+    )
+    index.execute(
+        "CREATE TABLE IF NOT EXISTS event_character (event_server_id INTEGER NOT NULL, update_ts INTEGER, "
+        "eventable_type TEXT, ord INTEGER NOT NULL, server_id INTEGER NOT NULL, logbook_id INTEGER, "
+        "PRIMARY KEY (event_server_id, ord))"
+    )
+    index.execute("CREATE TABLE IF NOT EXISTS bad_event (event_server_id INTEGER PRIMARY KEY, error TEXT NOT NULL)")
+    index.execute("CREATE INDEX IF NOT EXISTS event_character_update_ts ON event_character (update_ts)")
+    index.execute("CREATE INDEX IF NOT EXISTS event_character_type ON event_character (eventable_type)")
+    index.execute("CREATE INDEX IF NOT EXISTS event_character_server_id ON event_character (server_id)")
+    index.execute("CREATE INDEX IF NOT EXISTS event_character_logbook_id ON event_character (logbook_id)")
+
+    current = {row[0]: row for row in source.execute(f'SELECT {_event_columns(source)} FROM "MstEventCharacterBoost_"')}
+    stored = {row[0]: row for row in index.execute("SELECT event_server_id, update_ts, eventable_type FROM event_source")}
+    stale = [server_id for server_id, row in stored.items() if current.get(server_id) != row]
+    changed = [server_id for server_id, row in current.items() if stored.get(server_id) != row]
+
+    for server_id in stale:
+        index.execute("DELETE FROM event_source WHERE event_server_id = ?", (server_id,))
+        index.execute("DELETE FROM event_character WHERE event_server_id = ?", (server_id,))
+        index.execute("DELETE FROM bad_event WHERE event_server_id = ?", (server_id,))
+
+    for start in range(0, len(changed), EVENT_REFRESH_CHUNK_SIZE):
+        chunk = changed[start:start + EVENT_REFRESH_CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(chunk))
+        rows = source.execute(
+            f'SELECT {_event_columns(source)}, "charactersJson_" FROM "MstEventCharacterBoost_" '
+            f'WHERE "serverId_" IN ({placeholders})', chunk
+        ).fetchall()
+        character_rows = []
+        for event_server_id, update_ts, eventable_type, characters_json in rows:
+            index.execute("INSERT INTO event_source VALUES (?, ?, ?)", (event_server_id, update_ts, eventable_type))
+            try:
+                server_ids = _parse_character_ids(characters_json)
+            except (ValueError, AttributeError, TypeError) as e:
+                index.execute("INSERT INTO bad_event VALUES (?, ?)", (event_server_id, f"{type(e).__name__}: {e}"))
+                continue
+            character_rows.extend(
+                (event_server_id, update_ts, eventable_type, ord, server_id)
+                for ord, server_id in enumerate(server_ids)
+            )
+        index.executemany(
+            "INSERT INTO event_character (event_server_id, update_ts, eventable_type, ord, server_id) VALUES (?, ?, ?, ?, ?)",
+            character_rows,
+        )
+
+    # 같은 serverId_가 여러 번 나오면 CharacterIdIndex와 같이 원본 DB에서 나중에 나온 행을 사용합니다.
+    server_to_logbook = dict(source.execute(
+        "SELECT serverId_, logbookId_ FROM MstCharacter_ "
+        "WHERE serverId_ IS NOT NULL AND logbookId_ IS NOT NULL ORDER BY rowid"
+    ))
+    server_ids = [row[0] for row in index.execute("SELECT DISTINCT server_id FROM event_character")]
+    index.executemany(
+        "UPDATE event_character SET logbook_id = ? WHERE server_id = ? AND logbook_id IS NOT ?",
+        ((server_to_logbook.get(server_id), server_id, server_to_logbook.get(server_id)) for server_id in server_ids),
+    )
+
+
+def load_event_characters(db_path: str) -> sqlite3.Connection:
+    """이벤트 캐릭터 인덱스를 현재 원본 DB 기준으로 맞춘 뒤 보조 DB 연결을 반환합니다."""
+    return ensure_index(db_path, EVENT_CHARACTER_INDEX, _build_event_characters)
+
+
+def find_bad_events(db_path: str, column: Optional[str] = None, value=None) -> List[Tuple[int, str]]:
+    """
+    charactersJson_을 읽을 수 없었던 이벤트를 (serverId_, 오류 내용) 목록으로 반환합니다.
+    column('update_ts', 'event_server_id', 'eventable_type')을 넘기면 그 값이 value인 이벤트만 찾습니다.
+    """
+    conn = load_event_characters(db_path)
+    where = f" WHERE s.{column} = ?" if column else ""
+    return conn.execute(
+        f"SELECT b.event_server_id, b.error FROM bad_event AS b JOIN event_source AS s USING (event_server_id)"
+        f"{where} ORDER BY b.event_server_id", (value,) if column else ()
+    ).fetchall()
+
+
+def _raise_for_bad_events(db_path: str, column: str, value):
+    bad_events = find_bad_events(db_path, column, value)
+    if bad_events:
+        details = ', '.join(f"serverId {server_id} ({error})" for server_id, error in bad_events)
+        raise EventDataError(f"charactersJson_을 읽을 수 없는 이벤트가 있습니다: {details}")
+
+
+def _find_event_characters(db_path: str, column: str, value) -> Optional[List[Tuple[int, Optional[int]]]]:
+    conn = load_event_characters(db_path)
+    if conn.execute(f"SELECT 1 FROM event_source WHERE {column} = ? LIMIT 1", (value,)).fetchone() is None:
+        return None
+    _raise_for_bad_events(db_path, column, value)
+    return conn.execute(
+        f"SELECT server_id, logbook_id FROM event_character WHERE {column} = ? ORDER BY event_server_id, ord", (value,)
+    ).fetchall()
+
+
+def find_event_characters_by_timestamp(db_path: str, update_ts) -> Optional[List[Tuple[int, Optional[int]]]]:
+    """
+    updateTimestamp_가 update_ts인 이벤트들의 캐릭터를 (serverId_, logbookId_) 목록으로 반환합니다.
+    logbookId_로 변환할 수 없는 캐릭터는 logbookId_가 None입니다. 해당 이벤트가 없으면 None을 반환합니다.
+    이벤트 중 charactersJson_을 읽을 수 없는 것이 있으면 EventDataError를 냅니다.
+    """
+    return _find_event_characters(db_path, 'update_ts', update_ts)
+
+
+def find_event_characters_by_server_id(db_path: str, event_server_id) -> Optional[List[Tuple[int, Optional[int]]]]:
+    """
+    serverId_가 event_server_id인 이벤트의 캐릭터를 (serverId_, logbookId_) 목록으로 반환합니다. 이벤트가 없으면 None.
+    charactersJson_을 읽을 수 없는 이벤트이면 EventDataError를 냅니다.
+    """
+    return _find_event_characters(db_path, 'event_server_id', event_server_id)
+
+
+def count_events_without_type(db_path: str) -> int:
+    """eventableType_이 NULL이라 종류를 알 수 없는 이벤트 수를 반환합니다."""
+    conn = load_event_characters(db_path)
+    return conn.execute("SELECT COUNT(*) FROM event_source WHERE eventable_type IS NULL").fetchone()[0]
+
+
+def event_characters_by_type(db_path: str) -> Dict[str, List[Tuple[int, int, List[int]]]]:
+    """
+    eventableType_마다 모든 이벤트의 캐릭터를 한 번의 쿼리로 모읍니다.
+    eventableType_ -> [(이벤트 serverId_, updateTimestamp_, 정렬된 logbookId_ 목록), ...]을 최신 이벤트부터 반환하며,
+    변환할 수 없는 캐릭터는 제외합니다. charactersJson_을 읽을 수 없는 이벤트는 건너뜁니다. (find_bad_events 참고)
+    eventableType_이 NULL인 이벤트는 포함되지 않으므로(count_events_without_type 참고),
+    원본 DB에 eventableType_ 컬럼이 아예 없으면 빈 결과 대신 sqlite3.OperationalError를 냅니다.
+    """
+    columns = [row[1] for row in get_connection(db_path).execute('PRAGMA table_info("MstEventCharacterBoost_")')]
+    if 'eventableType_' not in columns:
+        raise sqlite3.OperationalError("MstEventCharacterBoost_ 테이블에 eventableType_ 컬럼이 없어 이벤트 종류별로 나눌 수 없습니다.")
+    conn = load_event_characters(db_path)
+    rows = conn.execute(
+        "SELECT s.eventable_type, s.event_server_id, s.update_ts, c.logbook_id FROM event_source AS s "
+        "LEFT JOIN event_character AS c ON c.event_server_id = s.event_server_id AND c.logbook_id IS NOT NULL "
+        "WHERE s.eventable_type IS NOT NULL AND s.event_server_id NOT IN (SELECT event_server_id FROM bad_event) "
+        "ORDER BY s.eventable_type, s.update_ts DESC, s.event_server_id, c.logbook_id"
+    )
+    events: Dict[str, List[Tuple[int, int, List[int]]]] = {}
+    for eventable_type, event_server_id, update_ts, logbook_id in rows:
+        type_events = events.setdefault(eventable_type, [])
+        if not type_events or type_events[-1][0] != event_server_id:
+            type_events.append((event_server_id, update_ts, []))
+        if logbook_id is not None:
+            type_events[-1][2].append(logbook_id)
+    return events
+
+
+# --- 캐릭터 -> 이벤트 로스터(비트셋) 인덱스 ---
+
+class EventRosterIndex:
+    """
+    '이 캐릭터가 어떤 포뻥 이벤트에 들어 있었나'를 비트 연산으로 답하는 메모리 인덱스.
+    이벤트마다 비트 하나를 정하고(serverId_ 순), 캐릭터(logbookId_)마다 들어 있던 이벤트의 비트를 모은 정수를 보관합니다.
+    포함 여부, 교집합, 합집합은 정수 비트 연산 한 번으로 처리됩니다.
+    """
+
+    def __init__(self, events: Iterable, memberships: Iterable):
+        # 비트 위치 -> (이벤트 serverId_, updateTimestamp_, eventableType_)
+        self.events: List[Tuple] = list(events)
+        self.bit_of: Dict[int, int] = {event[0]: bit for bit, event in enumerate(self.events)}
+        self.type_masks: Dict[Optional[str], int] = {}
+        for bit, (_, _, eventable_type) in enumerate(self.events):
+            self.type_masks[eventable_type] = self.type_masks.get(eventable_type, 0) | (1 << bit)
+        self.masks: Dict[int, int] = {}
+        for logbook_id, event_server_id in memberships:
+            self.masks[logbook_id] = self.masks.get(logbook_id, 0) | (1 << self.bit_of[event_server_id])
+
+    def mask(self, logbook_id) -> int:
+        """캐릭터가 들어 있던 이벤트들의 비트셋을 반환합니다. (없으면 0)"""
+        return self.masks.get(logbook_id, 0)
+
+    def events_in(self, mask: int) -> List[Tuple]:
+        """비트셋에 들어 있는 이벤트들을 (serverId_, updateTimestamp_, eventableType_) 목록으로 반환합니다."""
+        events = []
+        while mask:
+            low_bit = mask & -mask
+            events.append(self.events[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return events
+
+    def events_of(self, logbook_id) -> List[Tuple]:
+        """캐릭터가 들어 있던 이벤트 목록을 반환합니다."""
+        return self.events_in(self.mask(logbook_id))
+
+    def is_boosted(self, logbook_id, event_server_id) -> bool:
+        """캐릭터가 해당 이벤트(serverId_)의 포뻥캐인지 확인합니다."""
+        bit = self.bit_of.get(event_server_id)
+        return bit is not None and bool(self.mask(logbook_id) >> bit & 1)
+
+    def common_mask(self, logbook_ids: Iterable) -> int:
+        """모든 캐릭터가 함께 들어 있던 이벤트의 비트셋(교집합)을 반환합니다."""
+        masks = [self.mask(logbook_id) for logbook_id in logbook_ids]
+        common = masks[0] if masks else 0
+        for mask in masks[1:]:
+            common &= mask
+        return common
+
+    def any_mask(self, logbook_ids: Iterable) -> int:
+        """캐릭터 중 하나라도 들어 있던 이벤트의 비트셋(합집합)을 반환합니다."""
+        combined = 0
+        for logbook_id in logbook_ids:
+            combined |= self.mask(logbook_id)
+        return combined
+
+    def boosted_in_all(self, logbook_id, eventable_type) -> bool:
+        """캐릭터가 해당 eventableType_의 모든 이벤트에 들어 있었는지 확인합니다."""
+        type_mask = self.type_masks.get(eventable_type, 0)
+        return bool(type_mask) and self.mask(logbook_id) & type_mask == type_mask
+
+    def characters_in_all(self, eventable_type) -> List[int]:
+        """해당 eventableType_의 모든 이벤트에 들어 있었던 캐릭터의 logbookId_ 목록을 반환합니다."""
+        type_mask = self.type_masks.get(eventable_type, 0)
+        if not type_mask:
+            return []
+        return sorted(logbook_id for logbook_id, mask in self.masks.items() if mask & type_mask == type_mask)
+
+
+def load_event_roster_index(db_path: str) -> EventRosterIndex:
+    """
+    캐릭터 -> 이벤트 로스터 비트셋 인덱스를 반환합니다.
+    보조 DB의 event_character 테이블을 한 번 읽어 만들며, 원본 DB가 바뀌지 않았으면 메모리의 인덱스를 재사용합니다.
+    """
+    key = os.path.abspath(db_path)
+    fingerprint = db_fingerprint(db_path)
+    cached = _roster_indexes.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    conn = load_event_characters(db_path)
+    roster = EventRosterIndex(
+        conn.execute("SELECT event_server_id, update_ts, eventable_type FROM event_source ORDER BY event_server_id"),
+        conn.execute("SELECT DISTINCT logbook_id, event_server_id FROM event_character WHERE logbook_id IS NOT NULL"),
+    )
+    _roster_indexes[key] = (fingerprint, roster)
+    return roster
@@ -1,22 +1,65 @@
 import sqlite3
-import json
 import os
+import sys
+import argparse
 import pyperclip
 
-def find_db_file(directory='.'):
+# 저장소 루트의 공용 모듈(sakura_db.py)을 불러오기 위해 상위 폴더를 경로에 추가합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sakura_db import find_db_file
+from sakura_index import (EventDataError, count_events_without_type, event_characters_by_type, find_bad_events,
+                          find_event_characters_by_timestamp, load_event_roster_index)
+
+# eventableType_ -> (이벤트 이름, 결과를 붙여넣을 filters 항목)
+# 대난투(filters.comodorevsempress)처럼 여기에 없는 종류는 EVENT_FILTERS_FILE에 적어 추가합니다.
+EVENT_FILTERS = {
+    'MapGameEvent': ('트레저맵', 'filters.globalTM'),
+    'KizunaBattleEvent': ('유대결전', 'filters.globalKC'),
+    'TrailEvent': ('해적왕의 궤적', 'filters.globalPKA'),
+}
+# 사용자가 eventableType_과 filters 항목을 추가/변경하는 설정 파일 (스크립트 폴더 기준)
+EVENT_FILTERS_FILE = 'event_filters.txt'
+# --all 결과를 저장할 파일 이름
+FILTERS_OUTPUT_NAME = 'filters.txt'
+
+
+def load_event_filters(path=None):
     """
-    현재 디렉토리에서 .db 파일을 찾아 파일 이름을 반환합니다.
+    기본 EVENT_FILTERS에 설정 파일(EVENT_FILTERS_FILE)의 항목을 더한 표를 반환합니다.
+    설정 파일의 각 줄은 'eventableType_ = 이벤트 이름, filters 항목' 형식이며, '#'으로 시작하는 줄은 무시합니다.
     """
-    db_files = [f for f in os.listdir(directory) if f.endswith('.db')]
-    
-    if not db_files:
-        print("❌ 오류: 스크립트가 있는 폴더에서 .db 파일을 찾을 수 없습니다.")
-        return None
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), EVENT_FILTERS_FILE)
+    event_filters = dict(EVENT_FILTERS)
+    if not os.path.exists(path):
+        return event_filters
+
+    with open(path, encoding='utf-8-sig') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            eventable_type, equals, value = line.partition('=')
+            event_name, comma, filter_name = value.partition(',')
+            if not equals or not comma or not eventable_type.strip() or not filter_name.strip():
+                print(f"⚠️ 경고: '{EVENT_FILTERS_FILE}' {line_number}번째 줄의 형식이 잘못되어 무시합니다: {line}")
+                continue
+            event_filters[eventable_type.strip()] = (event_name.strip(), filter_name.strip())
+    return event_filters
+
+
+def format_logbook_ids(logbook_ids):
+    """로그북 ID 목록을 10개씩 묶어 들여쓰기한 붙여넣기용 문자열로 만듭니다."""
+    output_lines = []
+    chunks = [logbook_ids[i:i + 10] for i in range(0, len(logbook_ids), 10)]
     
-    if len(db_files) > 1:
-        print(f"알림: 여러 개의 .db 파일이 발견되었습니다. 첫 번째 파일인 '{db_files[0]}'을(를) 사용합니다.")
+    for chunk in chunks:
+        number_part = ", ".join(map(str, chunk)) + ","
+        indented_line = f"\t\t\t\t\t{number_part}"
+        output_lines.append(indented_line)
     
-    return db_files[0]
+    return "\n".join(output_lines)
+
 
 def copy_boost_characters():
     """
@@ -35,39 +78,20 @@ def copy_boost_characters():
             print("알림: 작업이 취소되었습니다.")
             return
 
-        # --- 3. 데이터베이스 연결 ---
-        conn = sqlite3.connect(db_filename)
+        # --- 3. 이벤트 캐릭터 조회 ---
+        # charactersJson_은 보조 인덱스(sakura_index.py)에 한 번만 풀어 두고, 타임스탬프로 바로 찾습니다.
         print(f"\n✅ 데이터베이스 '{db_filename}'에 연결되었습니다.")
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT charactersJson_ FROM MstEventCharacterBoost_ WHERE updateTimestamp_ = ?", (timestamp_input,))
-        results = cursor.fetchall()
+        characters = find_event_characters_by_timestamp(db_filename, timestamp_input)
 
-        if not results:
+        if characters is None:
             print(f"결과 없음: 입력한 타임스탬프 '{timestamp_input}'에 해당하는 이벤트를 찾을 수 없습니다.")
-            conn.close()
             return
-            
-        all_server_ids = []
-        for row in results:
-            json_data = json.loads(row[0])
-            server_ids_in_row = json_data.get('character_ids', [])
-            all_server_ids.extend(server_ids_in_row)
-
-        if not all_server_ids:
+
+        if not characters:
             print("정보: 해당 이벤트에 지정된 캐릭터가 없습니다.")
-            conn.close()
             return
-            
-        placeholders = ','.join(['?'] * len(all_server_ids))
-        query = f"SELECT serverId_, logbookId_ FROM MstCharacter_ WHERE serverId_ IN ({placeholders})"
-        
-        cursor.execute(query, all_server_ids)
-        id_map = {server_id: logbook_id for server_id, logbook_id in cursor.fetchall()}
-        
-        conn.close()
-        
-        logbook_ids = [id_map.get(sid) for sid in all_server_ids if id_map.get(sid) is not None]
+
+        logbook_ids = [logbook_id for _, logbook_id in characters if logbook_id is not None]
         
         logbook_ids.sort()
 
@@ -75,15 +99,7 @@ def copy_boost_characters():
             print("오류: 캐릭터 ID를 logbook ID로 변환하는 데 실패했습니다.")
             return
 
-        output_lines = []
-        chunks = [logbook_ids[i:i + 10] for i in range(0, len(logbook_ids), 10)]
-        
-        for chunk in chunks:
-            number_part = ", ".join(map(str, chunk)) + ","
-            indented_line = f"\t\t\t\t\t{number_part}"
-            output_lines.append(indented_line)
-        
-        final_output = "\n".join(output_lines)
+        final_output = format_logbook_ids(logbook_ids)
 
         pyperclip.copy(final_output)
         
@@ -94,10 +110,130 @@ def copy_boost_characters():
 
     except sqlite3.Error as e:
         print(f"데이터베이스 오류: 데이터베이스 처리 중 오류가 발생했습니다:\n{e}")
-    except json.JSONDecodeError:
-        print("JSON 오류: 데이터베이스의 charactersJson_ 형식이 잘못되었습니다.")
+    except EventDataError as e:
+        print(f"JSON 오류: 데이터베이스의 charactersJson_ 형식이 잘못되었습니다.\n{e}")
+    except Exception as e:
+        print(f"알 수 없는 오류: 알 수 없는 오류가 발생했습니다:\n{e}")
+
+def export_all_filters(output_path=FILTERS_OUTPUT_NAME, timestamps=None):
+    """
+    filters 항목을 아는 eventableType_마다 모든 이벤트(최신순)의 캐릭터를 모아 filters 블록 전체를 한 번에 만듭니다.
+    블록마다 serverId와 updateTimestamp_를 적어 두므로 필요한 이벤트를 골라 붙여넣을 수 있고,
+    timestamps를 넘기면 updateTimestamp_가 그 안에 있는 이벤트만 만듭니다.
+    결과는 output_path 파일로 저장하고 클립보드에도 복사합니다.
+    eventableType_이 비어 있거나 charactersJson_을 읽을 수 없는 이벤트는 오류로, filters 항목을 모르는 종류는 경고로 알리고 제외합니다.
+    """
+    try:
+        db_filename = find_db_file()
+        if not db_filename:
+            return
+
+        event_filters = load_event_filters()
+        events_by_type = event_characters_by_type(db_filename)
+        untyped_count = count_events_without_type(db_filename)
+        if untyped_count:
+            print(f"❌ 오류: eventableType_이 비어 있는(NULL) 이벤트 {untyped_count}개는 종류를 알 수 없어 제외했습니다.")
+
+        for eventable_type in sorted(t for t in events_by_type if t not in event_filters):
+            print(f"⚠️ 경고: filters 항목을 모르는 eventableType_ '{eventable_type}'은(는) 건너뜁니다. "
+                  f"('{EVENT_FILTERS_FILE}'에 추가하면 함께 저장됩니다)")
+
+        for eventable_type, (event_name, _) in event_filters.items():
+            for server_id, error in find_bad_events(db_filename, 'eventable_type', eventable_type):
+                print(f"❌ 오류: {event_name} 이벤트 serverId {server_id}의 charactersJson_을 읽을 수 없어 제외했습니다. ({error})")
+
+        blocks = []
+        found_timestamps = set()
+        for eventable_type in (t for t in event_filters if t in events_by_type):
+            event_name, filter_name = event_filters[eventable_type]
+            type_events = [event for event in events_by_type[eventable_type]
+                           if timestamps is None or event[1] in timestamps]
+            for event_server_id, update_ts, logbook_ids in type_events:
+                found_timestamps.add(update_ts)
+                if not logbook_ids:
+                    print(f"ℹ️ {event_name} serverId {event_server_id}: 변환할 수 있는 캐릭터가 없어 건너뜁니다.")
+                    continue
+                blocks.append(f"// {event_name} ({eventable_type}, serverId {event_server_id}, "
+                              f"updateTimestamp_ {update_ts}) -> {filter_name}\n{format_logbook_ids(logbook_ids)}")
+            if type_events:
+                print(f"✅ {event_name}: 이벤트 {len(type_events)}개 (최신 updateTimestamp_ {type_events[0][1]})")
+
+        if timestamps is not None:
+            for update_ts in sorted(set(timestamps) - found_timestamps):
+                print(f"⚠️ 경고: updateTimestamp_ {update_ts}에 해당하는 이벤트를 찾을 수 없습니다.")
+
+        if not blocks:
+            print("결과 없음: filters 항목을 아는 종류의 이벤트 중 변환할 수 있는 캐릭터가 있는 이벤트가 없습니다.")
+            return
+
+        final_output = "\n\n".join(blocks)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(final_output + "\n")
+        pyperclip.copy(final_output)
+
+        print("\n--- 📋 복사 완료 ---")
+        print(f"이벤트 {len(blocks)}개의 filters 블록을 '{output_path}' 파일로 저장하고 클립보드에 복사했습니다.")
+
+    except sqlite3.Error as e:
+        print(f"데이터베이스 오류: 데이터베이스 처리 중 오류가 발생했습니다:\n{e}")
+    except EventDataError as e:
+        print(f"JSON 오류: 데이터베이스의 charactersJson_ 형식이 잘못되었습니다.\n{e}")
+    except Exception as e:
+        print(f"알 수 없는 오류: 알 수 없는 오류가 발생했습니다:\n{e}")
+
+def show_character_events(logbook_ids):
+    """
+    캐릭터(logbookId)마다 포뻥캐로 들어 있던 이벤트를 출력합니다.
+    여러 캐릭터를 입력하면 모두 함께 들어 있던 이벤트도 출력합니다.
+    """
+    try:
+        db_filename = find_db_file()
+        if not db_filename:
+            return
+
+        roster = load_event_roster_index(db_filename)
+        event_filters = load_event_filters()
+
+        def describe(event):
+            event_server_id, update_ts, eventable_type = event
+            event_name = event_filters.get(eventable_type, (eventable_type,))[0]
+            return f"serverId {event_server_id} | updateTimestamp_ {update_ts} | {event_name}"
+
+        for logbook_id in logbook_ids:
+            events = roster.events_of(logbook_id)
+            print(f"\n--- 🔎 {logbook_id}: {len(events)}개 이벤트 ---")
+            for event in events:
+                print(describe(event))
+            full_types = [event_filters.get(t, (t,))[0] for t in roster.type_masks if roster.boosted_in_all(logbook_id, t)]
+            if full_types:
+                print(f"전부 포함된 이벤트 종류: {', '.join(map(str, full_types))}")
+
+        if len(logbook_ids) > 1:
+            common_events = roster.events_in(roster.common_mask(logbook_ids))
+            print(f"\n--- 🤝 모두 함께 들어 있던 이벤트: {len(common_events)}개 ---")
+            for event in common_events:
+                print(describe(event))
+
+    except sqlite3.Error as e:
+        print(f"데이터베이스 오류: 데이터베이스 처리 중 오류가 발생했습니다:\n{e}")
+    except EventDataError as e:
+        print(f"JSON 오류: 데이터베이스의 charactersJson_ 형식이 잘못되었습니다.\n{e}")
     except Exception as e:
         print(f"알 수 없는 오류: 알 수 없는 오류가 발생했습니다:\n{e}")
 
 if __name__ == "__main__":
-    copy_boost_characters()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="포뻥캐 목록을 logbookId로 변환하여 복사합니다.")
+    parser.add_argument('--all', action='store_true',
+                        help=f"eventableType_마다 모든 이벤트(최신순)의 filters 블록을 한 번에 만들어 '{FILTERS_OUTPUT_NAME}'에 저장합니다.")
+    parser.add_argument('--timestamp', type=int, nargs='+', metavar='UPDATE_TIMESTAMP',
+                        help="--all에서 updateTimestamp_가 입력한 값인 이벤트만 만듭니다.")
+    parser.add_argument('--output', default=FILTERS_OUTPUT_NAME, help="--all 결과를 저장할 파일")
+    parser.add_argument('--character', type=int, nargs='+', metavar='LOGBOOK_ID',
+                        help="입력한 캐릭터(logbookId)가 포뻥캐로 들어 있던 이벤트를 출력합니다.")
+    args = parser.parse_args()
+    if args.character:
+        show_character_events(args.character)
+    elif args.all:
+        export_all_filters(args.output, set(args.timestamp) if args.timestamp else None)
+    else:
+        copy_boost_characters()
\ No newline at end of file
@@ -1,29 +1,138 @@
 import sqlite3
-import json
 import os
+import sys
 import shutil
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import pyperclip
 
-def find_db_file(directory='.'):
+# 저장소 루트의 공용 모듈(sakura_db.py)을 불러오기 위해 상위 폴더를 경로에 추가합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sakura_db import find_db_file
+from sakura_index import EventDataError, find_event_characters_by_server_id
+
+# 원본 이미지 폴더와 추출한 이미지를 모을 폴더 이름 (스크립트 폴더 기준)
+IMAGE_SOURCE_FOLDER = "jap"
+IMAGE_DESTINATION_FOLDER = "추출된_이미지"
+# 이미지를 동시에 처리할 스레드 수
+IMAGE_COPY_WORKERS = 8
+# 리눅스에서 파일 내용을 공유하는 복사본(reflink)을 만드는 ioctl 번호 (btrfs, XFS 등에서만 지원)
+FICLONE = 0x40049409
+
+
+def find_portrait_files(source_folder):
+    """
+    원본 폴더를 한 번만 훑어 logbookId -> 이미지 파일 이름 표를 만듭니다.
+    '1.png'처럼 logbookId와 이름이 정확히 같은 파일을 우선 사용하고, 없을 때만 '0001.png'처럼
+    앞에 0이 붙은 파일을 사용합니다. (그런 파일이 여러 개이면 이름순으로 첫 번째 파일)
+    """
+    portraits = {}
+    with os.scandir(source_folder) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext.lower() != '.png' or not stem.isdigit() or not entry.is_file():
+                continue
+            logbook_id = int(stem)
+            current = portraits.get(logbook_id)
+            if current is None or _portrait_priority(entry.name) < _portrait_priority(current):
+                portraits[logbook_id] = entry.name
+    return portraits
+
+
+def _portrait_priority(file_name):
+    """같은 logbookId의 이미지 파일 중 사용할 파일을 고르는 정렬 키 (앞에 0이 없는 이름 우선, 그다음 이름순)"""
+    stem = os.path.splitext(file_name)[0]
+    return stem != str(int(stem)), file_name
+
+
+def reflink_file(source_path, destination_path):
+    """
+    reflink(쓰기 시 복사)로 파일을 복사하고 성공 여부를 반환합니다. 복사본을 수정해도 원본은 바뀌지 않습니다.
+    지원하지 않는 운영체제나 파일 시스템이면 만들다 만 파일을 지우고 False를 반환합니다.
     """
-    현재 디렉토리에서 .db 파일을 찾아 파일 이름을 반환합니다.
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        return False
+    try:
+        with open(source_path, 'rb') as source, open(destination_path, 'wb') as destination:
+            fcntl.ioctl(destination.fileno(), FICLONE, source.fileno())
+    except OSError:
+        if os.path.exists(destination_path):
+            os.remove(destination_path)
+        return False
+    shutil.copystat(source_path, destination_path)
+    return True
+
+
+def extract_portrait(source_path, destination_path, use_links=False):
     """
-    db_files = [f for f in os.listdir(directory) if f.endswith('.db')]
-    
-    if not db_files:
-        print("❌ 오류: 스크립트가 있는 폴더에서 .db 파일을 찾을 수 없습니다.")
-        return None
-    
-    if len(db_files) > 1:
-        print(f"알림: 여러 개의 .db 파일이 발견되었습니다. 첫 번째 파일인 '{db_files[0]}'을(를) 사용합니다.")
-    
-    return db_files[0]
-
-def convert_and_extract_images_from_subfolder():
+    이미지 한 장을 추출 폴더로 가져오고 처리 결과('skipped', 'linked', 'reflinked', 'copied')를 반환합니다.
+    - 크기와 수정 시각이 같은 파일이 이미 있으면 건너뜁니다.
+    - 기본은 reflink를 먼저 시도하고, 파일 시스템이 지원하지 않으면 일반 복사를 합니다.
+    - use_links이면 하드 링크를 먼저 시도합니다. 하드 링크는 원본과 같은 파일이므로 추출된 이미지를 수정하면 원본도 바뀝니다.
     """
-    MstEventCharacterBoost_ 테이블의 serverId를 입력받아,
+    source_stat = os.stat(source_path)
+    try:
+        destination_stat = os.stat(destination_path)
+    except FileNotFoundError:
+        destination_stat = None
+
+    if destination_stat is not None:
+        # 하드 링크를 쓰지 않는 경우에는 예전에 만든 하드 링크도 실제 복사본으로 바꿉니다.
+        linked_but_copy_only = not use_links and os.path.samestat(source_stat, destination_stat)
+        if (destination_stat.st_size == source_stat.st_size and not linked_but_copy_only
+                and int(destination_stat.st_mtime) == int(source_stat.st_mtime)):
+            return 'skipped'
+        os.remove(destination_path)
+
+    if use_links:
+        try:
+            os.link(source_path, destination_path)
+            return 'linked'
+        except OSError:
+            pass  # 다른 드라이브이거나 하드 링크를 지원하지 않는 파일 시스템이면 복사합니다.
+    if reflink_file(source_path, destination_path):
+        return 'reflinked'
+    shutil.copy2(source_path, destination_path)
+    return 'copied'
+
+
+def extract_portraits(logbook_ids, source_folder, destination_folder, workers=IMAGE_COPY_WORKERS, use_links=False):
+    """
+    logbookId 목록에 맞는 이미지를 스레드 여러 개로 추출하고 처리 결과별 개수를 반환합니다.
+    추출한 이미지는 원본 파일 이름과 관계없이 항상 '<logbookId>.png'로 저장합니다. ('0001.png' -> '1.png')
+    """
+    os.makedirs(destination_folder, exist_ok=True)
+    portraits = find_portrait_files(source_folder)
+    jobs = [
+        (os.path.join(source_folder, portraits[logbook_id]), os.path.join(destination_folder, f"{logbook_id}.png"))
+        for logbook_id in dict.fromkeys(logbook_ids) if logbook_id in portraits
+    ]
+    if not jobs:
+        return Counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        return Counter(pool.map(lambda job: extract_portrait(*job, use_links), jobs))
+
+
+def format_logbook_ids(logbook_ids):
+    """로그북 ID 목록을 10개씩 묶어 들여쓰기한 붙여넣기용 문자열로 만듭니다."""
+    output_lines = []
+    chunks = [logbook_ids[i:i + 10] for i in range(0, len(logbook_ids), 10)]
+    for chunk in chunks:
+        number_part = ", ".join(map(str, chunk)) + ","
+        indented_line = f"\t\t\t\t{number_part}"
+        output_lines.append(indented_line)
+    return "\n".join(output_lines)
+
+
+def convert_and_extract_images_from_subfolder(server_ids=None, workers=IMAGE_COPY_WORKERS, use_links=False):
+    """
+    MstEventCharacterBoost_ 테이블의 serverId를 하나 이상 받아,
     해당 row의 charactersJson_ 안의 모든 ID를 logbookId로 변환하고,
-    변환된 ID와 일치하는 png 이미지를 'jap' 하위 폴더에서 찾아 별도 폴더에 복사한다.
+    변환된 ID와 일치하는 png 이미지를 'jap' 하위 폴더에서 찾아 별도 폴더에 추출한다.
+    server_ids가 없으면 터미널에서 입력받는다.
     """
     try:
         # --- 1. DB 파일 자동 찾기 ---
@@ -32,81 +141,69 @@ def convert_and_extract_images_from_subfolder():
             return
 
         # --- 2. 터미널에서 사용자 입력받기 ---
-        server_id_input = input("이벤트를 찾을 기준 serverId 한 개를 입력하세요 (MstEventCharacterBoost_ 테이블 기준): ")
+        if not server_ids:
+            server_id_input = input("이벤트를 찾을 기준 serverId를 입력하세요 (여러 개는 쉼표(,)나 공백으로 구분, MstEventCharacterBoost_ 테이블 기준): ")
+            server_ids = server_id_input.replace(',', ' ').split()
 
-        if not server_id_input.strip().isdigit():
+        if not server_ids or not all(str(server_id).isdigit() for server_id in server_ids):
             print("\n입력 오류: 올바른 Server ID(숫자)를 입력해주세요.")
             return
 
-        # --- 3. 데이터베이스 연결 ---
-        conn = sqlite3.connect(db_filename)
+        # --- 3. 이벤트 캐릭터 조회 ---
+        # charactersJson_은 보조 인덱스(sakura_index.py)에 한 번만 풀어 두고, 이벤트 serverId로 바로 찾습니다.
         print(f"\n✅ 성공: 데이터베이스 '{db_filename}'에 정상적으로 연결되었습니다.")
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT charactersJson_ FROM MstEventCharacterBoost_ WHERE serverId_ = ?", (server_id_input,))
-        result = cursor.fetchone()
-
-        if not result or result[0] is None:
-            print(f"\n결과 없음: MstEventCharacterBoost_ 테이블에서 Server ID '{server_id_input}'를 찾을 수 없거나 해당 이벤트에 JSON 데이터가 없습니다.")
-            conn.close()
-            return
-            
-        try:
-            json_data = json.loads(result[0])
-            ids_to_convert = json_data.get('character_ids', [])
-        except json.JSONDecodeError:
-            print("\nJSON 오류: 데이터베이스의 charactersJson_ 형식이 잘못되었습니다.")
-            conn.close()
-            return
+        event_logbook_ids = {}
+        for server_id in server_ids:
+            try:
+                characters = find_event_characters_by_server_id(db_filename, int(server_id))
+            except EventDataError as e:
+                print(f"\nJSON 오류: Server ID '{server_id}'의 charactersJson_ 형식이 잘못되어 건너뜁니다.\n{e}")
+                continue
 
-        if not ids_to_convert:
-            print("\n정보: JSON 데이터 안에 변환할 캐릭터 ID가 없습니다.")
-            conn.close()
-            return
-            
-        placeholders = ','.join(['?'] * len(ids_to_convert))
-        query = f"SELECT serverId_, logbookId_ FROM MstCharacter_ WHERE serverId_ IN ({placeholders})"
-        cursor.execute(query, ids_to_convert)
-        id_map = {server_id: logbook_id for server_id, logbook_id in cursor.fetchall()}
-        conn.close()
-        
-        logbook_ids = sorted([id_map.get(sid) for sid in ids_to_convert if id_map.get(sid) is not None])
-
-        if not logbook_ids:
-            print("\n변환 오류: JSON 안의 ID들을 logbook ID로 변환하는 데 실패했습니다.")
+            if characters is None:
+                print(f"\n결과 없음: MstEventCharacterBoost_ 테이블에서 Server ID '{server_id}'를 찾을 수 없거나 해당 이벤트에 JSON 데이터가 없습니다.")
+                continue
+
+            if not characters:
+                print(f"\n정보: Server ID '{server_id}'의 JSON 데이터 안에 변환할 캐릭터 ID가 없습니다.")
+                continue
+
+            logbook_ids = sorted(logbook_id for _, logbook_id in characters if logbook_id is not None)
+
+            if not logbook_ids:
+                print(f"\n변환 오류: Server ID '{server_id}'의 JSON 안의 ID들을 logbook ID로 변환하는 데 실패했습니다.")
+                continue
+
+            event_logbook_ids[server_id] = logbook_ids
+
+        if not event_logbook_ids:
             return
 
         # --- 텍스트 복사 로직 ---
-        output_lines = []
-        chunks = [logbook_ids[i:i + 10] for i in range(0, len(logbook_ids), 10)]
-        for chunk in chunks:
-            number_part = ", ".join(map(str, chunk)) + ","
-            indented_line = f"\t\t\t\t{number_part}"
-            output_lines.append(indented_line)
-        final_output = "\n".join(output_lines)
+        # 이벤트가 여러 개이면 이벤트마다 serverId 주석을 붙여 블록을 나눕니다.
+        if len(event_logbook_ids) == 1:
+            final_output = format_logbook_ids(next(iter(event_logbook_ids.values())))
+        else:
+            final_output = "\n\n".join(
+                f"// serverId {server_id}\n{format_logbook_ids(logbook_ids)}"
+                for server_id, logbook_ids in event_logbook_ids.items()
+            )
         pyperclip.copy(final_output)
-        
+
         # --- 이미지 추출 로직 ---
         script_folder = os.path.dirname(os.path.abspath(__file__))
-        image_source_folder = os.path.join(script_folder, "jap")
-        destination_folder = os.path.join(script_folder, "추출된_이미지")
-        
-        os.makedirs(destination_folder, exist_ok=True)
-        
-        copied_files_count = 0
-        for logbook_id in logbook_ids:
-            image_filename = f"{logbook_id}.png"
-            source_path = os.path.join(image_source_folder, image_filename)
-            
-            if os.path.exists(source_path):
-                destination_path = os.path.join(destination_folder, image_filename)
-                shutil.copy2(source_path, destination_path)
-                copied_files_count += 1
-        
+        image_source_folder = os.path.join(script_folder, IMAGE_SOURCE_FOLDER)
+        destination_folder = os.path.join(script_folder, IMAGE_DESTINATION_FOLDER)
+
+        all_logbook_ids = [logbook_id for logbook_ids in event_logbook_ids.values() for logbook_id in logbook_ids]
+        results = extract_portraits(all_logbook_ids, image_source_folder, destination_folder, workers, use_links)
+
         # --- 최종 성공 메시지 ---
         print("\n--- ✅ 작업 완료 ---")
-        print(f"총 {len(logbook_ids)}개의 ID가 텍스트로 변환되어 클립보드에 복사되었습니다.")
-        print(f"또한, 'jap' 폴더에서 일치하는 이미지 {copied_files_count}개를 '추출된_이미지' 폴더에 복사했습니다.")
+        print(f"총 {len(event_logbook_ids)}개 이벤트의 ID {len(all_logbook_ids)}개가 텍스트로 변환되어 클립보드에 복사되었습니다.")
+        print(f"또한, '{IMAGE_SOURCE_FOLDER}' 폴더에서 일치하는 이미지 {sum(results.values())}개를 '{IMAGE_DESTINATION_FOLDER}' 폴더에 추출했습니다.")
+        print(f"(새로 복사 {results['copied'] + results['reflinked']}개, 하드 링크 {results['linked']}개, "
+              f"이미 있어서 건너뜀 {results['skipped']}개)")
 
     except sqlite3.Error as e:
         print(f"\n데이터베이스 오류: 데이터베이스 처리 중 오류가 발생했습니다:\n{e}")
@@ -114,4 +211,11 @@ def convert_and_extract_images_from_subfolder():
         print(f"\n알 수 없는 오류: 알 수 없는 오류가 발생했습니다:\n{e}")
 
 if __name__ == "__main__":
-    convert_and_extract_images_from_subfolder()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="포뻥캐 이벤트의 캐릭터 ID를 변환하고 이미지를 추출합니다.")
+    parser.add_argument('server_ids', nargs='*', help="MstEventCharacterBoost_의 serverId (생략하면 입력받습니다)")
+    parser.add_argument('--workers', type=int, default=IMAGE_COPY_WORKERS,
+                        help=f"이미지를 동시에 처리할 스레드 수 (기본값: {IMAGE_COPY_WORKERS})")
+    parser.add_argument('--link', action='store_true',
+                        help="복사 대신 하드 링크로 저장합니다. (빠르지만 추출된 이미지를 수정하면 'jap' 폴더의 원본도 바뀝니다)")
+    args = parser.parse_args()
+    convert_and_extract_images_from_subfolder(args.server_ids, args.workers, use_links=args.link)
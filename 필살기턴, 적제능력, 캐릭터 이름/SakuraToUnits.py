@@ -1,8 +1,29 @@
 import sqlite3
 import json
+import os
+import sys
+import argparse
+import hashlib
+import shutil
 
-conn = sqlite3.connect("data/sakura_ko.db")
-cursor = conn.cursor()
+# 저장소 루트의 공용 모듈(sakura_db.py)을 불러오기 위해 상위 폴더를 경로에 추가합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sakura_db import get_connection
+
+DB_PATH = "data/sakura_ko.db"
+OUTPUT_PATH = "./data/units.js"
+
+# units.js 옆에 저장하는 지문 파일: 첫 줄은 헤더(JSON), 이후 units.js의 유닛 줄과 1:1로 대응하는 지문
+FINGERPRINT_SUFFIX = ".fingerprints"
+# make_unit()의 출력 형식이 바뀌면 올려서 기존 지문을 모두 무효화합니다.
+FINGERPRINT_VERSION = 1
+
+# 파일을 읽고 쓸 때 사용하는 버퍼 크기
+READ_CHUNK_SIZE = 1024 * 1024
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+UNITS_HEADER = "window.units = [\n"
+UNITS_FOOTER = "];\n"
 
 TYPE_MAP = {
     "en": {1: "STR", 2: "DEX", 3: "QCK", 4: "PSY", 5: "INT"},
@@ -22,6 +43,24 @@ CLASS_MAP = {
 
 LANG = "en"
 
+# 빠진 logbookId를 채우는 빈 유닛
+FILLER_UNIT = [
+    "", "Type", ["Class1", "Class2"],
+    None, None, None, None, None, None,
+    None, None, None, None, None, None, None
+]
+
+UNITS_QUERY = """
+SELECT
+    logbookId_, name_, subName_, attributeId_, characterType_, subCharacterType_,
+    rarity_, isRarityPlus_, cost_, comboNum_, maxOptionSkill_,
+    maxLevel_, limitExp_, minHealth_, minAttackDamage_, minRestoration_,
+    maxHealth_, maxAttackDamage_, maxRestoration_
+FROM MstCharacter_
+WHERE logbookId_ != -1
+ORDER BY logbookId_ ASC
+"""
+
 def get_type_name(attr_id):
     return TYPE_MAP.get(LANG, {}).get(attr_id, "알수없음")
 
@@ -33,22 +72,10 @@ def get_classes(class1, class2):
 def make_name(name, sub_name):
     return f"{name} – {sub_name}" if sub_name else name
 
-cursor.execute("""
-SELECT 
-    logbookId_, name_, subName_, attributeId_, characterType_, subCharacterType_,
-    rarity_, isRarityPlus_, cost_, comboNum_, maxOptionSkill_, 
-    maxLevel_, limitExp_, minHealth_, minAttackDamage_, minRestoration_, 
-    maxHealth_, maxAttackDamage_, maxRestoration_
-FROM MstCharacter_
-WHERE logbookId_ != -1
-ORDER BY logbookId_ ASC
-""")
-
-units_by_id = {}
-max_logbook_id = 0
-for row in cursor.fetchall():
+def make_unit(row):
+    """MstCharacter_ 한 행(logbookId_ 제외)을 units.js의 16개 항목 유닛으로 변환합니다."""
     (
-        logbook_id, name, sub_name, attr_id, class1, class2,
+        name, sub_name, attr_id, class1, class2,
         rarity, rarity_plus, cost, combo, sockets,
         max_lvl, exp_to_max, lvl1_hp, lvl1_atk, lvl1_rcv,
         max_hp, max_atk, max_rcv
@@ -59,7 +86,7 @@ for row in cursor.fetchall():
     class_info = get_classes(class1, class2)
     stars = f"{rarity}+" if rarity_plus else rarity
 
-    unit = [
+    return [
         display_name,
         type_name,
         class_info,
@@ -78,26 +105,159 @@ for row in cursor.fetchall():
         1  # Growth Rate
     ]
 
-    units_by_id[logbook_id] = unit  # ❗ 누락된 부분
-    if logbook_id > max_logbook_id:
-        max_logbook_id = logbook_id
+def render_unit(unit):
+    """유닛 하나를 units.js의 한 줄로 변환합니다."""
+    return "  " + json.dumps(unit, ensure_ascii=False) + ",\n"
+
+FILLER_LINE = render_unit(FILLER_UNIT)
+
+def row_fingerprint(row):
+    """유닛을 만드는 원본 행의 지문. 값이 하나라도 바뀌면 지문도 바뀝니다."""
+    return hashlib.blake2b(repr(row).encode("utf-8"), digest_size=8).hexdigest()
+
+def fingerprint_header(units_sha1):
+    return json.dumps({"version": FINGERPRINT_VERSION, "lang": LANG, "units_sha1": units_sha1})
 
-# 빠진 logbookId를 빈 유닛으로 채움
-units = []
-for i in range(1, max_logbook_id + 1):
-    if i in units_by_id:
-        units.append(units_by_id[i])
+def file_sha1(path):
+    """파일 전체를 읽지 않고 1MB씩 나누어 해시를 계산합니다."""
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+def count_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+def is_previous_output_usable(output_path):
+    """
+    이전 실행에서 만든 units.js와 지문 파일을 재사용할 수 있는지 확인합니다.
+    파일이 없거나, 설정이 다르거나, units.js가 지문 파일과 맞지 않으면(직접 수정 등) False를 반환합니다.
+    """
+    fingerprint_path = output_path + FINGERPRINT_SUFFIX
+    if not (os.path.exists(output_path) and os.path.exists(fingerprint_path)):
+        return False
+
+    with open(fingerprint_path, encoding="utf-8") as f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            return False
+    if header != json.loads(fingerprint_header(file_sha1(output_path))):
+        return False
+
+    # units.js는 머리/꼬리 2줄, 지문 파일은 헤더 1줄을 제외하면 줄 수가 같아야 합니다.
+    return count_lines(output_path) - 2 == count_lines(fingerprint_path) - 1
+
+def iter_previous_output(output_path):
+    """이전 결과의 (유닛 줄, 지문)을 logbookId 1부터 순서대로 하나씩 반환합니다."""
+    with open(output_path, encoding="utf-8") as units_file, \
+            open(output_path + FINGERPRINT_SUFFIX, encoding="utf-8") as fingerprint_file:
+        next(units_file)        # "window.units = ["
+        next(fingerprint_file)  # 헤더
+        for line, fingerprint in zip(units_file, fingerprint_file):
+            yield line, fingerprint.rstrip("\n")
+
+def iter_unit_rows(cursor):
+    """
+    MstCharacter_를 logbookId_ 순서대로 한 행씩 읽어 (logbook_id, 나머지 컬럼)을 반환합니다.
+    같은 logbookId_가 여러 번 나오면 마지막 행을 사용합니다.
+    """
+    cursor.execute(UNITS_QUERY)
+    pending = None
+    for row in cursor:
+        # units.js는 logbookId 1부터 시작하므로 그보다 작은 ID는 사용하지 않습니다.
+        if row[0] < 1:
+            continue
+        if pending is not None and pending[0] != row[0]:
+            yield pending
+        pending = (row[0], row[1:])
+    if pending is not None:
+        yield pending
+
+def iter_output_lines(unit_rows, previous_output, stats):
+    """
+    logbookId 1부터 순서대로 (units.js 줄, 지문)을 만들어 반환합니다.
+    빠진 logbookId는 빈 유닛으로 채우고, 지문이 이전 결과와 같은 유닛은 이전 줄을 그대로 사용합니다.
+    """
+    previous_output = iter(previous_output)
+    next_logbook_id = 1
+    for logbook_id, row in unit_rows:
+        # 빠진 logbookId를 빈 유닛으로 채움
+        while next_logbook_id < logbook_id:
+            next(previous_output, None)
+            yield FILLER_LINE, ""
+            next_logbook_id += 1
+
+        previous = next(previous_output, None)
+        fingerprint = row_fingerprint(row)
+        if previous is not None and previous[1] == fingerprint:
+            line = previous[0]
+        else:
+            line = render_unit(make_unit(row))
+            stats["rendered"] += 1
+        stats["units"] += 1
+        yield line, fingerprint
+        next_logbook_id += 1
+
+def write_output(output_path, output_lines):
+    """
+    (units.js 줄, 지문)을 받는 대로 버퍼 파일에 바로 씁니다.
+    임시 파일에 먼저 쓴 뒤 교체하여, 중간에 실패해도 기존 파일이 깨지지 않도록 저장합니다.
+    """
+    fingerprint_path = output_path + FINGERPRINT_SUFFIX
+    units_temp = output_path + ".tmp"
+    body_temp = fingerprint_path + ".body.tmp"
+    fingerprint_temp = fingerprint_path + ".tmp"
+
+    with open(units_temp, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as units_file, \
+            open(body_temp, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as body_file:
+        units_file.write(UNITS_HEADER)
+        for line, fingerprint in output_lines:
+            units_file.write(line)
+            body_file.write(fingerprint + "\n")
+        units_file.write(UNITS_FOOTER)
+
+    # 지문 파일에는 실제로 저장된 units.js의 해시를 기록하여, 다음 실행 때 파일이 그대로인지 확인합니다.
+    with open(fingerprint_temp, "w", encoding="utf-8") as fingerprint_file, \
+            open(body_temp, encoding="utf-8") as body_file:
+        fingerprint_file.write(fingerprint_header(file_sha1(units_temp)) + "\n")
+        shutil.copyfileobj(body_file, fingerprint_file, READ_CHUNK_SIZE)
+    os.remove(body_temp)
+
+    os.replace(units_temp, output_path)
+    os.replace(fingerprint_temp, fingerprint_path)
+
+def export_units(cursor, output_path, full_rebuild=False):
+    """
+    MstCharacter_를 units.js로 내보냅니다. 행을 한 줄씩 읽어 바로 파일에 쓰므로 메모리 사용량이 일정합니다.
+    full_rebuild가 아니면 이전 결과의 지문과 비교하여, 새로 생기거나 바뀐 유닛 줄만 다시 만듭니다.
+    """
+    incremental = not full_rebuild and is_previous_output_usable(output_path)
+    previous_output = iter_previous_output(output_path) if incremental else ()
+
+    stats = {"units": 0, "rendered": 0}
+    write_output(output_path, iter_output_lines(iter_unit_rows(cursor), previous_output, stats))
+    if incremental:
+        previous_output.close()
+
+    return stats["units"], stats["rendered"], incremental
+
+def main():
+    parser = argparse.ArgumentParser(description="sakura DB의 MstCharacter_를 units.js로 내보냅니다.")
+    parser.add_argument("--db", default=DB_PATH, help=f"원본 DB 경로 (기본값: {DB_PATH})")
+    parser.add_argument("--output", default=OUTPUT_PATH, help=f"결과 파일 경로 (기본값: {OUTPUT_PATH})")
+    parser.add_argument("--full", action="store_true", help="이전 결과를 사용하지 않고 전체를 다시 만듭니다.")
+    args = parser.parse_args()
+
+    cursor = get_connection(args.db).cursor()
+    unit_count, rendered_count, incremental = export_units(cursor, args.output, full_rebuild=args.full)
+
+    if incremental:
+        print(f"✅ units.js 파일 갱신 완료 (전체 {unit_count}개 중 신규/변경 {rendered_count}개 반영, logbookId 순 정렬됨)")
     else:
-        units.append([
-            "", "Type", ["Class1", "Class2"],
-            None, None, None, None, None, None,
-            None, None, None, None, None, None, None
-        ])
-
-with open("./data/units.js", "w", encoding="utf-8") as f:
-    f.write("window.units = [\n")
-    for unit in units:
-        f.write("  " + json.dumps(unit, ensure_ascii=False) + ",\n")
-    f.write("];\n")
-
-print("✅ units.js 파일 생성 완료 (logbookId 순 정렬됨)")
+        print("✅ units.js 파일 생성 완료 (logbookId 순 정렬됨)")
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,59 @@
 import sqlite3
 import os
+import sys
 import pyperclip
 
-def find_db_file(directory='.'):
-    """현재 디렉토리에서 SQLite DB 파일(.db) 하나를 찾습니다."""
-    db_files = [f for f in os.listdir(directory) if f.endswith('.db')]
-    
-    if not db_files:
-        print("오류: 폴더에서 .db 파일을 찾을 수 없습니다.")
-        return None
-    
-    if len(db_files) > 1:
-        print(f"경고: 여러 개의 .db 파일({db_files})이 발견되었습니다. 첫 번째 파일 '{db_files[0]}'을 사용합니다.")
-    
-    return db_files[0]
+# 저장소 루트의 공용 모듈(sakura_db.py)을 불러오기 위해 상위 폴더를 경로에 추가합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sakura_db import find_db_file, get_connection
+
+# logbookId_ 범위 안의 모든 캐릭터와 필살기 정보를 한 번에 가져오는 쿼리.
+# 필살기 정보가 없는 캐릭터도 안내 메시지를 출력할 수 있도록 LEFT JOIN으로 가져옵니다.
+# (MstAbility_.serverId_에는 인덱스가 없지만 SQLite가 쿼리 동안 자동 인덱스를 만들어 사용합니다)
+COOLDOWN_QUERY = """
+    SELECT c.logbookId_, c.serverId_, a.turn_, a.maxLevel_
+    FROM MstCharacter_ AS c
+    LEFT JOIN MstAbility_ AS a ON a.serverId_ = c.serverId_
+    WHERE c.logbookId_ BETWEEN ? AND ?
+    ORDER BY c.logbookId_, c.rowid, a.turn_, a.rowid
+"""
+
+
+def iter_cooldown_lines(cursor, start_logbook_id, end_logbook_id):
+    """
+    logbookId_ 범위의 필살기 턴을 logbookId_ 순서대로 "[turn, turn - maxLevel + 1]," 형식의 줄로 하나씩 반환합니다.
+    캐릭터나 필살기 정보가 없는 ID는 안내 메시지를 출력하고 건너뜁니다.
+    """
+    current_logbook_id = None
+    current_server_id = None
+    next_logbook_id = start_logbook_id
+    cursor.execute(COOLDOWN_QUERY, (start_logbook_id, end_logbook_id))
+    for logbook_id, server_id, turn, max_level in cursor:
+        if logbook_id == current_logbook_id:
+            # 같은 logbookId_를 가진 캐릭터가 여러 명이면 원본 DB에서 먼저 나온 캐릭터만 사용합니다.
+            if server_id != current_server_id:
+                continue
+        else:
+            # 범위 안에서 건너뛴 logbookId_는 해당하는 캐릭터가 없는 ID입니다.
+            for missing_id in range(next_logbook_id, logbook_id):
+                print(f"-> 정보: logbookId '{missing_id}'에 해당하는 캐릭터가 없어 건너뜁니다.")
+            current_logbook_id, current_server_id = logbook_id, server_id
+            next_logbook_id = logbook_id + 1
+
+        if turn is None:
+            print(f"-> 정보: logbookId '{logbook_id}'(serverId: {server_id})의 Ability 정보가 없어 건너뜁니다.")
+            continue
+
+        if max_level is None:
+            max_level = 0
+
+        calculated_value = turn - max_level + 1
+        # 맨 앞에 공백 4칸을 추가하여 들여쓰기를 합니다.
+        yield f"    [{turn}, {calculated_value}],"
+
+    for missing_id in range(next_logbook_id, end_logbook_id + 1):
+        print(f"-> 정보: logbookId '{missing_id}'에 해당하는 캐릭터가 없어 건너뜁니다.")
+
 
 def main():
     """메인 로직을 실행합니다."""
@@ -39,39 +79,12 @@ def main():
     
     print(f"\n지정된 ID 범위 {start_logbook_id} ~ {end_logbook_id}의 데이터를 조회합니다...")
 
-    conn = None
     try:
-        conn = sqlite3.connect(db_file)
+        conn = get_connection(db_file)
         cursor = conn.cursor()
 
-        all_output_lines = []
-        
-        for current_logbook_id in range(start_logbook_id, end_logbook_id + 1):
-            
-            cursor.execute('SELECT serverId_ FROM MstCharacter_ WHERE logbookId_ = ?', (current_logbook_id,))
-            server_id_result = cursor.fetchone()
-
-            if not server_id_result:
-                print(f"-> 정보: logbookId '{current_logbook_id}'에 해당하는 캐릭터가 없어 건너뜁니다.")
-                continue
-
-            server_id = server_id_result[0]
-            
-            cursor.execute('SELECT turn_, maxLevel_ FROM MstAbility_ WHERE serverId_ = ? ORDER BY turn_', (server_id,))
-            ability_results = cursor.fetchall()
-
-            if not ability_results:
-                print(f"-> 정보: logbookId '{current_logbook_id}'(serverId: {server_id})의 Ability 정보가 없어 건너뜁니다.")
-                continue
-
-            for turn, max_level in ability_results:
-                if max_level is None:
-                    max_level = 0
-                
-                calculated_value = turn - max_level + 1
-                # <-- 수정된 부분: 맨 앞에 공백 4칸을 추가하여 들여쓰기를 합니다.
-                formatted_line = f"    [{turn}, {calculated_value}],"
-                all_output_lines.append(formatted_line)
+        # 범위 전체를 하나의 JOIN 쿼리로 조회하여 결과를 순서대로 받아옵니다.
+        all_output_lines = list(iter_cooldown_lines(cursor, start_logbook_id, end_logbook_id))
         
         if not all_output_lines:
             print("\n해당 범위에서 변환할 데이터를 찾지 못했습니다.")
@@ -89,9 +102,6 @@ def main():
         print(f"데이터베이스 오류가 발생했습니다: {e}")
     except pyperclip.PyperclipException:
         print("\n(참고: pyperclip 라이브러리가 없거나 오류가 발생하여 클립보드에 복사하지 못했습니다.)")
-    finally:
-        if conn:
-            conn.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
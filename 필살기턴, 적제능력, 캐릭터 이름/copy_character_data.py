@@ -1,6 +1,11 @@
 import sqlite3
 import pyperclip
 import os
+import sys
+
+# 저장소 루트의 공용 모듈(sakura_db.py)을 불러오기 위해 상위 폴더를 경로에 추가합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sakura_db import find_db_file, get_connection
 
 # piratesStyle_ 값에 따라 변환될 텍스트 딕셔너리
 STYLE_MAP = {
@@ -12,21 +17,6 @@ STYLE_MAP = {
     5: "DBF"
 }
 
-def find_db_file(directory='.'):
-    """
-    현재 디렉토리에서 .db 파일을 찾아 파일 이름을 반환합니다.
-    """
-    db_files = [f for f in os.listdir(directory) if f.endswith('.db')]
-    
-    if not db_files:
-        print("오류: 스크립트가 있는 폴더에서 .db 파일을 찾을 수 없습니다.")
-        return None
-    
-    if len(db_files) > 1:
-        print(f"알림: 여러 개의 .db 파일이 발견되었습니다. 첫 번째 파일인 '{db_files[0]}'을(를) 사용합니다.")
-    
-    return db_files[0]
-
 def get_character_data_and_copy():
     """
     터미널에서 ID 범위를 입력받아 DB 데이터를 조회하고,
@@ -52,7 +42,7 @@ def get_character_data_and_copy():
         id2 = int(end_id_str)
         
         # --- 데이터베이스 연결 ---
-        conn = sqlite3.connect(db_filename)
+        conn = get_connection(db_filename)
         print(f"\n✅ 성공: 데이터베이스 '{db_filename}'에 정상적으로 연결되었습니다.")
 
         cursor = conn.cursor()
@@ -71,7 +61,6 @@ def get_character_data_and_copy():
         cursor.execute(query, (start_id, end_id))
         results = cursor.fetchall()
         
-        conn.close()
 
         if results:
             output_lines = []
@@ -3,6 +3,11 @@ import sqlite3      # SQLite DB에 연결하기 위한 라이브러리
 import json         # 파이썬 객체를 JSON 문자열로 변환하기 위한 라이브러리
 import pyperclip    # 클립보드에 텍스트를 복사하기 위한 라이브러리
 import os           # 파일 시스템(폴더 내 파일 목록 등)에 접근하기 위한 라이브러리
+import sys          # 공용 모듈 경로를 추가하기 위한 라이브러리
+
+# 저장소 루트의 공용 모듈(sakura_db.py)을 불러오기 위해 상위 폴더를 경로에 추가합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sakura_db import SQLITE_DB_EXTENSIONS, find_db_file, get_connection
 
 # --- 데이터 매핑을 위한 딕셔너리 정의 ---
 # 데이터베이스의 숫자 코드를 사람이 읽을 수 있는 문자열로 변환(매핑)하는 데 사용됩니다.
@@ -28,34 +33,54 @@ TYPE_MAP = {
     5: "INT"
 }
 
-def find_database_file():
+def load_requested_ids(cursor, character_ids):
     """
-    현재 스크립트가 실행되는 폴더에서 .db, .sqlite, .sqlite3 확장자를 가진 데이터베이스 파일을 찾습니다.
+    요청된 캐릭터 ID를 입력 순서(pos)와 함께 임시 테이블에 담습니다.
+    ID 개수만큼 '?'를 늘어놓는 IN (...) 쿼리 대신 임시 테이블과 JOIN하여 조회합니다.
     """
-    # 현재 폴더의 모든 파일을 확인하며, DB 확장자로 끝나는 파일만 리스트에 담습니다.
-    db_files = [f for f in os.listdir('.') if f.endswith(('.db', '.sqlite', '.sqlite3'))]
-    
-    # DB 파일이 하나도 없으면 None을 반환합니다.
-    if not db_files:
-        return None
-        
-    # DB 파일이 여러 개 발견되면, 첫 번째 파일을 사용하고 사용자에게 경고 메시지를 보여줍니다.
-    if len(db_files) > 1:
-        print(f"⚠️  경고: 폴더에 DB 파일이 여러 개 있습니다. '{db_files[0]}' 파일을 사용합니다.")
-        
-    # 찾은 DB 파일 목록에서 첫 번째 파일의 이름을 반환합니다.
-    return db_files[0]
+    # 임시 테이블은 메모리에만 존재하며, 원본 DB는 읽기 전용 그대로 유지됩니다.
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS requested_id (pos INTEGER PRIMARY KEY, server_id INTEGER NOT NULL)")
+    cursor.execute("DELETE FROM temp.requested_id")
+    cursor.executemany("INSERT INTO temp.requested_id (pos, server_id) VALUES (?, ?)", enumerate(character_ids))
+
+def drop_temp_tables(cursor):
+    """
+    조회에 사용한 임시 테이블을 지우고 트랜잭션을 끝냅니다.
+    공용 연결(get_connection)은 다른 코드와 함께 쓰므로 INSERT로 열린 트랜잭션을 남겨 두지 않습니다.
+    """
+    cursor.execute("DROP TABLE IF EXISTS temp.requested_id")
+    cursor.execute("DROP TABLE IF EXISTS temp.dual_sub_name")
+    cursor.connection.commit()
 
-def get_dual_type(cursor, sub_name):
+def get_dual_types(cursor, sub_names):
     """
-    attributeId_가 9일 경우, subName_을 기준으로 다른 캐릭터 2명의 속성을 찾아 리스트로 반환합니다.
+    attributeId_가 9인 캐릭터들의 subName_ 목록을 받아, subName_별로 다른 캐릭터 2명의 속성을 찾아 한 번에 반환합니다.
+    (결과 예: {'subName': ['STR', 'DEX']})
     """
-    # subName_이 일치하는 캐릭터의 attributeId_를 2개까지 찾는 SQL 쿼리
-    query = "SELECT attributeId_ FROM MstCharacter_ WHERE subName_ = ? LIMIT 2"
-    cursor.execute(query, (sub_name,))
-    rows = cursor.fetchall()
-    # 2개의 속성을 찾아 각각 TYPE_MAP을 이용해 매핑하여 리스트로 만듭니다.
-    return [TYPE_MAP.get(row[0], "Unknown") for row in rows]
+    if not sub_names:
+        return {}
+
+    # 찾아야 할 subName_ 목록을 임시 테이블에 담습니다.
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS dual_sub_name (sub_name TEXT PRIMARY KEY)")
+    cursor.execute("DELETE FROM temp.dual_sub_name")
+    cursor.executemany("INSERT OR IGNORE INTO temp.dual_sub_name (sub_name) VALUES (?)", ((name,) for name in sub_names))
+
+    # MstCharacter_를 한 번만 읽으면서 subName_이 일치하는 캐릭터를 원본 DB 순서대로 가져옵니다.
+    query = """
+        SELECT c.subName_, c.attributeId_
+        FROM MstCharacter_ AS c
+        JOIN temp.dual_sub_name AS d ON d.sub_name = c.subName_
+        ORDER BY c.rowid
+    """
+    cursor.execute(query)
+
+    # subName_별로 먼저 나온 2개의 속성만 TYPE_MAP을 이용해 매핑하여 리스트로 만듭니다.
+    dual_types = {}
+    for row in cursor.fetchall():
+        types = dual_types.setdefault(row[0], [])
+        if len(types) < 2:
+            types.append(TYPE_MAP.get(row[1], "Unknown"))
+    return dual_types
 
 def process_character_data(cursor, character_ids):
     """
@@ -65,38 +90,48 @@ def process_character_data(cursor, character_ids):
     if not character_ids:
         return []
 
-    # 여러 ID를 한 번에 효율적으로 조회하기 위한 SQL 쿼리 준비 (예: 'IN (?, ?, ?)')
-    placeholders = ', '.join(['?'] * len(character_ids))
-    query = f"SELECT * FROM MstCharacter_ WHERE serverId_ IN ({placeholders})"
-    
-    # 데이터베이스에 쿼리 실행
-    cursor.execute(query, character_ids)
-    rows = cursor.fetchall()
-
-    # 나중에 ID로 데이터를 쉽게 찾기 위해 딕셔너리 형태로 변환 (예: {1: row_data, 2: row_data})
-    results_by_id = {row['serverId_']: row for row in rows}
-    
+    # 요청된 ID를 임시 테이블에 담고, 입력 순서(pos)대로 캐릭터 데이터를 한 번에 조회합니다.
+    # 같은 serverId_가 여러 행에 있으면 예전처럼 마지막 행(가장 큰 rowid) 하나만 사용합니다.
+    try:
+        load_requested_ids(cursor, character_ids)
+        query = """
+            SELECT r.pos AS requested_pos, r.server_id AS requested_id, c.*
+            FROM temp.requested_id AS r
+            LEFT JOIN (
+                SELECT serverId_ AS server_id, MAX(rowid) AS last_rowid
+                FROM MstCharacter_
+                WHERE serverId_ IN (SELECT server_id FROM temp.requested_id)
+                GROUP BY serverId_
+            ) AS latest ON latest.server_id = r.server_id
+            LEFT JOIN MstCharacter_ AS c ON c.rowid = latest.last_rowid
+            ORDER BY r.pos
+        """
+        cursor.execute(query)
+        rows = cursor.fetchall()
+
+        # 이중 속성(attributeId_ 9) 캐릭터들의 subName_을 모아 한 번에 속성을 찾아 둡니다.
+        dual_types = get_dual_types(cursor, [row['subName_'] for row in rows if row['attributeId_'] == 9])
+    finally:
+        drop_temp_tables(cursor)
+
     # 최종 결과물을 담을 빈 리스트
     final_data_list = []
 
     # 사용자가 입력한 ID 순서대로 처리 시작
-    for char_id in character_ids:
+    for char_data in rows:
         # 만약 DB에서 해당 ID의 캐릭터를 찾지 못했다면 경고 메시지를 출력하고 다음 ID로 넘어감
-        if char_id not in results_by_id:
-            print(f"⚠️ 경고: DB에서 ID {char_id}를 찾을 수 없습니다.")
+        if char_data['serverId_'] is None:
+            print(f"⚠️ 경고: DB에서 ID {char_data['requested_id']}를 찾을 수 없습니다.")
             continue
 
-        # 현재 처리 중인 캐릭터의 데이터
-        char_data = results_by_id[char_id]
-        
         # [양식 처리 1] Name, subName 처리: subName이 있으면 "Name - subName" 형태로 조합
         name = char_data['name_']
         if char_data['subName_']:
             name = f"{name} - {char_data['subName_']}"
 
-        # [양식 처리 2] Type 처리: attributeId가 9이면 특별 함수 호출, 아니면 일반 매핑
+        # [양식 처리 2] Type 처리: attributeId가 9이면 미리 찾아 둔 이중 속성 사용, 아니면 일반 매핑
         type_val = char_data['attributeId_']
-        char_type = get_dual_type(cursor, char_data['subName_']) if type_val == 9 else TYPE_MAP.get(type_val, "Unknown")
+        char_type = dual_types.get(char_data['subName_'], []) if type_val == 9 else TYPE_MAP.get(type_val, "Unknown")
 
         # [양식 처리 3] Class 처리: subCharacterType이 유효할 때만 리스트로, 아니면 단일 값으로 처리
         class1_id = char_data['characterType_']
@@ -133,21 +168,20 @@ def main():
     """
     스크립트의 메인 실행 함수. DB 연결, 사용자 입력, 데이터 처리, 결과 출력 및 복사를 담당합니다.
     """
-    # 하드코딩된 경로 대신, 새로 만든 함수를 호출하여 DB 파일 이름을 자동으로 가져옵니다.
-    DATABASE_PATH = find_database_file()
+    # 공용 모듈(sakura_db.py)의 함수를 호출하여 DB 파일 이름을 자동으로 가져옵니다.
+    DATABASE_PATH = find_db_file(extensions=SQLITE_DB_EXTENSIONS)
 
-    # DB 파일을 찾지 못했을 경우, 메시지를 보여주고 스크립트를 종료합니다.
+    # DB 파일을 찾지 못했을 경우, 스크립트를 종료합니다. (오류 메시지는 find_db_file이 출력합니다)
     if not DATABASE_PATH:
-        print("❌ 폴더에서 데이터베이스 파일(.db, .sqlite, .sqlite3)을 찾을 수 없습니다.")
         return
 
-    # try...finally 구문: 프로그램 실행 중 오류가 발생하더라도 항상 DB 연결을 닫도록 보장합니다.
     try:
-        # 데이터베이스에 연결합니다.
-        con = sqlite3.connect(DATABASE_PATH)
-        # DB의 컬럼 이름으로 데이터에 접근할 수 있도록 설정합니다. (예: row['serverId_'])
-        con.row_factory = sqlite3.Row
+        # 데이터베이스에 읽기 전용으로 연결합니다. (연결은 공용 모듈이 관리하며 종료 시 자동으로 닫힙니다)
+        con = get_connection(DATABASE_PATH)
         cur = con.cursor()
+        # DB의 컬럼 이름으로 데이터에 접근할 수 있도록 설정합니다. (예: row['serverId_'])
+        # 공용 연결의 설정을 바꾸지 않도록 커서에만 적용합니다.
+        cur.row_factory = sqlite3.Row
         
         # 사용자에게 캐릭터 번호 입력을 요청합니다.
         print("데이터를 추출할 캐릭터의 번호를 입력하세요 (여러 개는 쉼표(,)로 구분).")
@@ -193,10 +227,6 @@ def main():
         print(f"❌ 데이터베이스 오류가 발생했습니다: {e}")
     except ValueError:
         print("❌ 잘못된 숫자 형식입니다. 번호와 쉼표(,)만 사용하여 입력해주세요.")
-    # 'con' 변수가 성공적으로 생성되었을 때만 con.close()를 호출하도록 수정
-    finally:
-        if 'con' in locals() and con:
-            con.close() # DB 연결을 닫습니다.
 
 # 이 스크립트 파일이 직접 실행되었을 때만 main() 함수를 호출합니다.
 if __name__ == "__main__":